@@ -0,0 +1,51 @@
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from accounts.services import principal, token_revocation
+
+
+class RevocationAwareJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that also rejects revoked access tokens.
+
+    The revocation check is an in-memory bloom filter lookup for all but
+    revoked (or false-positive) tokens, so it adds no I/O per request.
+    """
+
+    def get_validated_token(self, raw_token):
+        token = super().get_validated_token(raw_token)
+        if token_revocation.is_revoked(token["jti"]):
+            raise InvalidToken({"detail": "Token has been revoked.", "code": "token_not_valid"})
+        return token
+
+
+class CachedPrincipalJWTAuthentication(RevocationAwareJWTAuthentication):
+    """
+    Revocation-aware JWT authentication that resolves the user from the
+    cached principal instead of loading the `CustomUser` row.
+
+    `request.user` is a real user instance with the principal's columns
+    and `vendor_profile` preloaded, so permission checks run without
+    queries; other fields load on first access.
+    """
+
+    def get_user(self, validated_token):
+        if api_settings.CHECK_REVOKE_TOKEN:
+            # needs the password hash, which the principal does not carry
+            return super().get_user(validated_token)
+
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+
+        cached = principal.get_principal(user_id)
+        if cached is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+
+        if not cached["is_active"]:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+
+        return principal.as_user(cached)
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-17 08:10
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0008_bankaccount_created_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blacklistaccesstoken',
+            name='expires_at',
+            # existing rows carry no expiry; treat them as already expired
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now),
+            preserve_default=False,
+        ),
+    ]
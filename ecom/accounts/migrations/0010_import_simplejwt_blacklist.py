@@ -0,0 +1,65 @@
+from datetime import timezone as dt_timezone
+
+from django.conf import settings
+from django.db import migrations
+from django.db.models import F
+from django.utils import timezone
+
+# Tables left behind by rest_framework_simplejwt.token_blacklist, no longer installed
+OUTSTANDING_TABLE = "token_blacklist_outstandingtoken"
+BLACKLISTED_TABLE = "token_blacklist_blacklistedtoken"
+BATCH_SIZE = 1000
+
+
+def import_blacklisted_tokens(apps, schema_editor):
+    """
+    Carries revocations made before `expires_at` existed into the new ledger.
+
+    Refresh tokens blacklisted by simplejwt (logout, rotation) that have
+    not expired yet are copied in, so they stay revoked once the app's
+    table is no longer read. Access tokens revoked earlier were given the
+    migration time as expiry; they get their real expiry back.
+    """
+    BlackListAccessToken = apps.get_model("accounts", "BlackListAccessToken")
+    connection = schema_editor.connection
+
+    real_expiry = F("blacklisted_at") + settings.SIMPLE_JWT["ACCESS_TOKEN_LIFETIME"]
+    BlackListAccessToken.objects.filter(expires_at__lt=real_expiry).update(expires_at=real_expiry)
+
+    tables = connection.introspection.table_names()
+    if OUTSTANDING_TABLE not in tables or BLACKLISTED_TABLE not in tables:
+        return
+
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT o.jti, o.expires_at FROM {quote(BLACKLISTED_TABLE)} b "
+            f"JOIN {quote(OUTSTANDING_TABLE)} o ON o.id = b.token_id "
+            f"WHERE o.expires_at > %s",
+            [connection.ops.adapt_datetimefield_value(timezone.now())],
+        )
+        while rows := cursor.fetchmany(BATCH_SIZE):
+            BlackListAccessToken.objects.bulk_create(
+                [
+                    BlackListAccessToken(
+                        jti=jti,
+                        expires_at=(
+                            timezone.make_aware(expires_at, dt_timezone.utc)
+                            if timezone.is_naive(expires_at) else expires_at
+                        ),
+                    )
+                    for jti, expires_at in rows
+                ],
+                ignore_conflicts=True,
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0009_blacklistaccesstoken_expires_at'),
+    ]
+
+    operations = [
+        migrations.RunPython(import_blacklisted_tokens, migrations.RunPython.noop),
+    ]
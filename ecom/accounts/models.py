@@ -199,8 +199,13 @@ class BankAccount(models.Model):
         self.save(update_fields=["status"])
 
 class BlackListAccessToken(models.Model):
+    """
+    Durable record of a revoked access or refresh token, kept until the
+    token would have expired anyway. See `accounts.services.token_revocation`.
+    """
     jti = models.CharField(max_length=255, unique=True)
     blacklisted_at = models.DateTimeField(auto_now_add=True)
+    expires_at = models.DateTimeField(db_index=True)
 
     def __str__(self):
         return self.jti
@@ -0,0 +1,477 @@
+import re
+import threading
+import time
+import httpx
+from django.conf import settings
+from django.core.cache import cache
+from kombu.exceptions import OperationalError as KombuOperationalError
+from redis.exceptions import ConnectionError as RedisConnectionError
+from rest_framework.exceptions import ValidationError
+
+import logging
+logger = logging.getLogger(__name__)
+
+DIRECTORY_KEY = "bank_directory:v1"
+REFRESH_LOCK_KEY = "bank_directory:refreshing"
+REFRESH_LOCK_TIMEOUT = 60
+LOAD_LOCK_KEY = "bank_directory:loading"
+
+RESOLVE_KEY = "bank_resolve:{bank_code}:{account_number}"
+RESOLVE_LOCK_KEY = "bank_resolve:lock:{bank_code}:{account_number}"
+
+# Paystack answers these when an account does not resolve; anything else may be transient
+KNOWN_FAILURE_STATUS_CODES = {400, 404, 422}
+
+# Words that say nothing about which bank is meant
+STOPWORDS = {"bank", "of", "for", "the", "and", "plc", "limited", "ltd", "nigeria", "mfb", "microfinance"}
+
+# Common spellings and former names, mapped to Paystack's bank names
+BANK_ALIASES = {
+    # GTBank
+    "gtbank": "Guaranty Trust Bank",
+    "gt bank": "Guaranty Trust Bank",
+    "gtb": "Guaranty Trust Bank",
+    "guaranty trust": "Guaranty Trust Bank",
+
+    # Access Bank
+    "access": "Access Bank",
+    "access bank": "Access Bank",
+    "access diamond": "Access Bank",
+
+    # Zenith Bank
+    "zenith": "Zenith Bank",
+    "zenith bank": "Zenith Bank",
+
+    # First Bank
+    "first bank": "First Bank of Nigeria",
+    "firstbank": "First Bank of Nigeria",
+    "fbn": "First Bank of Nigeria",
+
+    # UBA
+    "uba": "United Bank for Africa",
+    "united bank": "United Bank for Africa",
+    "united bank for africa": "United Bank for Africa",
+
+    # Union Bank
+    "union": "Union Bank of Nigeria",
+    "union bank": "Union Bank of Nigeria",
+
+    # FCMB
+    "fcmb": "First City Monument Bank",
+    "first city": "First City Monument Bank",
+    "first city monument": "First City Monument Bank",
+
+    # Stanbic IBTC
+    "stanbic": "Stanbic IBTC Bank",
+    "stanbic ibtc": "Stanbic IBTC Bank",
+    "ibtc": "Stanbic IBTC Bank",
+
+    # Sterling Bank
+    "sterling": "Sterling Bank",
+    "sterling bank": "Sterling Bank",
+
+    # Wema Bank
+    "wema": "Wema Bank",
+    "wema bank": "Wema Bank",
+    "alat": "Wema Bank",
+
+    # Polaris Bank
+    "polaris": "Polaris Bank",
+    "polaris bank": "Polaris Bank",
+    "skye bank": "Polaris Bank",
+
+    # Fidelity Bank
+    "fidelity": "Fidelity Bank",
+    "fidelity bank": "Fidelity Bank",
+
+    # Keystone Bank
+    "keystone": "Keystone Bank",
+    "keystone bank": "Keystone Bank",
+
+    # Ecobank
+    "ecobank": "Ecobank Nigeria",
+    "eco bank": "Ecobank Nigeria",
+
+    # Jaiz Bank
+    "jaiz": "Jaiz Bank",
+    "jaiz bank": "Jaiz Bank",
+
+    # Heritage Bank
+    "heritage": "Heritage Bank",
+    "heritage bank": "Heritage Bank",
+
+    # Unity Bank
+    "unity": "Unity Bank",
+    "unity bank": "Unity Bank",
+
+    # Titan Trust Bank
+    "titan": "Titan Trust Bank",
+    "titan trust": "Titan Trust Bank",
+    "titan trust bank": "Titan Trust Bank",
+
+    # Providus Bank
+    "providus": "Providus Bank",
+    "providus bank": "Providus Bank",
+
+    # Standard Chartered
+    "standard chartered": "Standard Chartered Bank Nigeria",
+    "stanchart": "Standard Chartered Bank Nigeria",
+
+    # Citibank
+    "citi": "Citibank Nigeria",
+    "citibank": "Citibank Nigeria",
+
+    # Globus Bank
+    "globus": "Globus Bank",
+    "globus bank": "Globus Bank",
+
+    # SunTrust Bank
+    "suntrust": "SunTrust Bank",
+    "sun trust": "SunTrust Bank",
+
+    # Coronation Bank
+    "coronation": "Coronation Bank",
+    "coronation merchant": "Coronation Bank",
+
+    # Parallex Bank
+    "parallex": "Parallex Bank",
+    "parallex bank": "Parallex Bank",
+
+    # Signature Bank
+    "signature": "Signature Bank",
+    "signature bank": "Signature Bank",
+
+    # Lotus Bank
+    "lotus": "Lotus Bank",
+    "lotus bank": "Lotus Bank",
+
+    # Premium Trust Bank
+    "premium trust": "Premium Trust Bank",
+    "premiumtrust": "Premium Trust Bank",
+
+    # LAPO Microfinance
+    "lapo": "LAPO Microfinance Bank",
+    "lapo mfb": "LAPO Microfinance Bank",
+
+    # Fintechs / Neobanks
+    "kuda": "Kuda Bank",
+    "kuda bank": "Kuda Bank",
+
+    "opay": "OPay",
+    "o pay": "OPay",
+
+    "palmpay": "PalmPay",
+    "palm pay": "PalmPay",
+
+    "moniepoint": "Moniepoint MFB",
+    "monie point": "Moniepoint MFB",
+    "teamapt": "Moniepoint MFB",
+
+    "fairmoney": "FairMoney Microfinance Bank",
+    "fair money": "FairMoney Microfinance Bank",
+
+    "carbon": "Carbon",
+    "one finance": "Carbon",
+
+    "rubies": "Rubies MFB",
+    "rubies bank": "Rubies MFB",
+
+    "sparkle": "Sparkle Microfinance Bank",
+    "sparkle bank": "Sparkle Microfinance Bank",
+
+    "vfd": "VFD Microfinance Bank",
+    "vfd mfb": "VFD Microfinance Bank",
+
+    "eyowo": "Eyowo",
+
+    "paycom": "Opay",
+
+    "paga": "Pagatech",
+
+    "cowrywise": "Cowrywise",
+
+    "piggyvest": "PiggyVest",
+
+    "chipper": "Chipper Cash",
+    "chipper cash": "Chipper Cash",
+}
+
+
+
+
+def normalize(name: str) -> str:
+    """
+    Lowercases a bank name, drops punctuation and the word "bank", and
+    collapses whitespace.
+    """
+    words = re.sub(r"[^a-z0-9]+", " ", name.lower()).split()
+    return " ".join(word for word in words if word != "bank")
+
+
+class BankDirectory:
+    """
+    Paystack's bank list with a precomputed lookup index.
+
+    `match()` resolves free-form input with dictionary lookups only:
+    the whole normalized name, then its word runs (longest first), then
+    words that belong to exactly one bank. Aliases take precedence over
+    Paystack's own names.
+    """
+
+    def __init__(self, codes: dict, fetched_at: float):
+        self.codes = codes
+        self.fetched_at = fetched_at
+        self.names, self.tokens = self._build_index(codes)
+
+    @staticmethod
+    def _build_index(codes):
+        by_lower = {name.lower(): name for name in codes}
+
+        names = {}
+        for alias, official in BANK_ALIASES.items():
+            if official.lower() in by_lower:
+                names.setdefault(normalize(alias), by_lower[official.lower()])
+        for name in codes:
+            names.setdefault(normalize(name), name)
+        names.pop("", None)
+
+        owners = {}
+        for key, name in names.items():
+            for token in key.split():
+                if token not in STOPWORDS:
+                    owners.setdefault(token, set()).add(name)
+        tokens = {token: next(iter(banks)) for token, banks in owners.items() if len(banks) == 1}
+
+        return names, tokens
+
+    def match(self, bank_name: str):
+        """
+        Returns the Paystack name for `bank_name`, or None.
+        """
+        words = normalize(bank_name).split()
+
+        for size in range(len(words), 0, -1):
+            for start in range(len(words) - size + 1):
+                name = self.names.get(" ".join(words[start:start + size]))
+                if name:
+                    return name
+
+        for word in words:
+            name = self.tokens.get(word)
+            if name:
+                return name
+        return None
+
+    def code_for(self, bank_name: str) -> str:
+        """
+        Returns the bank code for `bank_name`.
+
+        Raises ValidationError when the bank is not recognized.
+        """
+        name = self.match(bank_name)
+        if not name:
+            raise ValidationError(f"Bank name '{bank_name}' not recognized or not supported.")
+        return self.codes[name]
+
+    def is_stale(self) -> bool:
+        return time.time() - self.fetched_at > settings.BANK_DIRECTORY_REFRESH_SECONDS
+
+
+_client = None
+_directory = None
+_lock = threading.Lock()
+
+
+def get_client() -> httpx.Client:
+    """
+    Returns the process-wide Paystack client, creating it on first use.
+
+    Connections are pooled and kept alive, and every call is bounded by
+    `PAYSTACK_TIMEOUT_SECONDS`.
+    """
+    global _client
+    if _client is None:
+        with _lock:
+            if _client is None:
+                _client = httpx.Client(
+                    base_url=settings.PAYSTACK_API_URL,
+                    headers={"Authorization": f"Bearer {settings.PAYSTACK_SECRET_KEY}"},
+                    timeout=settings.PAYSTACK_TIMEOUT_SECONDS,
+                )
+    return _client
+
+
+def set_client(client):
+    """
+    Replaces the process-wide Paystack client and drops the loaded directory.
+
+    Tests use this to install a client backed by a fake Paystack.
+    """
+    global _client, _directory
+    with _lock:
+        previous, _client, _directory = _client, client, None
+    if previous is not None:
+        previous.close()
+
+
+def _get(path, **params):
+    """
+    Calls Paystack and returns `(status_code, data)`.
+    """
+    try:
+        response = get_client().get(path, params=params)
+        data = response.json()
+    except httpx.TransportError as exc:
+        logger.warning("Paystack request to %s failed: %s", path, exc)
+        raise ValidationError("Bank verification is temporarily unavailable. Try again shortly.")
+    except ValueError:
+        raise ValidationError(f"API returned non-JSON response: {response.text}")
+    return response.status_code, data
+
+
+def fetch_bank_codes() -> dict:
+    """
+    Fetches the current bank list from Paystack as `{name: code}`.
+    """
+    _, data = _get("/bank", country="nigeria", perPage=100)
+    if not data.get("status"):
+        raise ValidationError("Failed to fetch bank list from Paystack")
+    return {bank["name"]: bank["code"] for bank in data["data"]}
+
+
+def refresh_directory() -> BankDirectory:
+    """
+    Fetches the bank list and stores it in the cache and this process.
+    """
+    global _directory
+    codes = fetch_bank_codes()
+    fetched_at = time.time()
+    cache.set(
+        DIRECTORY_KEY,
+        {"codes": codes, "fetched_at": fetched_at},
+        timeout=settings.BANK_DIRECTORY_TTL_SECONDS,
+    )
+    _directory = BankDirectory(codes, fetched_at)
+    logger.info("Bank directory refreshed with %s banks", len(codes))
+    return _directory
+
+
+def get_directory() -> BankDirectory:
+    """
+    Returns the bank directory, hitting Paystack only when neither this
+    process nor the cache holds a copy.
+
+    A copy older than `BANK_DIRECTORY_REFRESH_SECONDS` is still served
+    while one background refresh replaces it. On a cold cache only one
+    worker fetches the list; the others wait for its copy.
+    """
+    global _directory
+    directory = _directory
+
+    if directory is None or directory.is_stale():
+        stored = cache.get(DIRECTORY_KEY)
+        if stored is None:
+            return _single_flight(
+                LOAD_LOCK_KEY,
+                REFRESH_LOCK_TIMEOUT,
+                settings.BANK_DIRECTORY_WAIT_SECONDS,
+                published=_stored_directory,
+                load=refresh_directory,
+            )
+        if directory is None or stored["fetched_at"] > directory.fetched_at:
+            directory = _directory = BankDirectory(stored["codes"], stored["fetched_at"])
+
+    if directory.is_stale() and cache.add(REFRESH_LOCK_KEY, 1, timeout=REFRESH_LOCK_TIMEOUT):
+        from core.tasks import refresh_bank_directory_task
+
+        try:
+            refresh_bank_directory_task.delay()
+        except (RedisConnectionError, KombuOperationalError):
+            # the stale copy is still served; the refresh is retried once the lock expires
+            logger.warning("Could not queue bank directory refresh", exc_info=True)
+
+    return directory
+
+
+def _stored_directory():
+    global _directory
+    stored = cache.get(DIRECTORY_KEY)
+    if stored is None:
+        return None
+    _directory = BankDirectory(stored["codes"], stored["fetched_at"])
+    return _directory
+
+
+def _single_flight(lock_key, lock_seconds, wait_seconds, published, load):
+    """
+    Runs `load` in one worker at a time and returns its result.
+
+    Other callers poll `published` for the result the loader stores,
+    taking over the lock as soon as it is released without one. After
+    `wait_seconds` a waiter loads regardless.
+    """
+    deadline = time.time() + wait_seconds
+    while True:
+        if cache.add(lock_key, 1, timeout=lock_seconds):
+            try:
+                return load()
+            finally:
+                cache.delete(lock_key)
+
+        if time.time() >= deadline:
+            return load()
+
+        time.sleep(0.05)
+        result = published()
+        if result is not None:
+            return result
+
+
+def resolve_account_name(account_number: str, bank_code: str) -> str:
+    """
+    Resolves the holder name of an account through Paystack.
+
+    Results are shared through the cache: resolved names for
+    `BANK_RESOLVE_TTL_SECONDS`, accounts Paystack rejected for the
+    shorter `BANK_RESOLVE_FAILURE_TTL_SECONDS`. Only one worker calls
+    Paystack for a given account at a time; concurrent duplicates wait
+    for its answer.
+
+    Raises ValidationError when the account cannot be verified.
+    """
+    key = RESOLVE_KEY.format(bank_code=bank_code, account_number=account_number)
+
+    entry = cache.get(key)
+    if entry is None:
+        entry = _resolve_once(key, account_number, bank_code)
+
+    if not entry["ok"]:
+        raise ValidationError(entry["message"])
+    return entry["name"]
+
+
+def _resolve_once(key, account_number, bank_code) -> dict:
+    lock_key = RESOLVE_LOCK_KEY.format(bank_code=bank_code, account_number=account_number)
+
+    # a waiter whose resolver gave up without caching an answer takes over at once
+    return _single_flight(
+        lock_key,
+        settings.BANK_RESOLVE_LOCK_SECONDS,
+        settings.BANK_RESOLVE_WAIT_SECONDS,
+        published=lambda: cache.get(key),
+        load=lambda: _resolve(key, account_number, bank_code),
+    )
+
+
+def _resolve(key, account_number, bank_code) -> dict:
+    status_code, data = _get("/bank/resolve", account_number=account_number, bank_code=bank_code)
+
+    if data.get("status") and "account_name" in (data.get("data") or {}):
+        entry = {"ok": True, "name": data["data"]["account_name"]}
+        cache.set(key, entry, timeout=settings.BANK_RESOLVE_TTL_SECONDS)
+        return entry
+
+    entry = {"ok": False, "message": data.get("message", "Account verification failed")}
+    if status_code in KNOWN_FAILURE_STATUS_CODES:
+        cache.set(key, entry, timeout=settings.BANK_RESOLVE_FAILURE_TTL_SECONDS)
+    return entry
@@ -0,0 +1,78 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import router, transaction
+from django.db.models import F
+
+from accounts.models import Vendor
+
+User = get_user_model()
+
+PRINCIPAL_KEY = "principal:{user_id}"
+
+# The user columns authentication and permission checks rely on
+PRINCIPAL_FIELDS = ("id", "role", "is_staff", "is_active", "email_verified", "version")
+
+
+def get_principal(user_id):
+    """
+    Returns the cached principal of a user, or None if the user does not exist.
+
+    A principal is a small dict of `PRINCIPAL_FIELDS` plus `vendor_id`,
+    loaded with one query on a miss and kept for `PRINCIPAL_CACHE_SECONDS`.
+    """
+    key = PRINCIPAL_KEY.format(user_id=user_id)
+
+    principal = cache.get(key)
+    if principal is None:
+        principal = (
+            User.objects
+            .filter(pk=user_id)
+            .values(*PRINCIPAL_FIELDS, vendor_id=F("vendor_profile__id"))
+            .first()
+        )
+        if principal is None:
+            return None
+        cache.set(key, principal, timeout=settings.PRINCIPAL_CACHE_SECONDS)
+
+    return principal
+
+
+def as_user(principal):
+    """
+    Builds a user instance from a principal without touching the database.
+
+    Only the principal's columns are loaded; any other field is fetched
+    on first access. `vendor_profile` is primed as well, so ownership
+    checks and `hasattr(user, "vendor_profile")` need no query.
+    """
+    db = router.db_for_read(User)
+
+    user = _partial(User, db, {name: principal[name] for name in PRINCIPAL_FIELDS})
+
+    vendor = None
+    if principal["vendor_id"]:
+        vendor = _partial(Vendor, db, {"id": principal["vendor_id"], "user_id": user.pk})
+        Vendor.user.field.set_cached_value(vendor, user)
+    User.vendor_profile.related.set_cached_value(user, vendor)
+
+    return user
+
+
+def _partial(model, db, values):
+    """
+    Returns a model instance with only `values` loaded; the rest are deferred.
+    """
+    fields = [field for field in model._meta.concrete_fields if field.attname in values]
+    return model.from_db(db, [field.attname for field in fields], [values[field.attname] for field in fields])
+
+
+def invalidate(user_id):
+    """
+    Drops a user's cached principal now and again once the current
+    transaction commits, so a concurrent request cannot re-cache the
+    old row.
+    """
+    key = PRINCIPAL_KEY.format(user_id=user_id)
+    cache.delete(key)
+    transaction.on_commit(lambda: cache.delete(key))
@@ -0,0 +1,193 @@
+import hashlib
+import math
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from accounts.models import BlackListAccessToken
+
+import logging
+logger = logging.getLogger(__name__)
+
+REVOKED_KEY = "revoked_jti:{jti}"
+VERSION_KEY = "revoked_jti:version"
+
+
+class BloomFilter:
+    """
+    Fixed-size bloom filter over strings.
+
+    Sized for `capacity` items at the given false-positive rate; it never
+    gives a false negative.
+    """
+
+    def __init__(self, capacity, error_rate):
+        capacity = max(capacity, 1)
+        self.size = max(int(-capacity * math.log(error_rate) / math.log(2) ** 2), 8)
+        self.hashes = max(round(self.size / capacity * math.log(2)), 1)
+        self.bits = bytearray(self.size // 8 + 1)
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], "big"), int.from_bytes(digest[8:], "big")
+        return ((first + index * second) % self.size for index in range(self.hashes))
+
+    def add(self, item):
+        for position in self._positions(item):
+            self.bits[position // 8] |= 1 << (position % 8)
+
+    def __contains__(self, item):
+        return all(self.bits[position // 8] & (1 << (position % 8)) for position in self._positions(item))
+
+
+class _LocalFilter:
+    """
+    This process's copy of the revoked jtis, as a bloom filter.
+
+    Synced from the database when the shared revocation version moves,
+    checked at most every `TOKEN_REVOCATION_SYNC_SECONDS`, and rebuilt
+    every `TOKEN_REVOCATION_REBUILD_SECONDS` so expired tokens drop out.
+
+    Rows can commit out of id order, so each sync re-reads every row
+    revoked since the previous load minus `TOKEN_REVOCATION_SYNC_OVERLAP_SECONDS`.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.bloom = None
+        self.version = None
+        self.loaded_at = None
+        self.checked_at = 0.0
+        self.built_at = 0.0
+
+    def sync(self):
+        now = time.monotonic()
+        if self.bloom is not None and now - self.checked_at < settings.TOKEN_REVOCATION_SYNC_SECONDS:
+            return
+
+        with self.lock:
+            if self.bloom is not None and now - self.checked_at < settings.TOKEN_REVOCATION_SYNC_SECONDS:
+                return
+            self.checked_at = now
+
+            version = cache.get(VERSION_KEY, 0)
+            if self.bloom is None or now - self.built_at > settings.TOKEN_REVOCATION_REBUILD_SECONDS:
+                self._rebuild(version, now)
+            elif version != self.version:
+                overlap = timedelta(seconds=settings.TOKEN_REVOCATION_SYNC_OVERLAP_SECONDS)
+                self._load(BlackListAccessToken.objects.filter(blacklisted_at__gte=self.loaded_at - overlap))
+                self.version = version
+
+    def _rebuild(self, version, now):
+        live = BlackListAccessToken.objects.filter(expires_at__gt=timezone.now())
+        self.bloom = BloomFilter(
+            max(live.count() * 2, settings.TOKEN_REVOCATION_BLOOM_CAPACITY),
+            settings.TOKEN_REVOCATION_BLOOM_ERROR_RATE,
+        )
+        self._load(live)
+        self.version = version
+        self.built_at = now
+
+    def _load(self, rows):
+        loaded_at = timezone.now()
+        for jti in rows.values_list("jti", flat=True).iterator():
+            self.bloom.add(jti)
+        self.loaded_at = loaded_at
+
+    def add(self, jti):
+        with self.lock:
+            if self.bloom is not None:
+                self.bloom.add(jti)
+
+
+_local = _LocalFilter()
+
+
+def revoke(token) -> bool:
+    """
+    Revokes a validated access or refresh token until it expires.
+
+    The jti is recorded in the database, in the cache with a TTL that
+    ends at the token's `exp`, and in this process's bloom filter.
+    Other processes pick it up within `TOKEN_REVOCATION_SYNC_SECONDS` of
+    the surrounding transaction committing.
+
+    Returns whether this call revoked the token. The unique jti makes
+    this an atomic claim, so of two concurrent callers only one gets True.
+    """
+    jti = token["jti"]
+    expires_at = datetime.fromtimestamp(token["exp"], tz=dt_timezone.utc)
+    ttl = int(token["exp"] - time.time()) + 1
+    if ttl <= 0:
+        return False
+
+    _, created = BlackListAccessToken.objects.get_or_create(jti=jti, defaults={"expires_at": expires_at})
+    cache.set(REVOKED_KEY.format(jti=jti), 1, timeout=ttl)
+    _local.add(jti)
+
+    # other processes reload once the row is visible to them
+    transaction.on_commit(_bump_version)
+    return created
+
+
+def _bump_version():
+    if not cache.add(VERSION_KEY, 1, timeout=None):
+        cache.incr(VERSION_KEY)
+
+
+def is_revoked(jti) -> bool:
+    """
+    Returns whether a token id has been revoked.
+
+    Almost every call is answered by the in-memory bloom filter alone;
+    only filter hits are confirmed against the cache, and against the
+    database if the cache entry was evicted.
+    """
+    _local.sync()
+    if jti not in _local.bloom:
+        return False
+
+    key = REVOKED_KEY.format(jti=jti)
+    if cache.get(key):
+        return True
+
+    row = BlackListAccessToken.objects.filter(jti=jti, expires_at__gt=timezone.now()).values("expires_at").first()
+    if row is None:
+        return False
+
+    cache.set(key, 1, timeout=max(int((row["expires_at"] - timezone.now()).total_seconds()), 1))
+    return True
+
+
+def verify_refresh(raw_token) -> RefreshToken:
+    """
+    Validates a refresh token and rejects revoked ones.
+
+    Raises TokenError like `RefreshToken` itself.
+    """
+    refresh = RefreshToken(raw_token)
+    if is_revoked(refresh["jti"]):
+        raise TokenError("Token is blacklisted")
+    return refresh
+
+
+def purge_expired() -> int:
+    """
+    Deletes revocation rows of tokens past their expiry, in batches of
+    `TOKEN_REVOCATION_PURGE_BATCH_SIZE`, and returns how many were removed.
+    """
+    now = timezone.now()
+    expired = BlackListAccessToken.objects.filter(expires_at__lte=now)
+    total = 0
+
+    while ids := list(expired.values_list("id", flat=True)[: settings.TOKEN_REVOCATION_PURGE_BATCH_SIZE]):
+        total += BlackListAccessToken.objects.filter(id__in=ids).delete()[0]
+
+    logger.info("Purged %s expired token revocations", total)
+    return total
@@ -1,6 +1,7 @@
 from django.db import transaction
 from django.contrib.auth import get_user_model
 from accounts.services.email_verification import EmailVerificationService
+from accounts.services import principal
 from core.utils.mail_sender import send_mail_helper
 from asgiref.sync import async_to_sync
 from django.db.models import F
@@ -79,6 +80,7 @@ class UserService:
         if updated == 0:
             raise Exception("Conflict detected.")
 
+        principal.invalidate(user_id)
         return User.objects.get(id=user_id)
 
 
@@ -1,10 +1,10 @@
 from django.db import transaction
 from accounts.models import Vendor, CustomUser
+from accounts.services import principal
 from django.db.models import F
 from products.models import Product
 from collections import defaultdict
-from asgiref.sync import async_to_sync
-from core.utils.mail_sender import send_mail_helper
+from core.utils.mail_sender import send_mail_helper, send_mail_batch
 from core.errors import ConflictException
 import logging
 
@@ -29,6 +29,7 @@ def create_vendor(user, data):
     """
     vendor = Vendor.objects.create(user=user, **data)
     CustomUser.objects.filter(id=user.id).update(role="vendor")
+    principal.invalidate(user.id)
     
     transaction.on_commit(
         lambda: send_mail_helper.delay(
@@ -66,7 +67,9 @@ def update_vendor(vendor_id, data: dict, current_version: int):
     if updated == 0:
         raise ConflictException()
 
-    return Vendor.objects.get(id=vendor_id)
+    vendor = Vendor.objects.get(id=vendor_id)
+    principal.invalidate(vendor.user_id)
+    return vendor
 
 
 @transaction.atomic
@@ -117,6 +120,7 @@ def send_vendor_low_stock_alerts(self, product_ids):
         for product in products:
             products_by_vendor[product.vendor].append(product)
 
+        outbox = []
         for vendor, vendor_products in products_by_vendor.items():
             email = vendor.user.email
             if not email:
@@ -136,11 +140,18 @@ def send_vendor_low_stock_alerts(self, product_ids):
             )
             
             subject = "Low Stock Alert"
-            if async_to_sync(send_mail_helper)(subject, message, email):
-                # Mark all products as alerted
-                Product.objects.filter(
-                    id__in=[p.id for p in vendor_products]
-                ).update(low_stock_alert_sent=True)
+            outbox.append((vendor_products, (subject, message, email)))
+
+        # deliver concurrently, then mark every product whose vendor was reached
+        results = send_mail_batch([mail for _, mail in outbox])
+        alerted_ids = [
+            product.id
+            for (vendor_products, _), result in zip(outbox, results)
+            if result["ok"]
+            for product in vendor_products
+        ]
+        if alerted_ids:
+            Product.objects.filter(id__in=alerted_ids).update(low_stock_alert_sent=True)
 
     except Exception:
         logger.exception("Failed to send vendor low stock alerts")
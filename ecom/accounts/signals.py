@@ -0,0 +1,19 @@
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from accounts.models import CustomUser, Vendor
+from accounts.services import principal
+
+# Instance saves and deletes (admin, shell, services) drop the cached principal;
+# queryset updates bypass these and invalidate explicitly.
+
+
+@receiver(post_save, sender=CustomUser)
+@receiver(post_delete, sender=CustomUser)
+def invalidate_user_principal(sender, instance, **kwargs):
+    principal.invalidate(instance.pk)
+
+
+@receiver(post_save, sender=Vendor)
+@receiver(post_delete, sender=Vendor)
+def invalidate_vendor_principal(sender, instance, **kwargs):
+    principal.invalidate(instance.user_id)
@@ -145,3 +145,133 @@ def test_vendor_cannot_access_other_users_bank_account(api_client, normal_user,
 
 #     assert response.status_code == status.HTTP_200_OK
 #     assert bank.bank_name == "New Bank"
+
+
+@pytest.mark.django_db
+def test_bank_account_creation_resolves_through_cached_directory(api_client, vendor_user, fake_paystack):
+    """
+    Test that bank names resolve through aliases and partial names, and
+    that the bank list is fetched once rather than on every request.
+    """
+    from accounts.services import bank_directory
+
+    fake_paystack.accounts[("0123456789", "058")] = "JOHN DOE"
+    api_client.force_authenticate(user=vendor_user.user)
+
+    response = api_client.post(
+        reverse("bank-account-list"),
+        {"number": "0123456789", "bank_name": "GT Bank"},
+    )
+
+    assert response.status_code == status.HTTP_201_CREATED
+    assert BankAccount.objects.get(vendor=vendor_user).name == "JOHN DOE"
+
+    directory = bank_directory.get_directory()
+    assert directory.match("access bank plc") == "Access Bank"
+    assert directory.match("First Bank") == "First Bank of Nigeria"
+    assert directory.match("monument") == "First City Monument Bank"
+    assert directory.match("Unknown Savings") is None
+
+    assert fake_paystack.requests == ["/bank", "/bank/resolve"]
+
+
+@pytest.mark.django_db
+def test_account_resolution_is_memoized_and_coalesced(fake_paystack):
+    """
+    Test that resolved names and rejected accounts are cached, and that
+    a lookup already in flight elsewhere is awaited rather than repeated.
+    """
+    import threading
+    from django.core.cache import cache
+    from rest_framework.exceptions import ValidationError
+    from accounts.services import bank_directory
+
+    fake_paystack.accounts[("0123456789", "058")] = "JOHN DOE"
+
+    assert bank_directory.resolve_account_name("0123456789", "058") == "JOHN DOE"
+    assert bank_directory.resolve_account_name("0123456789", "058") == "JOHN DOE"
+
+    for _ in range(2):
+        with pytest.raises(ValidationError):
+            bank_directory.resolve_account_name("9999999999", "058")
+
+    assert fake_paystack.requests == ["/bank/resolve", "/bank/resolve"]
+
+    # another worker holds the lock and publishes its answer shortly
+    cache.add(bank_directory.RESOLVE_LOCK_KEY.format(bank_code="044", account_number="1111111111"), 1)
+    publish = threading.Timer(0.1, lambda: cache.set(
+        bank_directory.RESOLVE_KEY.format(bank_code="044", account_number="1111111111"),
+        {"ok": True, "name": "JANE DOE"},
+    ))
+    publish.start()
+
+    assert bank_directory.resolve_account_name("1111111111", "044") == "JANE DOE"
+    publish.join()
+    assert len(fake_paystack.requests) == 2
+
+
+@pytest.mark.django_db
+def test_bank_directory_cold_load_is_single_flight_and_survives_broker_outage(
+    fake_paystack, monkeypatch, settings
+):
+    """
+    Test that a cold load already in flight elsewhere is awaited rather
+    than repeated, and that a failed refresh enqueue still serves the
+    stale copy.
+    """
+    import threading
+    import time
+    from django.core.cache import cache
+    from kombu.exceptions import OperationalError as KombuOperationalError
+    from accounts.services import bank_directory
+    from core.tasks import refresh_bank_directory_task
+
+    # another worker is loading the list and publishes it shortly
+    cache.add(bank_directory.LOAD_LOCK_KEY, 1)
+    publish = threading.Timer(0.1, lambda: cache.set(
+        bank_directory.DIRECTORY_KEY,
+        {"codes": {"Access Bank": "044"}, "fetched_at": time.time()},
+    ))
+    publish.start()
+
+    assert bank_directory.get_directory().code_for("Access Bank") == "044"
+    publish.join()
+    assert fake_paystack.requests == []
+
+    def unavailable():
+        raise KombuOperationalError("broker down")
+
+    monkeypatch.setattr(refresh_bank_directory_task, "delay", unavailable)
+    settings.BANK_DIRECTORY_REFRESH_SECONDS = 0
+    time.sleep(0.01)
+
+    assert bank_directory.get_directory().code_for("Access Bank") == "044"
+    assert fake_paystack.requests == []
+
+
+@pytest.mark.django_db
+def test_account_resolution_waiter_takes_over_when_lock_is_released(fake_paystack, settings):
+    """
+    Test that a waiter resolves the account itself as soon as the other
+    worker releases its lock without caching an answer.
+    """
+    import threading
+    import time
+    from django.core.cache import cache
+    from accounts.services import bank_directory
+
+    settings.BANK_RESOLVE_WAIT_SECONDS = 5
+    fake_paystack.accounts[("2222222222", "057")] = "ADA OBI"
+
+    # the other worker's call fails transiently: lock released, nothing cached
+    lock_key = bank_directory.RESOLVE_LOCK_KEY.format(bank_code="057", account_number="2222222222")
+    cache.add(lock_key, 1)
+    release = threading.Timer(0.1, lambda: cache.delete(lock_key))
+    release.start()
+
+    started = time.monotonic()
+    assert bank_directory.resolve_account_name("2222222222", "057") == "ADA OBI"
+    release.join()
+
+    assert time.monotonic() - started < 1
+    assert fake_paystack.requests == ["/bank/resolve"]
@@ -111,4 +111,207 @@ def test_non_admin_cannot_delete_other_user(api_client, normal_user, admin_user)
     response = api_client.delete(url)
 
     assert response.status_code == status.HTTP_403_FORBIDDEN
-    assert User.objects.filter(id=admin_user.id).exists()
\ No newline at end of file
+    assert User.objects.filter(id=admin_user.id).exists()
+
+@pytest.mark.django_db
+def test_rotated_and_logged_out_tokens_are_revoked(api_client, normal_user):
+    """
+    Test that refreshing rotates the refresh token, and that logging out
+    revokes both the refresh token and the access token in use.
+    """
+    from datetime import timedelta
+    from django.utils import timezone
+    from rest_framework_simplejwt.tokens import RefreshToken
+    from accounts.models import BlackListAccessToken
+    from accounts.services import token_revocation
+
+    original = RefreshToken.for_user(normal_user)
+    refresh_url = reverse("auth-token-refresh-token")
+
+    response = api_client.post(refresh_url, {"refresh_token": str(original)})
+    assert response.status_code == status.HTTP_200_OK
+    rotated = response.data["data"]["refresh"]
+    access = response.data["data"]["access"]
+
+    # the rotated-out refresh token cannot be replayed
+    response = api_client.post(refresh_url, {"refresh_token": str(original)})
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+    detail_url = reverse("user-detail", args=[normal_user.id])
+    assert api_client.get(detail_url).status_code == status.HTTP_200_OK
+
+    response = api_client.post(reverse("auth-token-logout"), {"refresh_token": rotated})
+    assert response.status_code == status.HTTP_200_OK
+
+    assert api_client.get(detail_url).status_code == status.HTTP_401_UNAUTHORIZED
+    api_client.credentials()
+    response = api_client.post(refresh_url, {"refresh_token": rotated})
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    BlackListAccessToken.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+    assert token_revocation.purge_expired() == 3
+
+
+@pytest.mark.django_db
+def test_concurrent_refreshes_of_one_token_rotate_only_once(api_client, normal_user, monkeypatch):
+    """
+    Test that when two refreshes of the same token both pass the
+    revocation check, only the one that claims the revocation succeeds.
+    """
+    from rest_framework_simplejwt.tokens import RefreshToken
+    from accounts.services import token_revocation
+
+    # both requests are checked before either revokes the token
+    monkeypatch.setattr(token_revocation, "is_revoked", lambda jti: False)
+
+    original = str(RefreshToken.for_user(normal_user))
+    refresh_url = reverse("auth-token-refresh-token")
+
+    first = api_client.post(refresh_url, {"refresh_token": original})
+    second = api_client.post(refresh_url, {"refresh_token": original})
+
+    assert first.status_code == status.HTTP_200_OK
+    assert second.status_code == status.HTTP_401_UNAUTHORIZED
+    assert "refresh" not in second.data.get("data", {})
+
+
+@pytest.mark.django_db
+def test_authenticated_requests_resolve_user_and_vendor_from_cached_principal(api_client, vendor_user):
+    """
+    Test that once a principal is cached, authentication and vendor
+    permission checks read no user or vendor rows, and that profile
+    updates invalidate it.
+    """
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from rest_framework_simplejwt.tokens import AccessToken
+    from accounts.services import principal
+    from accounts.services.user_service import UserService
+
+    user = vendor_user.user
+    api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {AccessToken.for_user(user)}")
+    url = reverse("bank-account-list")
+
+    assert api_client.get(url).status_code == status.HTTP_200_OK
+
+    with CaptureQueriesContext(connection) as queries:
+        assert api_client.get(url).status_code == status.HTTP_200_OK
+
+    tables = " ".join(query["sql"] for query in queries.captured_queries)
+    assert "accounts_customuser" not in tables
+    assert "accounts_vendor" not in tables
+
+    assert principal.get_principal(user.pk)["vendor_id"] == vendor_user.pk
+
+    UserService.update_user(user.pk, {"email_verified": False}, user.version)
+    assert principal.get_principal(user.pk)["email_verified"] is False
+
+
+@pytest.mark.django_db
+def test_migration_keeps_simplejwt_blacklisted_tokens_revoked():
+    """
+    Test that unexpired refresh tokens blacklisted by simplejwt, and access
+    tokens revoked before expiries were stored, stay revoked.
+    """
+    import importlib
+    from datetime import timedelta
+    from types import SimpleNamespace
+    from django.apps import apps
+    from django.db import connection
+    from django.utils import timezone
+    from accounts.models import BlackListAccessToken
+
+    migration = importlib.import_module("accounts.migrations.0010_import_simplejwt_blacklist")
+    now = timezone.now()
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"CREATE TABLE {migration.OUTSTANDING_TABLE} "
+            "(id integer PRIMARY KEY, jti varchar(255), expires_at datetime)"
+        )
+        cursor.execute(
+            f"CREATE TABLE {migration.BLACKLISTED_TABLE} "
+            "(id integer PRIMARY KEY, token_id integer, blacklisted_at datetime)"
+        )
+        cursor.executemany(
+            f"INSERT INTO {migration.OUTSTANDING_TABLE} (id, jti, expires_at) VALUES (%s, %s, %s)",
+            [
+                (1, "live-refresh", connection.ops.adapt_datetimefield_value(now + timedelta(days=3))),
+                (2, "expired-refresh", connection.ops.adapt_datetimefield_value(now - timedelta(days=1))),
+            ],
+        )
+        cursor.executemany(
+            f"INSERT INTO {migration.BLACKLISTED_TABLE} (id, token_id, blacklisted_at) VALUES (%s, %s, %s)",
+            [(1, 1, connection.ops.adapt_datetimefield_value(now)), (2, 2, connection.ops.adapt_datetimefield_value(now))],
+        )
+
+    # an access token revoked ten minutes ago, stamped with the earlier migration's time
+    legacy = BlackListAccessToken.objects.create(jti="legacy-access", expires_at=now)
+    BlackListAccessToken.objects.filter(pk=legacy.pk).update(blacklisted_at=now - timedelta(minutes=10))
+
+    migration.import_blacklisted_tokens(apps, SimpleNamespace(connection=connection))
+
+    rows = dict(BlackListAccessToken.objects.values_list("jti", "expires_at"))
+    assert set(rows) == {"legacy-access", "live-refresh"}
+    assert abs(rows["live-refresh"] - (now + timedelta(days=3))) < timedelta(seconds=1)
+    assert abs(rows["legacy-access"] - (now + timedelta(minutes=35))) < timedelta(seconds=1)
+
+
+@pytest.mark.django_db
+def test_revocation_sync_loads_revocations_committed_out_of_order(normal_user, settings, django_capture_on_commit_callbacks):
+    """
+    Test that another process's bloom filter picks up a revocation whose
+    row has a lower id but committed after one it already loaded.
+    """
+    from datetime import timedelta
+    from django.db import transaction
+    from django.utils import timezone
+    from rest_framework_simplejwt.tokens import RefreshToken
+    from accounts.models import BlackListAccessToken
+    from accounts.services import token_revocation
+
+    settings.TOKEN_REVOCATION_SYNC_SECONDS = 0
+    expires_at = timezone.now() + timedelta(hours=1)
+
+    # the slower transaction takes its id first
+    slow = BlackListAccessToken.objects.create(jti="slow", expires_at=expires_at)
+    slow_id = slow.pk
+    slow.delete()
+
+    with django_capture_on_commit_callbacks(execute=True):
+        token_revocation.revoke(RefreshToken.for_user(normal_user))
+
+    other_process = token_revocation._LocalFilter()
+    other_process.sync()
+    assert "slow" not in other_process.bloom
+
+    # ...and commits after the higher id was loaded
+    with django_capture_on_commit_callbacks(execute=True):
+        BlackListAccessToken.objects.create(pk=slow_id, jti="slow", expires_at=expires_at)
+        transaction.on_commit(token_revocation._bump_version)
+
+    other_process.sync()
+    assert "slow" in other_process.bloom
+
+
+@pytest.mark.django_db
+def test_instance_saves_and_deletes_invalidate_cached_principal(vendor_user):
+    """
+    Test that admin-style edits made through save() and delete() drop the
+    cached principal, so a deactivated user or removed vendor is not
+    authorized from stale data.
+    """
+    from accounts.services import principal
+
+    user = vendor_user.user
+    assert principal.get_principal(user.pk)["vendor_id"] == vendor_user.pk
+
+    user.is_active = False
+    user.role = "customer"
+    user.save()
+    cached = principal.get_principal(user.pk)
+    assert (cached["is_active"], cached["role"]) == (False, "customer")
+
+    vendor_user.delete()
+    assert principal.get_principal(user.pk)["vendor_id"] is None
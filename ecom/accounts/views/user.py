@@ -1,7 +1,7 @@
 from rest_framework.viewsets import ModelViewSet
 from rest_framework.viewsets import GenericViewSet
 from rest_framework.permissions import IsAuthenticated, AllowAny
-from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
 from django.core.signing import TimestampSigner, BadSignature, SignatureExpired
 from django.contrib.auth import get_user_model
 from drf_spectacular.utils import extend_schema, OpenApiResponse
@@ -28,6 +28,8 @@ from accounts.services.user_service import (
 )
 from core.permissions import IsAdmin, IsAdminOrSelf, IsEmailVerified
 from accounts.services.email_verification import EmailVerificationService
+from accounts.services import token_revocation
+from accounts.authentication import CachedPrincipalJWTAuthentication
 import logging
 
 logger = logging.getLogger(__name__)
@@ -575,17 +577,14 @@ class AuthTokenViewSet(GenericViewSet):
     serializer_class = AccessTokenRefreshSerializer
     renderer_classes = [JSONRenderer]
     throttle_classes = [ScopedRateThrottle]
+    # only logout authenticates, see its action; get_authenticators runs before `action` is set
+    authentication_classes = []
     
     def get_permissions(self):
         if self.action == "logout":
             return [IsAuthenticated()]
         return [AllowAny()]
 
-    def get_authenticators(self):
-        if self.action == "logout":
-            return [JWTAuthentication()]
-        return []
-    
     def get_throttles(self):
         if self.action == "refresh_token":
             self.throttle_scope = "token_refresh"
@@ -611,7 +610,9 @@ class AuthTokenViewSet(GenericViewSet):
         Refresh an access token.
 
         Validates the provided refresh token and returns
-        a newly generated access token.
+        a newly generated access token. With `ROTATE_REFRESH_TOKENS`
+        a new refresh token is returned as well, and the old one is
+        revoked when `BLACKLIST_AFTER_ROTATION` is set.
         """
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
@@ -619,17 +620,28 @@ class AuthTokenViewSet(GenericViewSet):
         refresh_token = serializer.validated_data["refresh_token"]
 
         try:
-            refresh = RefreshToken(refresh_token)
-            access_token = str(refresh.access_token)
+            refresh = token_revocation.verify_refresh(refresh_token)
+
+            # claiming the revocation settles concurrent refreshes of one token:
+            # whoever loses the claim was checked before the other revoked it
+            rotate = jwt_settings.ROTATE_REFRESH_TOKENS
+            if rotate and jwt_settings.BLACKLIST_AFTER_ROTATION and not token_revocation.revoke(refresh):
+                raise TokenError("Token is blacklisted")
+
+            data = {"access": str(refresh.access_token)}
+
+            if rotate:
+                refresh.set_jti()
+                refresh.set_exp()
+                refresh.set_iat()
+                data["refresh"] = str(refresh)
 
             return Response(
                 {
                     "status": "success",
                     "code": "ACCESS_TOKEN_REFRESHED",
                     "message": "Access token refreshed successfully.",
-                    "data": {
-                        "access": access_token
-                    }
+                    "data": data
                 },
                 status=status.HTTP_200_OK,
             )
@@ -657,18 +669,21 @@ class AuthTokenViewSet(GenericViewSet):
         detail=False,
         methods=["post"],
         url_path="logout",
+        authentication_classes=[CachedPrincipalJWTAuthentication],
     )
     def logout(self, request):
         """
-        Log out a user by blacklisting their refresh token.
+        Log out a user by revoking their refresh token and the access
+        token the request was made with.
         """
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
         try:
             refresh_token = serializer.validated_data["refresh_token"]
-            refresh = RefreshToken(refresh_token)
-            refresh.blacklist()
+            refresh = token_revocation.verify_refresh(refresh_token)
+            token_revocation.revoke(refresh)
+            token_revocation.revoke(request.auth)
 
             return Response(
                 {
@@ -25,13 +25,17 @@ class CartAdmin(admin.ModelAdmin):
     ordering = ("-created_at",)
     list_select_related = ("customer",)
     list_per_page = 25
-    readonly_fields = ("id", "total_amount", "created_at", "updated_at", "last_activity_at")
+    readonly_fields = (
+        "id", "item_count", "subtotal", "discount_total", "total_amount",
+        "created_at", "updated_at", "last_activity_at",
+    )
     raw_id_fields = ("customer",)
     inlines = [CartItemInline]
     actions = ["create_order_from_cart", "confirm_checkout"]
 
     fields = (
         "id", "customer", "status",
+        "item_count", "subtotal", "discount_total",
         "total_amount", "last_activity_at",
         "created_at", "updated_at",
     )
@@ -0,0 +1,104 @@
+import statistics
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from rest_framework.exceptions import ValidationError
+
+from accounts.models import Vendor
+from cart.models import Cart, Checkout
+from cart.services.checkout import CheckoutService
+from orders.models import Order
+from orders.services.order import OrderService
+from products.models import Product
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Runs concurrent checkouts against one scarce product and reports how many "
+        "confirmed checkouts became orders. Everything created is deleted afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--checkouts", type=int, default=200)
+        parser.add_argument("--stock", type=int, default=50)
+        parser.add_argument("--workers", type=int, default=16)
+
+    def handle(self, checkouts, stock, workers, **options):
+        vendor = Vendor.objects.first()
+        if vendor is None:
+            raise CommandError("Create at least one vendor before benchmarking.")
+
+        run = uuid.uuid4().hex[:8]
+        product = Product.objects.create(
+            name=f"Reservation benchmark {run}",
+            description="Scratch product for benchmark_checkout_reservations.",
+            original_price=1000,
+            stock=stock,
+            vendor=vendor,
+        )
+        customers = User.objects.bulk_create(
+            User(
+                email=f"bench-{run}-{position}@example.com",
+                first_name="Bench",
+                last_name=str(position),
+                phone_number=f"+23480{position:08d}",
+            )
+            for position in range(checkouts)
+        )
+
+        carts = []
+        for customer in customers:
+            cart = Cart.objects.create(customer=customer)
+            cart.items.create(product=product, item_quantity=1)
+            Checkout.objects.create(
+                cart=cart, shipping_address="Bench", billing_address="Bench", payment_method="card",
+            )
+            carts.append(cart)
+
+        try:
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                results = list(pool.map(self._checkout, carts))
+            elapsed = time.perf_counter() - started
+
+            product.refresh_from_db()
+        finally:
+            Order.objects.filter(cart__in=carts).delete()
+            Cart.objects.filter(pk__in=[cart.pk for cart in carts]).delete()
+            User.objects.filter(pk__in=[customer.pk for customer in customers]).delete()
+            product.delete()
+
+        confirmed = [result for result in results if result["confirmed"]]
+        ordered = [result for result in confirmed if result["ordered"]]
+        latencies = sorted(result["seconds"] for result in results)
+
+        self.stdout.write(f"{checkouts} checkouts for {stock} units, {workers} workers, {elapsed:.2f}s")
+        self.stdout.write(f"Confirmed: {len(confirmed)}")
+        style = self.style.SUCCESS if len(ordered) == len(confirmed) else self.style.WARNING
+        self.stdout.write(style(f"Orders created from confirmed checkouts: {len(ordered)}/{len(confirmed)}"))
+        self.stdout.write(
+            f"Latency p50 {statistics.median(latencies) * 1000:.1f}ms, "
+            f"p95 {latencies[int(len(latencies) * 0.95) - 1] * 1000:.1f}ms"
+        )
+        self.stdout.write(f"Stock left {product.stock}, still reserved {product.reserved_stock}")
+
+    def _checkout(self, cart):
+        result = {"confirmed": False, "ordered": False}
+        started = time.perf_counter()
+        try:
+            CheckoutService.confirm_checkout(cart)
+            result["confirmed"] = True
+            cart.refresh_from_db()
+            OrderService.create_order_with_cart_recovery(cart)
+            result["ordered"] = True
+        except ValidationError:
+            pass
+        finally:
+            result["seconds"] = time.perf_counter() - started
+            connection.close()
+        return result
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:02
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cart', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='cart',
+            index=models.Index(fields=['customer', 'updated_at'], name='cart_cart_custome_4e89e2_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='checkout',
+            index=models.Index(fields=['created_at'], name='cart_checko_created_e89ba8_idx'),
+        ),
+    ]
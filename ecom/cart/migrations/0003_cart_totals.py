@@ -0,0 +1,79 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:07
+
+from collections import defaultdict
+from decimal import Decimal, ROUND_HALF_UP
+from django.db import migrations, models
+
+
+def backfill_cart_totals(apps, schema_editor):
+    Cart = apps.get_model("cart", "Cart")
+    CartItem = apps.get_model("cart", "CartItem")
+
+    totals = defaultdict(lambda: [Decimal("0"), Decimal("0"), 0])
+    batch = []
+
+    for item in CartItem.objects.select_related("product").iterator(chunk_size=2000):
+        price = Decimal(item.product.original_price)
+        discount_percent = Decimal(item.product.discount_percent or 0)
+        unit_total = (price * (Decimal("100") - discount_percent) / Decimal("100")).quantize(
+            Decimal("0.01"), rounding=ROUND_HALF_UP
+        )
+
+        item.line_subtotal = price * item.item_quantity
+        item.line_total = unit_total * item.item_quantity
+        batch.append(item)
+
+        cart_totals = totals[item.cart_id]
+        cart_totals[0] += item.line_subtotal
+        cart_totals[1] += item.line_subtotal - item.line_total
+        cart_totals[2] += item.item_quantity
+
+        if len(batch) >= 2000:
+            CartItem.objects.bulk_update(batch, ["line_subtotal", "line_total"])
+            batch = []
+
+    if batch:
+        CartItem.objects.bulk_update(batch, ["line_subtotal", "line_total"])
+
+    carts = []
+    for cart_id, (subtotal, discount_total, item_count) in totals.items():
+        carts.append(
+            Cart(id=cart_id, subtotal=subtotal, discount_total=discount_total, item_count=item_count)
+        )
+    Cart.objects.bulk_update(carts, ["subtotal", "discount_total", "item_count"], batch_size=2000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('cart', '0002_cart_cart_cart_custome_4e89e2_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cart',
+            name='discount_total',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='cart',
+            name='item_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='cart',
+            name='subtotal',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='cartitem',
+            name='line_subtotal',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.AddField(
+            model_name='cartitem',
+            name='line_total',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=12),
+        ),
+        migrations.RunPython(backfill_cart_totals, migrations.RunPython.noop),
+    ]
@@ -6,6 +6,7 @@ from products.models import Product
 from decimal import Decimal
 import uuid
 
+
 # Create your models here.
 class Cart(models.Model):
     STATUS_CHOICES = [
@@ -20,6 +21,11 @@ class Cart(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     last_activity_at = models.DateTimeField(default=timezone.now)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="unpaid")
+
+    # running totals maintained by CartTotalsService
+    subtotal = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    discount_total = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    item_count = models.PositiveIntegerField(default=0)
     
     class Meta:
         constraints = [
@@ -29,6 +35,9 @@ class Cart(models.Model):
                 name="unique_unpaid_cart_per_customer",
             )
         ]
+        indexes = [
+            models.Index(fields=["customer", "updated_at"]),
+        ]
         
     def __str__(self):
         return f"Cart - {self.customer.email} - {self.status}"
@@ -36,9 +45,9 @@ class Cart(models.Model):
     @property
     def total_amount(self):
         """
-        Returns the sum of cartItems associated to a cart
+        Returns the payable amount of the cart from its maintained totals.
         """
-        return sum(item.total_amount for item in self.items.all())
+        return self.subtotal - self.discount_total
     
     def invalidate(self, reason: str | None = None):
         """
@@ -56,6 +65,8 @@ class CartItem(models.Model):
     cart = models.ForeignKey(Cart, on_delete=models.CASCADE, related_name="items")
     product = models.ForeignKey(Product, on_delete=models.CASCADE)
     item_quantity = models.PositiveIntegerField(default=1)
+    line_subtotal = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    line_total = models.DecimalField(max_digits=12, decimal_places=2, default=0)
     last_activity_at = models.DateTimeField(default=timezone.now)
     updated_at = models.DateTimeField(auto_now=True)
     created_at = models.DateTimeField(auto_now_add=True)
@@ -71,6 +82,15 @@ class CartItem(models.Model):
     def __str__(self):
         return f"CartItem - {self.cart.customer.email}"
         
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._remember_line()
+        return instance
+
+    def _remember_line(self):
+        self._stored_line = (self.line_subtotal, self.line_total, self.item_quantity)
+
     def append_quantity(self, quantity: int):
         if self.cart.status != "unpaid":
             raise ValidationError("This cart can no longer be modified.")
@@ -78,17 +98,16 @@ class CartItem(models.Model):
         self.item_quantity += quantity
         self.save(update_fields=["item_quantity"])
 
+    def price_line(self):
+        """
+        Recomputes the stored line amounts from the product's current price.
+        """
+        self.line_subtotal = Decimal(self.product.original_price) * self.item_quantity
+        self.line_total = self.product.effective_price * self.item_quantity
+
     @property
     def total_amount(self):
-        price = self.product.original_price
-        quantity = self.item_quantity
-
-        if self.product.discount_percent:
-            discount = Decimal(self.product.discount_percent) / Decimal("100")
-            discounted_price = price * (Decimal("1") - discount)
-            return discounted_price * quantity
-
-        return price * quantity
+        return self.line_total
     
     def clean(self):
         if self.cart.status != "unpaid":
@@ -98,7 +117,35 @@ class CartItem(models.Model):
             
     def save(self, *args, **kwargs):
         self.full_clean()  # forces clean() to run
+        self.price_line()
+
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None:
+            kwargs["update_fields"] = {*update_fields, "line_subtotal", "line_total"}
+
         super().save(*args, **kwargs)
+
+        from cart.services.cart_totals import CartTotalsService
+
+        # apply only the difference to the cart's running totals
+        subtotal, total, quantity = getattr(self, "_stored_line", (0, 0, 0))
+        CartTotalsService.apply_line_change(
+            self.cart,
+            self.line_subtotal - subtotal,
+            self.line_total - total,
+            self.item_quantity - quantity,
+        )
+        self._remember_line()
+
+    def delete(self, *args, **kwargs):
+        result = super().delete(*args, **kwargs)
+
+        from cart.services.cart_totals import CartTotalsService
+
+        subtotal, total, quantity = getattr(self, "_stored_line", (0, 0, 0))
+        CartTotalsService.apply_line_change(self.cart, -subtotal, -total, -quantity)
+        self._remember_line()
+        return result
     
 class Checkout(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -113,5 +160,39 @@ class Checkout(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_at"]),
+        ]
+    
+    def __str__(self):
+        return f"Checkout - {self.cart.customer.email}"
+
+class StockReservation(models.Model):
+    """
+    Stock held for a confirmed checkout.
+
+    Claimed at confirmation, converted into a stock decrement when the
+    order is created, and released when the checkout expires. The held
+    quantity is mirrored in `Product.reserved_stock`.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    cart = models.ForeignKey(Cart, on_delete=models.CASCADE, related_name="reservations")
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="reservations")
+    quantity = models.PositiveIntegerField()
+    expires_at = models.DateTimeField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["cart", "product"],
+                name="unique_reservation_per_cart_product",
+            )
+        ]
+        indexes = [
+            models.Index(fields=["expires_at"]),
+        ]
+
     def __str__(self):
-        return f"Checkout - {self.cart.customer.email}"
\ No newline at end of file
+        return f"StockReservation - {self.product_id} x {self.quantity}"
@@ -15,7 +15,7 @@ class CartSerializer(serializers.ModelSerializer):
     """
     items = CartItemSerializer(many=True, read_only=True)
     total_amount = serializers.DecimalField(
-        max_digits=10, decimal_places=2, read_only=True
+        max_digits=12, decimal_places=2, read_only=True
     )
 
     class Meta:
@@ -24,7 +24,10 @@ class CartSerializer(serializers.ModelSerializer):
             "id",
             "status",
             "items",
+            "item_count",
+            "subtotal",
+            "discount_total",
             "total_amount",
             "updated_at",
         )
-        read_only_fields = ("status",)
+        read_only_fields = ("status", "item_count", "subtotal", "discount_total")
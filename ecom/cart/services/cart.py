@@ -1,5 +1,8 @@
 from django.db import transaction
 from cart.models import Cart
+from cart.services.hot_cart import HotCartStore
+from cart.services.reservations import ReservationService
+from core.services import activity, batch_expiry
 from datetime import timedelta
 from django.utils import timezone
 from django.db import transaction
@@ -24,14 +27,45 @@ class CartService:
         """
         Expires a cart unless it is already paid or expired.
 
-        Marks the cart as invalid with the provided reason.
+        Marks the cart as invalid with the provided reason and releases
+        any stock it holds.
         """
         if cart.status in ("paid", "expired"):
             return
 
+        HotCartStore.evict(cart.pk)
+        ReservationService.release([cart.pk])
         cart.invalidate(reason=reason)
         return True
 
+    @staticmethod
+    @transaction.atomic
+    def expire_carts(cart_ids, active_since=None) -> int:
+        """
+        Expires many carts with one UPDATE and returns how many changed.
+
+        Carts touched at or after `active_since` while this ran (buffered
+        activity or hot cart mutations not yet written) are left alone. Paid or expired carts
+        are never changed. Stock reserved by the expired carts is released.
+        """
+        if active_since is not None:
+            recent = activity.touched_since(Cart, cart_ids, active_since)
+            recent |= HotCartStore.touched_since(cart_ids, active_since)
+            cart_ids = [cart_id for cart_id in cart_ids if cart_id not in recent]
+
+        if HotCartStore.is_enabled():
+            for cart_id in cart_ids:
+                HotCartStore.evict(cart_id)
+
+        expired = (
+            Cart.objects
+            .filter(pk__in=cart_ids)
+            .exclude(status__in=("paid", "expired"))
+            .update(status="expired")
+        )
+        ReservationService.release(cart_ids)
+        return expired
+
     @staticmethod
     @transaction.atomic
     def get_or_create_cart(user):
@@ -39,9 +73,12 @@ class CartService:
         Returns an active cart for the user or creates a new one.
 
         Reuses recent unpaid or pending carts within the configured TTL.
+        Stored activity may lag by up to `ACTIVITY_FLUSH_SECONDS`, so the
+        candidate is widened by that bound and re-checked with buffered touches.
         """
         CART_TTL_HOURS = settings.CART_TTL_HOURS
         expiry_time = timezone.now() - timedelta(hours=CART_TTL_HOURS)
+        staleness = timedelta(seconds=settings.ACTIVITY_FLUSH_SECONDS)
 
         cart = (
             Cart.objects
@@ -49,13 +86,13 @@ class CartService:
             .filter(
                 customer=user,
                 status__in=("unpaid", "pending"),
-                last_activity_at__gte=expiry_time,
+                last_activity_at__gte=expiry_time - staleness,
             )
             .order_by("-last_activity_at")
             .first()
         )
 
-        if cart:
+        if cart and activity.last_seen(cart) >= expiry_time:
             return cart
 
         return Cart.objects.create(
@@ -70,25 +107,25 @@ class CartService:
         Expires carts that have been inactive beyond the configured TTL.
 
         Designed to run periodically and safely invalidate abandoned carts.
+        Carts are expired in locked chunks, so several workers can sweep
+        in parallel.
         """
         try:
             CART_TTL_HOURS = settings.CART_TTL_HOURS
             expiry_time = timezone.now() - timedelta(hours=CART_TTL_HOURS)
 
+            # write buffered activity first so the TTL check sees it
+            activity.flush(Cart)
+
             carts = Cart.objects.filter(
                 status__in=("unpaid", "pending"),
                 last_activity_at__lt=expiry_time,
             )
-            
-            if carts:
-                logger.info("Found %s carts to invalidate", carts.count())
-                count = 0
-                
-                for cart in carts.iterator():
-                    if CartService.expire_cart(cart, reason="Cart inactive beyond TTL"):
-                        count+=1
-                    
-                logger.info(f"Carts Invalidation Completed for {count} users")
+
+            count = batch_expiry.sweep(
+                carts, lambda ids: CartService.expire_carts(ids, active_since=expiry_time)
+            )
+            logger.info(f"Carts Invalidation Completed for {count} users")
                 
         except (OperationalError, RedisConnectionError, KombuOperationalError) as exc:
             logger.error("Transient failure in cleanup_abandoned_carts", exc_info=True)
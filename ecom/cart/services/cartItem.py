@@ -5,7 +5,7 @@ from rest_framework.exceptions import ValidationError
 from cart.models import Cart, CartItem
 from products.models import Product
 from cart.services.cart_guards import assert_cart_is_modifiable
-from django.utils import timezone
+from core.services import activity
 
 
 class CartItemService:
@@ -103,6 +103,7 @@ class CartItemService:
     def record_cart_activity(cart):
         """
         Updates the cart's last activity timestamp.
+
+        The write is buffered and coalesced with other touches.
         """
-        cart.last_activity_at = timezone.now()
-        cart.save(update_fields=["last_activity_at"])
\ No newline at end of file
+        activity.touch(cart)
\ No newline at end of file
@@ -0,0 +1,102 @@
+from decimal import Decimal
+from django.db.models import (
+    F, Sum, Value, OuterRef, Subquery, DecimalField, IntegerField, ExpressionWrapper,
+)
+from django.db.models.functions import Coalesce
+
+from cart.models import Cart, CartItem
+from products.models import Product
+
+MONEY = DecimalField(max_digits=12, decimal_places=2)
+
+# Carts whose totals still follow live product prices
+REPRICEABLE_CART_STATES = ("unpaid", "pending")
+
+
+class CartTotalsService:
+    """
+    Keeps the denormalized cart totals in step with cart items.
+
+    Item mutations apply their difference to the cart row with a single
+    F-expression UPDATE, while price changes rebuild the affected lines
+    and carts with set-based statements.
+    """
+
+    @staticmethod
+    def apply_line_change(cart: Cart, subtotal_delta, total_delta, quantity_delta):
+        """
+        Applies a line-level change to the cart's running totals.
+
+        Deltas are added in the database, so concurrent mutations on the
+        same cart never overwrite each other.
+        """
+        subtotal_delta = Decimal(subtotal_delta)
+        discount_delta = subtotal_delta - Decimal(total_delta)
+
+        Cart.objects.filter(pk=cart.pk).update(
+            subtotal=F("subtotal") + subtotal_delta,
+            discount_total=F("discount_total") + discount_delta,
+            item_count=F("item_count") + quantity_delta,
+        )
+
+        # keep in-memory instance in sync
+        cart.subtotal += subtotal_delta
+        cart.discount_total += discount_delta
+        cart.item_count += quantity_delta
+
+    @staticmethod
+    def rebuild(cart_ids):
+        """
+        Recomputes line amounts and cart totals from current product prices.
+        """
+        product = Product.objects.filter(pk=OuterRef("product_id"))
+
+        CartItem.objects.filter(cart_id__in=cart_ids).update(
+            line_subtotal=ExpressionWrapper(
+                Subquery(product.values("original_price")) * F("item_quantity"),
+                output_field=MONEY,
+            ),
+            line_total=ExpressionWrapper(
+                Subquery(product.values("effective_price")) * F("item_quantity"),
+                output_field=MONEY,
+            ),
+        )
+
+        items = CartItem.objects.filter(cart=OuterRef("pk")).order_by().values("cart")
+
+        def _sum(expression, output_field):
+            return Coalesce(
+                Subquery(items.annotate(total=Sum(expression)).values("total"), output_field=output_field),
+                Value(0),
+                output_field=output_field,
+            )
+
+        Cart.objects.filter(id__in=cart_ids).update(
+            subtotal=_sum("line_subtotal", MONEY),
+            discount_total=_sum(F("line_subtotal") - F("line_total"), MONEY),
+            item_count=_sum("item_quantity", IntegerField()),
+        )
+
+    @staticmethod
+    def reprice_product(product_id):
+        """
+        Rebuilds the totals of every open cart holding the given product.
+
+        Called after a product's price or discount changes.
+        """
+        CartTotalsService.reprice_products([product_id])
+
+    @staticmethod
+    def reprice_products(product_ids):
+        """
+        Rebuilds the totals of every open cart holding any of the given products.
+        """
+        cart_ids = list(
+            CartItem.objects
+            .filter(product_id__in=product_ids, cart__status__in=REPRICEABLE_CART_STATES)
+            .values_list("cart_id", flat=True)
+            .distinct()
+        )
+
+        if cart_ids:
+            CartTotalsService.rebuild(cart_ids)
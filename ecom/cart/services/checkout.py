@@ -11,6 +11,10 @@ from django.conf import settings
 from django.utils import timezone
 from cart.models import Checkout
 from cart.services.cart import CartService
+from cart.services.hot_cart import HotCartStore
+from cart.services.reservations import ReservationService
+from core.errors import InsufficientStockError
+from core.services import batch_expiry
 from django.db import OperationalError
 from redis.exceptions import ConnectionError as RedisConnectionError
 from kombu.exceptions import OperationalError as KombuOperationalError
@@ -61,12 +65,16 @@ class CheckoutService:
         """
         Confirm the checkout and lock the associated cart.
 
-        Validates required checkout fields and transitions the cart
+        Validates required checkout fields, reserves the stock of every
+        line until the checkout TTL runs out, and transitions the cart
         into a locked state, preventing further modifications.
         """
         cart = Cart.objects.select_for_update().get(pk=cart.pk)
         
         assert_cart_is_modifiable(cart)
+
+        # Persist and drop any Redis-held items before the cart is locked
+        HotCartStore.evict(cart.pk)
         
         try:
             checkout = cart.checkout
@@ -88,26 +96,18 @@ class CheckoutService:
         if not cart.items.exists():
             raise ValidationError("Cannot create an order from an empty cart.")
         
-        errors = []
-
-        for item in cart.items.select_related("product"):
-            product = item.product
-            if item.item_quantity > product.stock:
-                errors.append(
-                    {
-                        "product_id": str(product.id),
-                        "product_name": product.name,
-                        "requested_quantity": item.item_quantity,
-                        "available_stock": product.stock,
-                    }
-                )
-
-        if errors:
+        # Hold the stock now, so order creation converts the reservation
+        # instead of competing for whatever is left
+        quantities = dict(cart.items.values_list("product_id", "item_quantity"))
+        try:
+            ReservationService.reserve(cart, quantities)
+
+        except InsufficientStockError as exc:
             raise ValidationError(
                 {
                     "code": "INSUFFICIENT_STOCK",
                     "message": "Some items exceed available stock.",
-                    "items": errors,
+                    "items": exc.items,
                 }
             )
 
@@ -121,30 +121,24 @@ class CheckoutService:
         """
         Expires pending checkouts that exceed the configured TTL.
 
-        Identifies inactive checkouts and expires their carts
-        via the CartService to enforce proper lifecycle rules.
+        Identifies inactive checkouts and expires their carts in locked
+        chunks via the CartService to enforce proper lifecycle rules,
+        releasing their stock reservations. Reservations past their own
+        expiry are released as well.
         """
         try:
             CHECKOUT_TTL_HOURS = settings.CHECKOUT_TTL_HOURS
             expiry_time = timezone.now() - timedelta(hours=CHECKOUT_TTL_HOURS)
 
-            checkouts = Checkout.objects.filter(
-                cart__status="pending",
-                created_at__lt=expiry_time,
+            carts = Cart.objects.filter(
+                status="pending",
+                checkout__created_at__lt=expiry_time,
             )
-            
-            if checkouts:
-                logger.info("Found %s checkouts to invalidate", checkouts.count())
-                count = 0
-                
-                for checkout in checkouts.iterator():
-                    if CartService.expire_cart(
-                        checkout.cart,
-                        reason="Checkout inactive beyond TTL",
-                    ):
-                        count+=1
-                    
-                logger.info(f"Carts Invalidation Completed for {count} users")
+
+            count = batch_expiry.sweep(carts, CartService.expire_carts)
+            logger.info(f"Carts Invalidation Completed for {count} users")
+
+            ReservationService.release_expired()
 
         except (OperationalError, RedisConnectionError, KombuOperationalError) as exc:
             # transient infra failure → retry
@@ -0,0 +1,402 @@
+import time
+import uuid
+import redis
+from django.conf import settings
+from django.db import transaction
+from django.http import Http404
+from datetime import datetime, timezone as dt_timezone
+from django.core.exceptions import ValidationError as DjangoValidationError
+from rest_framework.exceptions import ValidationError
+
+from cart.models import Cart, CartItem
+from products.models import Product
+from cart.services.cart_guards import assert_cart_is_modifiable
+from cart.services.cartItem import CartItemService
+from core.services import activity
+from django.db import OperationalError
+from redis.exceptions import ConnectionError as RedisConnectionError
+from kombu.exceptions import OperationalError as KombuOperationalError
+
+import logging
+logger = logging.getLogger(__name__)
+
+USER_KEY = "cart:hot:user:{user_id}"
+META_KEY = "cart:hot:{cart_id}:meta"
+ITEMS_KEY = "cart:hot:{cart_id}:items"        # product_id -> quantity
+ITEM_IDS_KEY = "cart:hot:{cart_id}:item_ids"  # product_id -> cart item id
+PRODUCTS_KEY = "cart:hot:{cart_id}:products"  # cart item id -> product_id
+DIRTY_KEY = "cart:hot:dirty"
+
+# Every mutation first checks the meta key, so a cart that was evicted
+# (checkout, expiry) can never receive a late write in Redis.
+ADD_ITEM_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then return false end
+local item_id = redis.call('HGET', KEYS[3], ARGV[1])
+local created = 0
+if not item_id then
+    item_id = ARGV[3]
+    created = 1
+    redis.call('HSET', KEYS[3], ARGV[1], item_id)
+    redis.call('HSET', KEYS[4], item_id, ARGV[1])
+end
+local quantity = redis.call('HINCRBY', KEYS[2], ARGV[1], ARGV[2])
+redis.call('HSET', KEYS[1], 'touched_at', ARGV[5])
+redis.call('SADD', KEYS[5], ARGV[4])
+for i = 1, 4 do redis.call('EXPIRE', KEYS[i], ARGV[6]) end
+return {item_id, quantity, created}
+"""
+
+SET_QUANTITY_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then return false end
+local product_id = redis.call('HGET', KEYS[4], ARGV[1])
+if not product_id then return '' end
+if tonumber(ARGV[2]) <= 0 then
+    redis.call('HDEL', KEYS[2], product_id)
+    redis.call('HDEL', KEYS[3], product_id)
+    redis.call('HDEL', KEYS[4], ARGV[1])
+else
+    redis.call('HSET', KEYS[2], product_id, ARGV[2])
+end
+redis.call('HSET', KEYS[1], 'touched_at', ARGV[4])
+redis.call('SADD', KEYS[5], ARGV[3])
+for i = 1, 4 do redis.call('EXPIRE', KEYS[i], ARGV[5]) end
+return product_id
+"""
+
+SNAPSHOT_SCRIPT = """
+if redis.call('EXISTS', KEYS[1]) == 0 then return false end
+local touched_at = redis.call('HGET', KEYS[1], 'touched_at') or ''
+local items = redis.call('HGETALL', KEYS[2])
+local item_ids = redis.call('HGETALL', KEYS[3])
+redis.call('SREM', KEYS[5], ARGV[1])
+if ARGV[2] == '1' then
+    redis.call('DEL', KEYS[1], KEYS[2], KEYS[3], KEYS[4])
+end
+return {touched_at, items, item_ids}
+"""
+
+_pool = None
+_scripts = {}
+
+
+def _script(source):
+    """
+    Returns the Script for a Lua source, registered once per process.
+
+    Scripts only hold the source and its SHA; the client is passed at call time.
+    """
+    script = _scripts.get(source)
+    if script is None:
+        script = _scripts[source] = _client().register_script(source)
+    return script
+
+
+def _client():
+    global _pool
+    if _pool is None:
+        _pool = redis.ConnectionPool.from_url(settings.CART_HOT_STORE_URL, decode_responses=True)
+    return redis.Redis(connection_pool=_pool)
+
+
+def _keys(cart_id):
+    return [
+        META_KEY.format(cart_id=cart_id),
+        ITEMS_KEY.format(cart_id=cart_id),
+        ITEM_IDS_KEY.format(cart_id=cart_id),
+        PRODUCTS_KEY.format(cart_id=cart_id),
+        DIRTY_KEY,
+    ]
+
+
+def _pairs(flat):
+    return dict(zip(flat[::2], flat[1::2]))
+
+
+class HotCartStore:
+    """
+    Optional Redis-backed store for active (unpaid) carts.
+
+    Item mutations only touch Redis hashes; the rows in `Cart`/`CartItem`
+    are written behind by `flush_dirty_carts` and synchronously when the
+    cart leaves the unpaid state (checkout confirmation or expiry), so
+    every state transition still runs against the database.
+
+    Exposes the same `add_item`/`update_item`/`remove_item` contract as
+    `CartItemService`. Enabled with `CART_HOT_STORE_ENABLED`.
+    """
+
+    @staticmethod
+    def is_enabled() -> bool:
+        return settings.CART_HOT_STORE_ENABLED
+
+    @staticmethod
+    def ttl_seconds() -> int:
+        return settings.CART_TTL_HOURS * 3600
+
+    @staticmethod
+    def get_cart(user) -> Cart:
+        """
+        Returns the user's active cart, loading it into Redis when unpaid.
+
+        A cart already held in Redis is returned without a database query.
+        """
+        from cart.services.cart import CartService
+
+        client = _client()
+        cart_id = client.get(USER_KEY.format(user_id=user.pk))
+
+        if cart_id and client.exists(META_KEY.format(cart_id=cart_id)):
+            cart = Cart(id=cart_id, customer_id=user.pk, status="unpaid")
+            cart._state.adding = False
+            return cart
+
+        cart = CartService.get_or_create_cart(user)
+        if cart.status == "unpaid":
+            HotCartStore.load(cart)
+        return cart
+
+    @staticmethod
+    def load(cart: Cart):
+        """
+        Seeds Redis with the cart's persisted items.
+        """
+        items = list(cart.items.values_list("id", "product_id", "item_quantity"))
+        keys = _keys(cart.pk)
+        ttl = HotCartStore.ttl_seconds()
+
+        pipe = _client().pipeline()
+        pipe.delete(*keys[:4])
+        pipe.hset(keys[0], mapping={"customer_id": str(cart.customer_id), "touched_at": ""})
+        if items:
+            pipe.hset(keys[1], mapping={str(p): q for _, p, q in items})
+            pipe.hset(keys[2], mapping={str(p): str(i) for i, p, _ in items})
+            pipe.hset(keys[3], mapping={str(i): str(p) for i, p, _ in items})
+        for key in keys[:4]:
+            pipe.expire(key, ttl)
+        pipe.set(USER_KEY.format(user_id=cart.customer_id), str(cart.pk), ex=ttl)
+        pipe.execute()
+
+    @staticmethod
+    def add_item(cart: Cart, product_id, quantity=1):
+        """
+        Adds a product to the hot cart or increases its quantity.
+        """
+        assert_cart_is_modifiable(cart)
+
+        product = _get_product(product_id)
+
+        result = _script(ADD_ITEM_SCRIPT)(
+            keys=_keys(cart.pk),
+            args=[str(product.pk), quantity, str(uuid.uuid4()), str(cart.pk), time.time(), HotCartStore.ttl_seconds()],
+            client=_client(),
+        )
+        if result is None:
+            # evicted since it was read; the database path enforces the new state
+            return CartItemService.add_item(Cart.objects.get(pk=cart.pk), product_id, quantity)
+
+        item_id, item_quantity, created = result
+        return _build_item(cart, item_id, product, int(item_quantity)), not int(created)
+
+    @staticmethod
+    def update_item(cart: Cart, cart_item_id, quantity):
+        """
+        Sets the quantity of a hot cart item, removing it when <= 0.
+        """
+        assert_cart_is_modifiable(cart)
+
+        if quantity is None:
+            raise ValidationError("Item quantity is required.")
+
+        product_id = HotCartStore._set_quantity(cart, cart_item_id, quantity)
+        if product_id is None:
+            return CartItemService.update_item(Cart.objects.get(pk=cart.pk), cart_item_id, quantity)
+
+        if quantity <= 0:
+            return None
+
+        return _build_item(cart, cart_item_id, _get_product(product_id), quantity)
+
+    @staticmethod
+    def remove_item(cart: Cart, cart_item_id):
+        """
+        Removes an item from the hot cart.
+        """
+        assert_cart_is_modifiable(cart)
+
+        if HotCartStore._set_quantity(cart, cart_item_id, 0) is None:
+            CartItemService.remove_item(Cart.objects.get(pk=cart.pk), cart_item_id)
+
+    @staticmethod
+    def _set_quantity(cart, cart_item_id, quantity):
+        product_id = _script(SET_QUANTITY_SCRIPT)(
+            keys=_keys(cart.pk),
+            args=[str(cart_item_id), quantity, str(cart.pk), time.time(), HotCartStore.ttl_seconds()],
+            client=_client(),
+        )
+        if product_id == "":
+            raise Http404("No CartItem matches the given query.")
+        return product_id
+
+    @staticmethod
+    def list_items(cart: Cart):
+        """
+        Returns the hot cart's items as unsaved, priced `CartItem` instances.
+        """
+        client = _client()
+        pipe = client.pipeline()
+        pipe.hgetall(ITEMS_KEY.format(cart_id=cart.pk))
+        pipe.hgetall(ITEM_IDS_KEY.format(cart_id=cart.pk))
+        quantities, item_ids = pipe.execute()
+
+        products = Product.objects.in_bulk(list(quantities))
+        items = []
+        for product_id, quantity in quantities.items():
+            product = products.get(uuid.UUID(product_id))
+            if product is not None:
+                items.append(_build_item(cart, item_ids[product_id], product, int(quantity)))
+        return items
+
+    @staticmethod
+    def flush(cart_id, *, evict=False):
+        """
+        Writes the cart's Redis state to the database.
+
+        With `evict=True` the Redis entry is removed in the same atomic
+        step, so later mutations fall through to the database path.
+        Returns False when the cart was not held in Redis.
+        """
+        snapshot = _script(SNAPSHOT_SCRIPT)(
+            keys=_keys(cart_id), args=[str(cart_id), "1" if evict else "0"], client=_client()
+        )
+        if snapshot is None:
+            return False
+
+        touched_at, quantities, item_ids = snapshot
+        HotCartStore._persist(cart_id, _pairs(quantities), _pairs(item_ids), touched_at)
+        return True
+
+    @staticmethod
+    def evict(cart_id):
+        """
+        Persists and drops a cart from Redis before it leaves the unpaid state.
+        """
+        if HotCartStore.is_enabled():
+            HotCartStore.flush(cart_id, evict=True)
+
+    @staticmethod
+    def flush_if_dirty(cart_id):
+        """
+        Persists pending changes so database reads of the cart are current.
+
+        Returns True when the cart rows were rewritten.
+        """
+        if HotCartStore.is_enabled() and _client().sismember(DIRTY_KEY, str(cart_id)):
+            return HotCartStore.flush(cart_id)
+        return False
+
+    @staticmethod
+    def touched_since(cart_ids, since) -> set:
+        """
+        Returns the ids among `cart_ids` mutated in Redis at or after `since`.
+
+        Hot cart mutations only reach `last_activity_at` when the cart is
+        flushed, so expiry sweeps check here as well.
+        """
+        if not HotCartStore.is_enabled() or not cart_ids:
+            return set()
+
+        pipe = _client().pipeline()
+        for cart_id in cart_ids:
+            pipe.hget(META_KEY.format(cart_id=cart_id), "touched_at")
+
+        threshold = since.timestamp()
+        return {
+            cart_id
+            for cart_id, touched_at in zip(cart_ids, pipe.execute())
+            if touched_at and float(touched_at) >= threshold
+        }
+
+    @staticmethod
+    @transaction.atomic
+    def _persist(cart_id, quantities, item_ids, touched_at):
+        """
+        Reconciles `CartItem` rows with a Redis snapshot of the cart.
+
+        Rows are saved through the model, so the cart's running totals
+        stay consistent.
+        """
+        cart = Cart.objects.select_for_update().filter(pk=cart_id).first()
+        if cart is None or cart.status != "unpaid":
+            logger.warning("Dropping hot cart %s snapshot; cart is no longer unpaid", cart_id)
+            return
+
+        existing = {str(item.product_id): item for item in cart.items.select_related("product")}
+        new_products = Product.objects.in_bulk([p for p in quantities if p not in existing])
+
+        for product_id, item in existing.items():
+            if product_id not in quantities:
+                item.delete()
+            elif item.item_quantity != int(quantities[product_id]):
+                item.item_quantity = int(quantities[product_id])
+                item.save(update_fields=["item_quantity"])
+
+        for product_id, quantity in quantities.items():
+            product = new_products.get(uuid.UUID(product_id))
+            if product_id in existing or product is None:
+                continue
+            try:
+                CartItem(id=item_ids[product_id], cart=cart, product=product, item_quantity=int(quantity)).save()
+            except DjangoValidationError:
+                logger.warning("Skipping invalid hot cart line %s/%s", cart_id, product_id, exc_info=True)
+
+        if touched_at:
+            activity.touch(cart, at=datetime.fromtimestamp(float(touched_at), tz=dt_timezone.utc))
+
+    @staticmethod
+    def flush_dirty_carts(self, batch_size=500):
+        """
+        Write-behind job: persists every cart mutated since the last run.
+
+        Transient infrastructure errors trigger a retry.
+        """
+        if not HotCartStore.is_enabled():
+            return
+
+        try:
+            count = 0
+            client = _client()
+            while cart_ids := client.spop(DIRTY_KEY, batch_size):
+                for index, cart_id in enumerate(cart_ids):
+                    try:
+                        HotCartStore.flush(cart_id)
+                    except Exception:
+                        # hand the unflushed carts back for the retry
+                        client.sadd(DIRTY_KEY, *cart_ids[index:])
+                        raise
+                    count += 1
+
+            logger.info("Hot cart flush completed for %s carts", count)
+
+        except (OperationalError, RedisConnectionError, KombuOperationalError) as exc:
+            logger.error("Transient failure in flush_dirty_carts", exc_info=True)
+            raise self.retry(exc=exc, countdown=15)
+
+        except Exception:
+            logger.critical(
+                "Fatal error in flush_dirty_carts - not retrying",
+                exc_info=True,
+            )
+            raise
+
+
+def _get_product(product_id) -> Product:
+    try:
+        return Product.objects.get(pk=product_id)
+    except (Product.DoesNotExist, DjangoValidationError):
+        raise Http404("No Product matches the given query.")
+
+
+def _build_item(cart, item_id, product, quantity) -> CartItem:
+    item = CartItem(id=item_id, cart=cart, product=product, item_quantity=quantity)
+    item.price_line()
+    return item
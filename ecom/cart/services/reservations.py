@@ -0,0 +1,95 @@
+from collections import Counter
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from cart.models import StockReservation
+from products.services.inventory import reserve_stock, release_stock
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+class ReservationService:
+    """
+    Service layer responsible for stock reservations held by confirmed checkouts.
+
+    Reservation rows record what each cart holds; the product-level
+    `reserved_stock` counter is kept in step through the inventory service.
+    """
+
+    @staticmethod
+    @transaction.atomic
+    def reserve(cart, quantities: dict):
+        """
+        Holds `quantities` (product id → quantity) for the cart until the
+        checkout TTL runs out.
+
+        Any earlier reservation of the cart is released first. Raises
+        InsufficientStockError when any product cannot be held.
+        """
+        ReservationService.release([cart.pk])
+
+        reserve_stock(quantities)
+
+        expires_at = timezone.now() + timedelta(hours=settings.CHECKOUT_TTL_HOURS)
+        StockReservation.objects.bulk_create(
+            StockReservation(cart=cart, product_id=product_id, quantity=quantity, expires_at=expires_at)
+            for product_id, quantity in quantities.items()
+        )
+
+    @staticmethod
+    @transaction.atomic
+    def take(cart) -> dict:
+        """
+        Removes the cart's reservation and returns what it held.
+
+        The caller converts the returned quantities into a stock
+        decrement (or releases them) in the same transaction.
+        """
+        reservations = StockReservation.objects.select_for_update().filter(cart=cart)
+        held = dict(reservations.values_list("product_id", "quantity"))
+        reservations.delete()
+        return held
+
+    @staticmethod
+    @transaction.atomic
+    def release(cart_ids) -> int:
+        """
+        Releases every reservation of the given carts and returns how many
+        were released.
+        """
+        return ReservationService._release(StockReservation.objects.filter(cart_id__in=cart_ids))
+
+    @staticmethod
+    @transaction.atomic
+    def release_expired(now=None) -> int:
+        """
+        Releases reservations past their expiry, whatever state their cart is in.
+        """
+        return ReservationService._release(
+            StockReservation.objects.filter(expires_at__lt=now or timezone.now())
+        )
+
+    @staticmethod
+    def _release(reservations) -> int:
+        # wait for concurrent releases rather than skipping their rows, so a
+        # re-reserve never re-creates a row another transaction still holds
+        rows = list(
+            reservations.select_for_update()
+            .order_by("id")
+            .values_list("id", "product_id", "quantity")
+        )
+        if not rows:
+            return 0
+
+        quantities = Counter()
+        for _, product_id, quantity in rows:
+            quantities[product_id] += quantity
+
+        release_stock(dict(quantities))
+        StockReservation.objects.filter(id__in=[row[0] for row in rows]).delete()
+
+        logger.info("Released %s stock reservations", len(rows))
+        return len(rows)
@@ -20,3 +20,100 @@ def test_user_can_create_cart(api_client, normal_user):
 
     assert response.status_code == status.HTTP_200_OK
     assert Cart.objects.filter(customer=normal_user).exists()
+
+
+@pytest.mark.django_db
+def test_bulk_activity_update_only_moves_timestamps_forward(normal_user, other_vendor_user):
+    """
+    Test that coalesced activity writes never move last_activity_at backwards.
+    """
+    from datetime import timedelta
+    from django.utils import timezone
+    from core.services import activity
+
+    now = timezone.now()
+    recent = Cart.objects.create(customer=normal_user, last_activity_at=now)
+    stale = Cart.objects.create(customer=other_vendor_user, last_activity_at=now - timedelta(hours=5))
+
+    activity.bulk_update_activity(
+        Cart,
+        {recent.pk: now - timedelta(hours=1), stale.pk: now - timedelta(minutes=1)},
+    )
+
+    recent.refresh_from_db()
+    stale.refresh_from_db()
+    assert recent.last_activity_at == now
+    assert stale.last_activity_at == now - timedelta(minutes=1)
+
+
+@pytest.mark.django_db
+def test_activity_touches_are_buffered_in_redis_and_flushed_off_request(
+    normal_user, redis_client, settings, monkeypatch, django_capture_on_commit_callbacks
+):
+    """
+    Test that cart touches go to the Redis buffer, keep the newest stamp,
+    and are written by the queued flush task rather than the request.
+    """
+    from datetime import timedelta
+    from django.utils import timezone
+    from core import tasks
+    from core.services import activity
+
+    settings.ACTIVITY_FLUSH_SECONDS = 60
+    key = activity.BUFFER_KEY.format(label=Cart._meta.label)
+    redis_client.delete(key)
+
+    queued = []
+    monkeypatch.setattr(tasks.flush_activity_task, "delay", lambda: queued.append(True))
+
+    start = timezone.now() - timedelta(hours=2)
+    cart = Cart.objects.create(customer=normal_user, last_activity_at=start)
+    newest = start + timedelta(minutes=30)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        activity.touch(cart, at=newest)
+        activity.touch(cart, at=start + timedelta(minutes=10))
+
+    try:
+        assert queued == [True]
+        assert Cart.objects.get(pk=cart.pk).last_activity_at == start
+        assert activity.touched_since(Cart, [cart.pk], newest) == {cart.pk}
+
+        assert activity.flush_all() == 1
+        assert Cart.objects.get(pk=cart.pk).last_activity_at == newest
+        assert not redis_client.exists(key)
+    finally:
+        redis_client.delete(key)
+
+
+@pytest.mark.django_db
+def test_cart_read_query_count_does_not_grow_with_lines(api_client, normal_user, product, django_assert_num_queries):
+    """
+    Test that reading the cart loads every line and its product in a
+    fixed number of queries.
+    """
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from cart.services.cart import CartService
+    from products.models import Product
+
+    api_client.force_authenticate(user=normal_user)
+    cart = CartService.get_or_create_cart(normal_user)
+    cart.items.create(product=product, item_quantity=1)
+    url = reverse("cart-list")
+
+    with CaptureQueriesContext(connection) as single_line:
+        assert api_client.get(url).status_code == status.HTTP_200_OK
+
+    for index in range(5):
+        extra = Product.objects.create(
+            name=f"Extra {index}", description="Extra", vendor=product.vendor,
+            category=product.category, original_price=100, stock=5,
+        )
+        cart.items.create(product=extra, item_quantity=1)
+
+    with django_assert_num_queries(len(single_line.captured_queries)):
+        response = api_client.get(url)
+
+    names = {item["product"] for item in response.data["data"]["items"]}
+    assert names == {"Test Product", *(f"Extra {index}" for index in range(5))}
@@ -61,3 +61,152 @@ def test_user_can_remove_cart_item(api_client, normal_user, product):
     assert response.status_code == status.HTTP_200_OK
     assert CartItem.objects.count() == 0
 
+
+
+@pytest.mark.django_db
+def test_cart_totals_follow_item_mutations(api_client, normal_user, product):
+    """
+    Test that the stored cart totals are adjusted on add, update and remove.
+    """
+    from decimal import Decimal
+
+    api_client.force_authenticate(user=normal_user)
+    product.discount_percent = 10
+    product.save()
+
+    url = reverse("cart-items-list")
+    api_client.post(url, {"product_id": product.id, "item_quantity": 2})
+
+    cart = Cart.objects.get(customer=normal_user)
+    assert cart.item_count == 2
+    assert cart.subtotal == Decimal("10000.00")
+    assert cart.total_amount == Decimal("9000.00")
+
+    item = CartItem.objects.get(cart=cart)
+    api_client.patch(reverse("cart-items-detail", args=[item.id]), {"item_quantity": 3})
+
+    cart.refresh_from_db()
+    assert cart.item_count == 3
+    assert cart.total_amount == Decimal("13500.00")
+
+    api_client.delete(reverse("cart-items-detail", args=[item.id]))
+
+    cart.refresh_from_db()
+    assert cart.item_count == 0
+    assert cart.total_amount == 0
+
+
+@pytest.mark.django_db
+def test_price_change_rebuilds_open_cart_totals(normal_user, product):
+    """
+    Test that changing a product price reprices the carts that hold it.
+    """
+    from decimal import Decimal
+    from cart.services.cartItem import CartItemService
+    from products.services.products import update_product
+
+    cart = Cart.objects.create(customer=normal_user)
+    CartItemService.add_item(cart, product.id, quantity=2)
+
+    update_product(product.id, original_price=Decimal("4000.00"), discount_percent=25)
+
+    product.refresh_from_db()
+    assert product.effective_price == Decimal("3000.00")
+
+    cart.refresh_from_db()
+    item = CartItem.objects.get(cart=cart)
+    assert item.line_total == Decimal("6000.00")
+    assert cart.subtotal == Decimal("8000.00")
+    assert cart.discount_total == Decimal("2000.00")
+    assert cart.item_count == 2
+
+
+@pytest.fixture
+def hot_cart_store(settings):
+    """
+    Enables the Redis hot cart store, skipping when Redis is unreachable.
+    """
+    import redis
+    from cart.services import hot_cart
+
+    settings.CART_HOT_STORE_ENABLED = True
+    if not settings.CART_HOT_STORE_URL:
+        pytest.skip("CART_HOT_STORE_URL is not set")
+    try:
+        redis.Redis.from_url(settings.CART_HOT_STORE_URL).ping()
+    except (redis.exceptions.RedisError, TypeError, ValueError):
+        pytest.skip("Redis is not available for the hot cart store")
+
+    hot_cart._pool = None
+    yield
+    hot_cart._pool = None
+
+
+@pytest.mark.django_db
+def test_hot_cart_mutations_are_written_behind_on_checkout(api_client, normal_user, product, hot_cart_store):
+    """
+    Test that hot cart mutations stay in Redis until the checkout is confirmed.
+    """
+    from decimal import Decimal
+    from cart.models import Checkout
+    from cart.services.checkout import CheckoutService
+
+    product.stock = 10
+    product.save()
+
+    api_client.force_authenticate(user=normal_user)
+    url = reverse("cart-items-list")
+
+    response = api_client.post(url, {"product_id": product.id, "item_quantity": 1})
+    assert response.status_code == status.HTTP_201_CREATED
+    item_id = response.data["data"]["id"]
+
+    response = api_client.post(url, {"product_id": product.id, "item_quantity": 2})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data["data"]["item_quantity"] == 3
+
+    api_client.patch(reverse("cart-items-detail", args=[item_id]), {"item_quantity": 4})
+
+    assert CartItem.objects.count() == 0
+    assert api_client.get(url).data["data"][0]["item_quantity"] == 4
+
+    cart = Cart.objects.get(customer=normal_user)
+    Checkout.objects.create(cart=cart, shipping_address="Lagos", billing_address="Lagos", payment_method="card")
+    CheckoutService.confirm_checkout(cart)
+
+    cart.refresh_from_db()
+    item = CartItem.objects.get(cart=cart)
+    assert str(item.id) == item_id
+    assert item.item_quantity == 4
+    assert cart.status == "pending"
+    assert cart.item_count == 4
+    assert cart.subtotal == Decimal("20000.00")
+
+    # the cart left the unpaid state, so mutations hit the database guard
+    response = api_client.post(url, {"product_id": product.id, "item_quantity": 1})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_abandoned_cart_sweep_keeps_carts_active_in_hot_store(api_client, normal_user, product, hot_cart_store, settings):
+    """
+    Test that a cart mutated only in Redis is not expired by the sweep.
+    """
+    from datetime import timedelta
+    from django.utils import timezone
+    from cart.services.cart import CartService
+
+    product.stock = 10
+    product.save()
+
+    api_client.force_authenticate(user=normal_user)
+    api_client.post(reverse("cart-items-list"), {"product_id": product.id, "item_quantity": 1})
+
+    stale = timezone.now() - timedelta(hours=settings.CART_TTL_HOURS + 1)
+    Cart.objects.filter(customer=normal_user).update(last_activity_at=stale)
+
+    CartService.cleanup_abandoned_carts(None)
+
+    cart = Cart.objects.get(customer=normal_user)
+    assert cart.status == "unpaid"
+    assert CartItem.objects.count() == 0
@@ -82,3 +82,88 @@ def test_vendor_cannot_access_checkout(api_client, vendor_user):
     response = api_client.get(url)
 
     assert response.status_code == status.HTTP_403_FORBIDDEN
+
+
+@pytest.mark.django_db
+def test_confirmed_checkout_reserves_stock_until_order_or_expiry(normal_user, product):
+    """
+    Test that confirmation holds stock, so a later checkout cannot claim
+    it, that order creation converts the hold and that expiry releases it.
+    """
+    from django.contrib.auth import get_user_model
+    from rest_framework.exceptions import ValidationError
+    from cart.models import StockReservation
+    from cart.services.cart import CartService
+    from cart.services.checkout import CheckoutService
+    from orders.services.order import OrderService
+
+    def confirmed_cart(customer):
+        cart = Cart.objects.create(customer=customer)
+        cart.items.create(product=product, item_quantity=1)
+        Checkout.objects.create(
+            cart=cart, shipping_address="Lagos", billing_address="Lagos", payment_method="card",
+        )
+        CheckoutService.confirm_checkout(cart)
+        cart.refresh_from_db()
+        return cart
+
+    other = get_user_model().objects.create_user(
+        email="other@test.com", password="pass12345", first_name="Other",
+        last_name="User", phone_number="+2348091234567",
+    )
+
+    first = confirmed_cart(normal_user)
+    product.refresh_from_db()
+    assert (product.stock, product.reserved_stock) == (1, 1)
+    assert StockReservation.objects.get(cart=first).quantity == 1
+
+    with pytest.raises(ValidationError) as exc:
+        confirmed_cart(other)
+    assert exc.value.detail["items"][0]["available_stock"] == "0"
+
+    CartService.expire_carts([first.pk])
+    product.refresh_from_db()
+    assert product.reserved_stock == 0
+    assert not StockReservation.objects.exists()
+
+    Cart.objects.filter(customer=other).delete()
+    second = confirmed_cart(other)
+    OrderService.create_order_from_confirmed_checkout(second)
+
+    product.refresh_from_db()
+    assert (product.stock, product.reserved_stock) == (0, 0)
+    assert not StockReservation.objects.exists()
+
+
+@pytest.mark.django_db
+def test_stock_edits_cannot_drop_below_reserved_units(normal_user, product):
+    """
+    Test that vendor stock edits, single or bulk, keep enough stock for
+    the units confirmed checkouts have reserved.
+    """
+    from rest_framework.exceptions import ValidationError
+    from cart.services.checkout import CheckoutService
+    from products.models import Product
+    from products.services.products import bulk_update_products, update_product
+
+    Product.objects.filter(pk=product.pk).update(stock=5)
+    cart = Cart.objects.create(customer=normal_user)
+    cart.items.create(product=product, item_quantity=3)
+    Checkout.objects.create(cart=cart, shipping_address="Lagos", billing_address="Lagos", payment_method="card")
+    CheckoutService.confirm_checkout(cart)
+
+    with pytest.raises(ValidationError) as exc:
+        update_product(product.id, stock=2)
+    assert "3 units reserved" in str(exc.value.detail["stock"][0])
+
+    results = bulk_update_products(product.vendor, [{"id": product.id, "stock": 2}])
+    assert results[0]["ok"] is False
+    assert "stock" in results[0]["errors"]
+
+    product.refresh_from_db()
+    assert (product.stock, product.reserved_stock) == (5, 3)
+
+    update_product(product.id, stock=3)
+    assert bulk_update_products(product.vendor, [{"id": product.id, "stock": 4}])[0]["ok"] is True
+    product.refresh_from_db()
+    assert product.stock == 4
@@ -2,14 +2,16 @@ from rest_framework.viewsets import ModelViewSet
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework import status
+from django.db.models import prefetch_related_objects
 
 from cart.serializers import cart
 from cart.services.cart import CartService
+from cart.services.hot_cart import HotCartStore
 from core.permissions import IsCustomer
 from cart.models import Cart
 from cart.serializers.cart import CartSerializer
-from rest_framework.throttling import ScopedRateThrottle
-from core.pagination import StandardResultsPagination
+from core.throttling import SlidingWindowRateThrottle
+from core.pagination import KeysetResultsPagination
 from rest_framework.decorators import action
 import logging
 
@@ -26,7 +28,8 @@ class CartViewSet(ModelViewSet):
     permission_classes = [IsAuthenticated, IsCustomer]
     pagination_class = None
     http_method_names = ["get"]
-    throttle_classes = [ScopedRateThrottle]
+    throttle_classes = [SlidingWindowRateThrottle]
+    keyset_ordering = "-updated_at"
     
     # action-specific messages
     action_messages = {
@@ -51,6 +54,10 @@ class CartViewSet(ModelViewSet):
         guaranteeing that the client always receives a valid cart response.
         """
         cart_instance = CartService.get_or_create_cart(request.user)
+        if HotCartStore.flush_if_dirty(cart_instance.pk):
+            cart_instance.refresh_from_db()
+        # one query for every line and its product, whatever the cart size
+        prefetch_related_objects([cart_instance], "items__product")
         serializer = cart.CartSerializer(cart_instance)
         
         return Response(
@@ -66,9 +73,12 @@ class CartViewSet(ModelViewSet):
     @action(detail=False, methods=["get"], url_path="history", permission_classes=[IsCustomer])
     def history(self, request):
         """
-        
+        Returns the authenticated customer's carts, newest activity first.
+
+        Paginated by keyset on `updated_at`, so older pages cost the same
+        as the first one.
         """
-        self.pagination_class = StandardResultsPagination
+        self.pagination_class = KeysetResultsPagination
         carts = (
             Cart.objects
             .filter(
@@ -2,13 +2,14 @@ from rest_framework.viewsets import ModelViewSet
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from rest_framework.renderers import JSONRenderer
-from rest_framework.throttling import ScopedRateThrottle
+from core.throttling import SlidingWindowRateThrottle
 from rest_framework import status
 
 from cart.models import CartItem
 from cart.serializers import cart, cartItem
 from cart.services.cartItem import CartItemService
 from cart.services.cart import CartService
+from cart.services.hot_cart import HotCartStore
 from core.permissions import IsCustomer
 
 
@@ -29,7 +30,7 @@ class CartItemViewSet(ModelViewSet):
     renderer_classes = [JSONRenderer]
     permission_classes = [IsAuthenticated, IsCustomer]
     http_method_names = ["get", "post", "patch", "delete"]
-    throttle_classes = [ScopedRateThrottle]
+    throttle_classes = [SlidingWindowRateThrottle]
 
     def get_serializer_class(self):
         """
@@ -62,13 +63,32 @@ class CartItemViewSet(ModelViewSet):
         """
         cart = CartService.get_or_create_cart(self.request.user)
         return CartItem.objects.filter(cart=cart)
+
+    def get_cart(self):
+        """
+        Return the user's active cart from the hot store when enabled.
+        """
+        if HotCartStore.is_enabled():
+            return HotCartStore.get_cart(self.request.user)
+        return CartService.get_or_create_cart(self.request.user)
+
+    def get_item_service(self):
+        """
+        Return the service that applies item mutations for the active cart.
+        """
+        if HotCartStore.is_enabled():
+            return HotCartStore
+        return CartItemService
     
     
     def list(self, request, *args, **kwargs):
         """
         Return all items in the authenticated user's active cart.
         """
-        queryset = self.get_queryset()
+        if HotCartStore.is_enabled():
+            queryset = HotCartStore.list_items(self.get_cart())
+        else:
+            queryset = self.get_queryset()
         serializer = self.get_serializer(queryset, many=True)
 
         return Response(
@@ -86,12 +106,12 @@ class CartItemViewSet(ModelViewSet):
         """
         Add a product to the authenticated user's cart.
         """
-        cart = CartService.get_or_create_cart(request.user)
+        cart = self.get_cart()
 
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
 
-        cart_item, append = CartItemService.add_item(
+        cart_item, append = self.get_item_service().add_item(
             cart=cart,
             product_id=serializer.validated_data["product_id"],
             quantity=serializer.validated_data["item_quantity"],
@@ -125,7 +145,7 @@ class CartItemViewSet(ModelViewSet):
 
         If the quantity is zero or less, the item is removed.
         """
-        cart = CartService.get_or_create_cart(request.user)
+        cart = self.get_cart()
         cart_item_id = kwargs.get("pk")
 
         serializer = self.get_serializer(data=request.data)
@@ -133,7 +153,7 @@ class CartItemViewSet(ModelViewSet):
 
         quantity = serializer.validated_data["item_quantity"]
 
-        cart_item = CartItemService.update_item(cart, cart_item_id, quantity)
+        cart_item = self.get_item_service().update_item(cart, cart_item_id, quantity)
 
         if cart_item is None:
             return Response(
@@ -160,10 +180,10 @@ class CartItemViewSet(ModelViewSet):
         """
         Remove a cart item from the authenticated user's cart.
         """
-        cart = CartService.get_or_create_cart(request.user)
+        cart = self.get_cart()
         cart_item_id = kwargs.get("pk")
 
-        CartItemService.remove_item(cart, cart_item_id)
+        self.get_item_service().remove_item(cart, cart_item_id)
         
         return Response(
             {
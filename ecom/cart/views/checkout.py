@@ -16,6 +16,7 @@ from cart.serializers.checkout import (
 )
 from cart.services.checkout import CheckoutService
 from core.permissions import IsCustomer
+from core.pagination import KeysetResultsPagination
 
 
 class CheckoutViewSet(ModelViewSet):
@@ -119,7 +120,10 @@ class CheckoutViewSet(ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-    @action(detail=False, methods=["get"], url_path="history", permission_classes=[IsCustomer])
+    @action(
+        detail=False, methods=["get"], url_path="history",
+        permission_classes=[IsCustomer], pagination_class=KeysetResultsPagination,
+    )
     def history(self, request):
         """
         Returns the authenticated customer's checkout history.
@@ -1,13 +1,138 @@
 import pytest
 from rest_framework.test import APIClient
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from accounts.models import Vendor
 from products.models import Product, Category
 from core.factories import PaymentFactory
+from core.utils.mail_transport import MailTransport, set_transport
+from accounts.services import bank_directory
+import httpx
+import json
 
 User = get_user_model()
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    cache.clear()
+
+
+class FakeMailEndpoint:
+    """
+    Local stand-in for the mail API, served through httpx.MockTransport.
+
+    Records every request; `fail_for` holds recipients answered with a 500.
+    """
+
+    def __init__(self):
+        self.sent = []
+        self.fail_for = set()
+
+    def __call__(self, request):
+        payload = json.loads(request.content)
+        if payload["RECEIVER_EMAIL"] in self.fail_for:
+            return httpx.Response(500, json={"detail": "delivery failed"})
+        self.sent.append(payload)
+        return httpx.Response(200, json={"status": "sent"})
+
+
+@pytest.fixture(scope="session")
+def _fake_mail_transport():
+    endpoint = FakeMailEndpoint()
+    set_transport(MailTransport("http://mail.test/send", transport=httpx.MockTransport(endpoint)))
+    yield endpoint
+    set_transport(None)
+
+
+@pytest.fixture(autouse=True)
+def fake_mail(_fake_mail_transport, settings):
+    """
+    Routes all outgoing mail to the fake endpoint and resets its log.
+    """
+    settings.MAIL_RETRY_BACKOFF_SECONDS = 0
+    _fake_mail_transport.sent.clear()
+    _fake_mail_transport.fail_for.clear()
+    return _fake_mail_transport
+
+
+class FakePaystack:
+    """
+    Local stand-in for Paystack's bank list and account resolution,
+    served through httpx.MockTransport.
+
+    `accounts` maps `(account_number, bank_code)` to holder names;
+    `requests` records every path called.
+    """
+
+    banks = [
+        {"name": "Access Bank", "code": "044"},
+        {"name": "Guaranty Trust Bank", "code": "058"},
+        {"name": "Zenith Bank", "code": "057"},
+        {"name": "First Bank of Nigeria", "code": "011"},
+        {"name": "First City Monument Bank", "code": "214"},
+        {"name": "United Bank For Africa", "code": "033"},
+    ]
+
+    def __init__(self):
+        self.accounts = {}
+        self.requests = []
+
+    def __call__(self, request):
+        self.requests.append(request.url.path)
+
+        if request.url.path == "/bank":
+            return httpx.Response(200, json={"status": True, "data": self.banks})
+
+        if request.url.path == "/bank/resolve":
+            key = (request.url.params["account_number"], request.url.params["bank_code"])
+            if key not in self.accounts:
+                return httpx.Response(422, json={"status": False, "message": "Could not resolve account name."})
+            return httpx.Response(200, json={
+                "status": True,
+                "data": {"account_number": key[0], "account_name": self.accounts[key]},
+            })
+
+        return httpx.Response(404, json={"status": False, "message": "Not found"})
+
+
+@pytest.fixture(autouse=True)
+def fake_paystack():
+    """
+    Routes all Paystack calls to a fresh fake and drops the loaded bank directory.
+    """
+    endpoint = FakePaystack()
+    bank_directory.set_client(httpx.Client(base_url="http://paystack.test", transport=httpx.MockTransport(endpoint)))
+    yield endpoint
+    bank_directory.set_client(None)
+
+
+@pytest.fixture
+def redis_client(monkeypatch):
+    """
+    Points the raw Redis helpers at a real server, skipping when none is reachable.
+
+    The test cache stays LocMem; only code going through `get_redis_client`
+    (activity buffer, sliding-window throttle) uses this client.
+    """
+    import os
+    import redis
+    from core.utils.redis import set_redis_client
+
+    url = os.getenv("REDIS_URL")
+    if not url:
+        pytest.skip("REDIS_URL is not set")
+    client = redis.Redis.from_url(url)
+    try:
+        client.ping()
+    except redis.exceptions.RedisError:
+        pytest.skip("Redis is not available")
+
+    set_redis_client(client)
+    yield client
+    set_redis_client(None)
+
+
 @pytest.fixture
 def api_client():
     return APIClient()
@@ -8,4 +8,13 @@ class AppError(Exception):
 class ConflictException(AppError):
     status = 409
     message = "Conflict detected. Record was modified by another request."
-    code = "conflict"
\ No newline at end of file
+    code = "conflict"
+
+class InsufficientStockError(AppError):
+    status = 409
+    message = "Some items exceed available stock."
+    code = "INSUFFICIENT_STOCK"
+
+    def __init__(self, items=None):
+        super().__init__(self.message)
+        self.items = items or []
@@ -1,15 +1,25 @@
 # core/pagination.py
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import PageNumberPagination, CursorPagination
 from rest_framework.response import Response
 
 
-class StandardResultsPagination(PageNumberPagination):
-    page_size = 10
-    # page_size_query_param = "page_size"
-    # max_page_size = 100
+class EnvelopeMixin:
+    """
+    Renders paginated data in the standard
+    `status/code/message/meta/data` response envelope.
+    """
 
     def get_paginated_response(self, data):
-        view = self.request.parser_context.get("view")
+        return self.get_envelope_response(self.request, data, self.get_meta())
+
+    def get_envelope_response(self, request, data, meta):
+        """
+        Wraps a page of data and its metadata in the standard response envelope.
+
+        Usable without a prior `paginate_queryset` call, so cached pages can
+        be rendered with the same shape as freshly paginated ones.
+        """
+        view = request.parser_context.get("view")
 
         message = "Records retrieved successfully."
 
@@ -27,13 +37,69 @@ class StandardResultsPagination(PageNumberPagination):
                 "status": "success",
                 "code": "FETCH_SUCCESSFUL",
                 "message": message,
-                "meta": {
-                    "count": self.page.paginator.count,
-                    "next": self.get_next_link(),
-                    "previous": self.get_previous_link(),
-                    "page": self.page.number,
-                    "page_size": self.get_page_size(self.request),
-                },
+                "meta": meta,
                 "data": data,
             }
         )
+
+
+class StandardResultsPagination(EnvelopeMixin, PageNumberPagination):
+    page_size = 10
+    # page_size_query_param = "page_size"
+    # max_page_size = 100
+
+    def get_meta(self):
+        """
+        Returns the pagination metadata for the current page.
+        """
+        return {
+            "count": self.page.paginator.count,
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "page": self.page.number,
+            "page_size": self.get_page_size(self.request),
+        }
+
+
+class KeysetResultsPagination(EnvelopeMixin, CursorPagination):
+    """
+    Keyset (cursor) pagination over an indexed timestamp.
+
+    Each page is a `WHERE <field> < <cursor> ORDER BY <field> LIMIT n` query,
+    so deep pages cost the same as the first one, and no `COUNT(*)` runs
+    unless the client asks for it with `?include_count=true`. The count is
+    capped at `count_cap` rows and flagged as approximate beyond that.
+
+    Views choose the ordering with a `keyset_ordering` attribute.
+    """
+    page_size = 10
+    ordering = "-created_at"
+    count_query_param = "include_count"
+    count_cap = 1000
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.queryset = queryset
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_ordering(self, request, queryset, view):
+        ordering = getattr(view, "keyset_ordering", None)
+        if ordering:
+            return (ordering,) if isinstance(ordering, str) else tuple(ordering)
+        return super().get_ordering(request, queryset, view)
+
+    def get_meta(self):
+        """
+        Returns the cursor links, and the capped count when requested.
+        """
+        meta = {
+            "next": self.get_next_link(),
+            "previous": self.get_previous_link(),
+            "page_size": self.page_size,
+        }
+
+        if self.request.query_params.get(self.count_query_param) in ("1", "true"):
+            count = self.queryset.order_by()[: self.count_cap + 1].count()
+            meta["count"] = min(count, self.count_cap)
+            meta["count_is_approximate"] = count > self.count_cap
+
+        return meta
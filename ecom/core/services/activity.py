@@ -0,0 +1,179 @@
+import time
+import uuid
+from datetime import datetime, timezone as dt_timezone
+from django.apps import apps
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Case, When, Value, F, DateTimeField
+from django.db.models.functions import Greatest
+from django.utils import timezone
+from redis.exceptions import ResponseError
+from kombu.exceptions import OperationalError as KombuOperationalError
+
+from core.utils.redis import get_redis_client
+
+import logging
+logger = logging.getLogger(__name__)
+
+BUFFER_KEY = "activity:{label}"
+FLUSH_LOCK_KEY = "activity:flush-lock"
+CHUNK_SIZE = 1000
+
+# Models whose activity goes through the buffer
+TRACKED_MODELS = ("cart.Cart",)
+
+
+def touch(instance, at=None):
+    """
+    Records activity on a model instance with a `last_activity_at` column.
+
+    Touches are buffered in a Redis sorted set (keeping the newest
+    timestamp per row) and written in one bulk UPDATE by
+    `flush_activity_task`, queued at most once per
+    `ACTIVITY_FLUSH_SECONDS`. Buffering starts after the surrounding
+    transaction commits. Without a Redis-backed cache the touch is
+    written immediately.
+    """
+    at = at or timezone.now()
+    instance.last_activity_at = at
+
+    model = type(instance)
+    client = get_redis_client()
+
+    if client is None or settings.ACTIVITY_FLUSH_SECONDS <= 0:
+        model.objects.filter(pk=instance.pk).update(
+            last_activity_at=Greatest(F("last_activity_at"), Value(at))
+        )
+        return
+
+    key = BUFFER_KEY.format(label=model._meta.label)
+
+    def _buffer():
+        client.zadd(key, {str(instance.pk): at.timestamp()}, gt=True)
+        if cache.add(FLUSH_LOCK_KEY, 1, timeout=settings.ACTIVITY_FLUSH_SECONDS):
+            from core.tasks import flush_activity_task
+
+            try:
+                flush_activity_task.delay()
+            except KombuOperationalError:
+                # the buffer is kept; the next window's first touch queues the flush
+                logger.warning("Could not queue activity flush", exc_info=True)
+
+    transaction.on_commit(_buffer)
+
+
+def last_seen(instance):
+    """
+    Returns the newest known activity of an instance, buffered or stored.
+    """
+    client = get_redis_client()
+    if client is None:
+        return instance.last_activity_at
+
+    score = client.zscore(BUFFER_KEY.format(label=instance._meta.label), str(instance.pk))
+    if score is None:
+        return instance.last_activity_at
+
+    return max(instance.last_activity_at, datetime.fromtimestamp(score, tz=dt_timezone.utc))
+
+
+def touched_since(model, pks, since) -> set:
+    """
+    Returns the primary keys among `pks` with a buffered touch at or after `since`.
+    """
+    client = get_redis_client()
+    if client is None or not pks:
+        return set()
+
+    members = [str(pk) for pk in pks]
+    scores = client.zmscore(BUFFER_KEY.format(label=model._meta.label), members)
+    threshold = since.timestamp()
+    return {pk for pk, score in zip(pks, scores) if score is not None and score >= threshold}
+
+
+def flush(model) -> int:
+    """
+    Writes buffered touches for a model and returns the number of rows.
+
+    The buffer is swapped out atomically with RENAME, so touches arriving
+    during the flush land in a fresh buffer and are never lost.
+    """
+    client = get_redis_client()
+    if client is None:
+        return 0
+
+    key = BUFFER_KEY.format(label=model._meta.label)
+    flushing_key = f"{key}:flushing:{uuid.uuid4().hex}"
+
+    try:
+        client.rename(key, flushing_key)
+    except ResponseError:
+        # nothing buffered
+        return 0
+
+    try:
+        stamps = {
+            member.decode() if isinstance(member, bytes) else member: datetime.fromtimestamp(score, tz=dt_timezone.utc)
+            for member, score in client.zrange(flushing_key, 0, -1, withscores=True)
+        }
+        items = list(stamps.items())
+        for start in range(0, len(items), CHUNK_SIZE):
+            bulk_update_activity(model, dict(items[start:start + CHUNK_SIZE]))
+    except Exception:
+        # hand the batch back so the next flush retries it
+        for member, score in client.zrange(flushing_key, 0, -1, withscores=True):
+            client.zadd(key, {member: score}, gt=True)
+        raise
+    finally:
+        client.delete(flushing_key)
+
+    return len(stamps)
+
+
+def flush_all():
+    """
+    Flushes the buffers of every tracked model.
+    """
+    started = time.monotonic()
+    count = sum(flush(apps.get_model(label)) for label in TRACKED_MODELS)
+    logger.info("Flushed %s activity touches in %.3fs", count, time.monotonic() - started)
+    return count
+
+
+def bulk_update_activity(model, stamps):
+    """
+    Moves `last_activity_at` forward for many rows in one statement.
+
+    On PostgreSQL this is `UPDATE ... FROM (VALUES ...)`; other backends
+    use a CASE expression. Timestamps never move backwards.
+    """
+    if not stamps:
+        return
+
+    if connection.vendor == "postgresql":
+        table = connection.ops.quote_name(model._meta.db_table)
+        pk_column = connection.ops.quote_name(model._meta.pk.column)
+        pk_type = model._meta.pk.db_type(connection)
+        rows = ", ".join([f"(%s::{pk_type}, %s::timestamptz)"] * len(stamps))
+        params = [value for pair in stamps.items() for value in pair]
+
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"UPDATE {table} AS t "
+                f"SET last_activity_at = GREATEST(t.last_activity_at, v.at) "
+                f"FROM (VALUES {rows}) AS v(id, at) "
+                f"WHERE t.{pk_column} = v.id",
+                params,
+            )
+        return
+
+    model.objects.filter(pk__in=list(stamps)).update(
+        last_activity_at=Greatest(
+            F("last_activity_at"),
+            Case(
+                *[When(pk=pk, then=Value(at)) for pk, at in stamps.items()],
+                output_field=DateTimeField(),
+            ),
+        )
+    )
@@ -0,0 +1,40 @@
+from django.conf import settings
+from django.db import transaction
+
+import logging
+logger = logging.getLogger(__name__)
+
+
+def sweep(queryset, apply, *, chunk_size=None) -> int:
+    """
+    Applies a set-based transition to every row of `queryset` in chunks.
+
+    Each chunk runs in its own transaction: it locks the next primary-key
+    ordered batch with `FOR UPDATE SKIP LOCKED`, so several workers can
+    sweep the same table in parallel without waiting on each other, and
+    hands the ids to `apply(ids)`, which must issue bulk UPDATEs and
+    return the number of rows it transitioned.
+
+    Rows locked by another worker are skipped rather than retried; they
+    are either handled by that worker or picked up by the next run.
+    """
+    chunk_size = chunk_size or settings.EXPIRY_CHUNK_SIZE
+    model = queryset.model
+    last_pk = None
+    total = 0
+
+    while True:
+        with transaction.atomic():
+            batch = queryset.select_for_update(skip_locked=True, of=("self",)).order_by("pk")
+            if last_pk is not None:
+                batch = batch.filter(pk__gt=last_pk)
+
+            ids = list(batch.values_list("pk", flat=True)[:chunk_size])
+            if not ids:
+                break
+
+            total += apply(ids)
+            last_pk = ids[-1]
+
+    logger.info("Swept %s %s rows", total, model._meta.label)
+    return total
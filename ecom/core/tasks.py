@@ -1,18 +1,29 @@
 from celery import shared_task
 from cart.services.cart import CartService
 from cart.services.checkout import CheckoutService
+from cart.services.hot_cart import HotCartStore
 from payments.services.payment import PaymentService
-from accounts.services import vendor_service
+from accounts.services import bank_directory, token_revocation, vendor_service
+from core.services import activity
 from orders.services.order import OrderService
 from products.services.products import (
     send_critical_stock_alerts,
     reconcile_inventory_and_notify
 )
+from products.services import bulk_import, inventory
 
 @shared_task(bind=True, max_retries=3)
 def cleanup_abandoned_carts_task(self):
     CartService.cleanup_abandoned_carts(self)
     
+@shared_task(bind=True, max_retries=3)
+def flush_hot_carts_task(self):
+    HotCartStore.flush_dirty_carts(self)
+    
+@shared_task(bind=True, max_retries=3)
+def flush_activity_task(self):
+    activity.flush_all()
+    
 @shared_task(bind=True, max_retries=3)
 def expire_pending_checkouts_task(self):
     CheckoutService.expire_pending_checkouts(self)
@@ -38,9 +49,25 @@ def send_vendor_low_stock_alerts_task(self, product_ids):
     vendor_service.send_vendor_low_stock_alerts()
     
 @shared_task(bind=True, max_retries=3)
-def send_critical_stock_alerts_task(self, product_ids):
-    send_critical_stock_alerts()
+def send_critical_stock_alerts_task(self):
+    send_critical_stock_alerts(self)
     
 @shared_task(bind=True, max_retries=3)
-def reconcile_inventory_and_notify_task(self, product_ids):
-    reconcile_inventory_and_notify()
\ No newline at end of file
+def reconcile_inventory_and_notify_task(self, full=False):
+    reconcile_inventory_and_notify(self, full=full)
+
+@shared_task(bind=True, max_retries=3)
+def import_products_task(self, import_id):
+    bulk_import.run_import(import_id)
+
+@shared_task(bind=True, max_retries=3)
+def take_stock_snapshots_task(self):
+    inventory.take_snapshots()
+
+@shared_task(bind=True, max_retries=3)
+def refresh_bank_directory_task(self):
+    bank_directory.refresh_directory()
+
+@shared_task(bind=True, max_retries=3)
+def purge_revoked_tokens_task(self):
+    token_revocation.purge_expired()
@@ -0,0 +1,95 @@
+import pytest
+from core.utils.mail_sender import send_mail_batch, send_mail_helper
+
+
+def test_mail_batch_reports_per_recipient_results(fake_mail):
+    """
+    Test that a batch send delivers concurrently and reports each recipient.
+    """
+    fake_mail.fail_for.add("bounce@test.com")
+    recipients = [f"user{index}@test.com" for index in range(25)] + ["bounce@test.com"]
+
+    results = send_mail_batch([("Hello", "<p>Hi</p>", email) for email in recipients])
+
+    assert [result["recipient"] for result in results] == recipients
+    assert all(result["ok"] for result in results[:-1])
+    assert results[-1]["ok"] is False
+    assert results[-1]["error"] == "HTTPStatusError"
+    assert len(fake_mail.sent) == 25
+
+
+def test_mail_helper_returns_error_dict_on_failure(fake_mail):
+    """
+    Test that the single-send helper keeps its error response shape.
+    """
+    fake_mail.fail_for.add("bounce@test.com")
+
+    assert send_mail_helper("Hello", "Hi", "ok@test.com") == {"status": "sent"}
+    assert send_mail_helper("Hello", "Hi", "bounce@test.com")["error"] == "HTTPStatusError"
+
+
+def test_sliding_window_throttle_limits_and_estimates_wait():
+    """
+    Test that the sliding-window throttle limits per scope without Redis
+    and computes the wait from the previous window's decaying share.
+    """
+    from types import SimpleNamespace
+    from rest_framework.test import APIRequestFactory
+    from core.throttling import SlidingWindowRateThrottle
+
+    view = SimpleNamespace(throttle_scope="product_read")
+    request = APIRequestFactory().get("/", REMOTE_ADDR="10.0.0.1")
+    request.user = SimpleNamespace(is_authenticated=False)
+
+    def throttle():
+        instance = SlidingWindowRateThrottle()
+        instance.THROTTLE_RATES = {"product_read": "3/min"}
+        return instance
+
+    assert [throttle().allow_request(request, view) for _ in range(4)] == [True, True, True, False]
+
+    window = throttle()
+    window.num_requests, window.duration = 10, 60
+    # 30s into the window: previous 10 weighs 5, current 5 → estimate 10
+    assert window._wait_for(previous=10, estimated=10, elapsed=30) == pytest.approx(6)
+    # the previous window's share alone cannot bring it under → next window
+    assert window._wait_for(previous=2, estimated=10, elapsed=30) == pytest.approx(30)
+    assert window._wait_for(previous=0, estimated=10, elapsed=45) == pytest.approx(15)
+
+
+def test_sliding_window_throttle_is_atomic_under_concurrent_requests(redis_client):
+    """
+    Test that concurrent requests through the Redis script never exceed the
+    limit and that rejected ones get a Retry-After within the window.
+    """
+    import uuid
+    from concurrent.futures import ThreadPoolExecutor
+    from types import SimpleNamespace
+    from rest_framework.test import APIRequestFactory
+    from core.throttling import SlidingWindowRateThrottle
+
+    view = SimpleNamespace(throttle_scope="product_read")
+    address = "10.{}.{}.{}".format(*uuid.uuid4().bytes[:3])
+    request = APIRequestFactory().get("/", REMOTE_ADDR=address)
+    request.user = SimpleNamespace(is_authenticated=False)
+
+    def attempt(_):
+        throttle = SlidingWindowRateThrottle()
+        throttle.THROTTLE_RATES = {"product_read": "5/min"}
+        return throttle.allow_request(request, view), throttle
+
+    try:
+        with ThreadPoolExecutor(max_workers=16) as pool:
+            results = list(pool.map(attempt, range(40)))
+
+        allowed = [throttle for ok, throttle in results if ok]
+        rejected = [throttle for ok, throttle in results if not ok]
+        assert len(allowed) == 5
+        assert all(0 < throttle.wait() <= 60 for throttle in rejected)
+
+        # two integer keys per client and scope, whatever the request count
+        keys = redis_client.keys(f"throttle_product_read_{address}:*")
+        assert 1 <= len(keys) <= 2
+    finally:
+        for key in redis_client.scan_iter(f"throttle_product_read_{address}:*"):
+            redis_client.delete(key)
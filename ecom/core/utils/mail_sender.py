@@ -1,43 +1,31 @@
 from celery import shared_task
-from django.conf import settings
-import httpx
+from core.utils.mail_transport import get_transport
+
+import logging
+logger = logging.getLogger(__name__)
 
-EMAIL_HOST_USER = settings.EMAIL_HOST_USER
-EMAIL_HOST_PASSWORD = settings.EMAIL_HOST_PASSWORD
-MAIL_API_URL = settings.MAIL_API_URL
 
 @shared_task
 def send_mail_helper(subject, message, mail_recipient):
+    """
+    Sends one email through the pooled mail transport.
+
+    Returns the mail API response on success, or an
+    `{"error", "message"}` dict when delivery failed.
+    """
+    result = get_transport().send(subject, message, mail_recipient)
+
+    if result["ok"]:
+        return result["data"]
+
+    logger.error("[Mail Error] %s: %s", result["error"], result["message"])
+    return {"error": result["error"], "message": result["message"]}
+
+
+def send_mail_batch(messages) -> list:
+    """
+    Sends `(subject, message, recipient)` triples concurrently.
 
-    payload = {
-        "SUBJECT": subject,
-        "MESSAGE": "",
-        "SENDER_EMAIL": EMAIL_HOST_USER,
-        "SENDER_PASSWORD": EMAIL_HOST_PASSWORD,
-        "RECEIVER_EMAIL": mail_recipient,
-        "HTML_MESSAGE": message,
-    }
-
-    try:
-        with httpx.Client(timeout=10) as client:
-            response = client.post(MAIL_API_URL, json=payload)
-            
-            print(response.text)  # Log the raw response for debugging
-            response.raise_for_status()
-            return response.json()
-
-    except httpx.ConnectError as e:
-        print(f"[Mail Error] Connection failed: {str(e)}")
-        return {"error": "ConnectionError", "message": str(e)}
-
-    except httpx.TimeoutException as e:
-        print(f"[Mail Error] Request timed out: {str(e)}")
-        return {"error": "Timeout", "message": str(e)}
-
-    except httpx.HTTPStatusError as e:
-        print(f"[Mail Error] HTTP error: {str(e)}")
-        return {"error": "HTTPError", "message": str(e)}
-
-    except Exception as e:
-        print(f"[Mail Error] Unexpected exception: {str(e)}")
-        return {"error": "UnknownError", "message": str(e)}
+    Returns one `{"recipient", "ok", ...}` result per message, in order.
+    """
+    return get_transport().send_many(messages)
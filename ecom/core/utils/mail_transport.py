@@ -0,0 +1,156 @@
+import asyncio
+import random
+import threading
+import httpx
+from django.conf import settings
+
+import logging
+logger = logging.getLogger(__name__)
+
+# Failures worth retrying; anything else is reported straight away
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class MailTransport:
+    """
+    Long-lived, pooled HTTP client for the mail API.
+
+    A single `httpx.AsyncClient` lives on a dedicated event loop thread,
+    so every send from any worker thread reuses warm keep-alive
+    connections instead of paying a TCP/TLS handshake per email.
+    Batches are sent concurrently, bounded by `MAIL_MAX_CONCURRENCY`,
+    and transient failures are retried with exponential backoff.
+
+    Every send returns a per-recipient result:
+    `{"recipient", "ok", "data"}` on success or
+    `{"recipient", "ok", "error", "message"}` on failure.
+    """
+
+    def __init__(self, url=None, *, transport=None):
+        self.url = url or settings.MAIL_API_URL
+        self.max_concurrency = settings.MAIL_MAX_CONCURRENCY
+
+        self._transport = transport
+        self._loop = asyncio.new_event_loop()
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run_loop, name="mail-transport", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+
+    def _run_loop(self):
+        asyncio.set_event_loop(self._loop)
+        self._client = httpx.AsyncClient(
+            timeout=settings.MAIL_TIMEOUT_SECONDS,
+            limits=httpx.Limits(
+                max_connections=self.max_concurrency,
+                max_keepalive_connections=self.max_concurrency,
+            ),
+            transport=self._transport,
+        )
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._ready.set()
+        self._loop.run_forever()
+
+    def _run(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self._loop).result()
+
+    def send(self, subject, message, recipient) -> dict:
+        """
+        Sends one email and returns its result.
+        """
+        return self._run(self._send(subject, message, recipient))
+
+    def send_many(self, messages) -> list:
+        """
+        Sends `(subject, message, recipient)` triples concurrently.
+
+        Results are returned in the order of `messages`.
+        """
+        return self._run(self._send_many(list(messages)))
+
+    def close(self):
+        """
+        Closes pooled connections and stops the event loop thread.
+        """
+        self._run(self._client.aclose())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+
+    async def _send_many(self, messages):
+        return await asyncio.gather(
+            *[self._send(subject, message, recipient) for subject, message, recipient in messages]
+        )
+
+    async def _send(self, subject, message, recipient):
+        payload = {
+            "SUBJECT": subject,
+            "MESSAGE": "",
+            "SENDER_EMAIL": settings.EMAIL_HOST_USER,
+            "SENDER_PASSWORD": settings.EMAIL_HOST_PASSWORD,
+            "RECEIVER_EMAIL": recipient,
+            "HTML_MESSAGE": message,
+        }
+
+        attempt = 0
+        while True:
+            try:
+                async with self._semaphore:
+                    response = await self._client.post(self.url, json=payload)
+                response.raise_for_status()
+                return {"recipient": recipient, "ok": True, "data": _json_or_text(response)}
+
+            except (httpx.TransportError, httpx.HTTPStatusError) as exc:
+                if attempt >= settings.MAIL_MAX_RETRIES or not _is_retryable(exc):
+                    logger.warning("Mail to %s failed after %s attempts: %s", recipient, attempt + 1, exc)
+                    return {
+                        "recipient": recipient,
+                        "ok": False,
+                        "error": type(exc).__name__,
+                        "message": str(exc),
+                    }
+
+            # full jitter keeps retries from a large batch from arriving together
+            await asyncio.sleep(random.uniform(0, settings.MAIL_RETRY_BACKOFF_SECONDS * 2 ** attempt))
+            attempt += 1
+
+
+def _is_retryable(exc) -> bool:
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code in RETRYABLE_STATUS_CODES
+    return True
+
+
+def _json_or_text(response):
+    try:
+        return response.json()
+    except ValueError:
+        return response.text
+
+
+_transport = None
+_transport_lock = threading.Lock()
+
+
+def get_transport() -> MailTransport:
+    """
+    Returns the process-wide mail transport, creating it on first use.
+    """
+    global _transport
+    if _transport is None:
+        with _transport_lock:
+            if _transport is None:
+                _transport = MailTransport()
+    return _transport
+
+
+def set_transport(transport):
+    """
+    Replaces the process-wide mail transport, closing the previous one.
+
+    Tests use this to install a transport backed by a fake endpoint.
+    """
+    global _transport
+    with _transport_lock:
+        previous, _transport = _transport, transport
+    if previous is not None:
+        previous.close()
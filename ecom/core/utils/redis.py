@@ -0,0 +1,29 @@
+_client = None
+
+
+def get_redis_client():
+    """
+    Returns the raw Redis client behind the default cache, or None when
+    the cache is not Redis-backed.
+
+    Used by code that needs Redis commands the cache API lacks (sorted
+    sets, Lua scripts).
+    """
+    if _client is not None:
+        return _client
+    try:
+        from django_redis import get_redis_connection
+        return get_redis_connection("default")
+    except (ImportError, NotImplementedError):
+        return None
+
+
+def set_redis_client(client):
+    """
+    Overrides the client returned by `get_redis_client`; None restores the default.
+
+    Tests use this to point the raw helpers at a real server while the
+    cache itself stays in memory.
+    """
+    global _client
+    _client = client
@@ -50,6 +50,14 @@ app.conf.beat_schedule = {
     #     "task": "core.tasks.cleanup_abandoned_carts_task",
     #     "schedule": timedelta(minutes=5),
     # },
+    # "Flush-hot-carts": {
+    #     "task": "core.tasks.flush_hot_carts_task",
+    #     "schedule": timedelta(seconds=30),
+    # },
+    # "Flush-activity-touches": {
+    #     "task": "core.tasks.flush_activity_task",
+    #     "schedule": timedelta(seconds=30),
+    # },
     # "Expire-pending-checkouts": {
     #     "task": "core.tasks.expire_pending_checkouts_task",
     #     "schedule": timedelta(minutes=11),
@@ -80,6 +88,23 @@ app.conf.beat_schedule = {
     # },
     # "Reconcile-inventory-and-notify": {
     #     "task": "core.tasks.reconcile_inventory_and_notify_task",
-    #     "schedule": crontab(hour=9, minute=0),
+    #     "schedule": timedelta(hours=1),
+    # },
+    # "Take-stock-snapshots": {
+    #     "task": "core.tasks.take_stock_snapshots_task",
+    #     "schedule": timedelta(minutes=15),
+    # },
+    # "Refresh-bank-directory": {
+    #     "task": "core.tasks.refresh_bank_directory_task",
+    #     "schedule": timedelta(hours=12),
+    # },
+    # "Purge-revoked-tokens": {
+    #     "task": "core.tasks.purge_revoked_tokens_task",
+    #     "schedule": timedelta(hours=6),
+    # },
+    # "Full-inventory-audit": {
+    #     "task": "core.tasks.reconcile_inventory_and_notify_task",
+    #     "schedule": crontab(hour=9, minute=0, day_of_week="sunday"),
+    #     "kwargs": {"full": True},
     # },
 }
\ No newline at end of file
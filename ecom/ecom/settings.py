@@ -54,7 +54,6 @@ INSTALLED_APPS = [
     
     'rest_framework',
     'rest_framework_simplejwt',
-    'rest_framework_simplejwt.token_blacklist',
     
     'cloudinary',
     'cloudinary_storage',
@@ -130,7 +129,7 @@ if not DEBUG:
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "accounts.authentication.CachedPrincipalJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.IsAuthenticated",
@@ -156,6 +155,7 @@ REST_FRAMEWORK = {
         
         #  Token refresh
         "token_refresh": "10/min",
+        "logout": "10/min",
         
         # Password change flow for authenticated users
         "password_change_request": "10/hour",
@@ -216,6 +216,7 @@ REST_FRAMEWORK = {
         "product_create": "30/min",
         "product_update": "40/min",
         "product_delete": "10/min",
+        "product_import": "20/hour",
     },
 }
 
@@ -223,6 +224,7 @@ SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=45),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
     "ROTATE_REFRESH_TOKENS": True,
+    # rotated refresh tokens are revoked through accounts.services.token_revocation
     "BLACKLIST_AFTER_ROTATION": True,
 
     # Security
@@ -312,7 +314,7 @@ CACHES = {
         "OPTIONS": {
             "CLIENT_CLASS": "django_redis.client.DefaultClient",
             "CONNECTION_POOL_KWARGS": {
-                "max_connections": 5,
+                "max_connections": int(os.getenv("REDIS_MAX_CONNECTIONS", 50)),
             }
         }
     }
@@ -424,6 +426,12 @@ if "pytest" in sys.modules:
             "NAME": BASE_DIR / "test_db.sqlite3",
         }
     }
+    # Keep cache state per test process so xdist workers never share entries
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        }
+    }
 
 # Internationalization
 # https://docs.djangoproject.com/en/6.0/topics/i18n/
@@ -456,9 +464,76 @@ FINAL_PAYMENT_REMINDER_TTL_HOURS_START = int(os.getenv("FINAL_PAYMENT_REMINDER_T
 FINAL_PAYMENT_REMINDER_TTL_HOURS_END = int(os.getenv("FINAL_PAYMENT_REMINDER_TTL_HOURS_END"))
 CRITICAL_INACTIVITY_HOURS = int(os.getenv("CRITICAL_INACTIVITY_HOURS"))
 
+# Product catalog cache
+CATALOG_CACHE_FRESH_SECONDS = int(os.getenv("CATALOG_CACHE_FRESH_SECONDS", 60))
+CATALOG_CACHE_STALE_SECONDS = int(os.getenv("CATALOG_CACHE_STALE_SECONDS", 600))
+CATALOG_CACHE_LOCK_SECONDS = int(os.getenv("CATALOG_CACHE_LOCK_SECONDS", 10))
+CATALOG_CACHE_LOCK_WAIT_SECONDS = float(os.getenv("CATALOG_CACHE_LOCK_WAIT_SECONDS", 0.5))
+
+# Product search: "auto" picks Postgres full-text search or the in-process index
+PRODUCT_SEARCH_BACKEND = os.getenv("PRODUCT_SEARCH_BACKEND", "auto")
+PRODUCT_SEARCH_TRIGRAM_THRESHOLD = float(os.getenv("PRODUCT_SEARCH_TRIGRAM_THRESHOLD", 0.3))
+
+# Lower edges of the price bands and discount tiers reported as listing facets
+PRODUCT_PRICE_BUCKETS = [int(edge) for edge in os.getenv("PRODUCT_PRICE_BUCKETS", "5000,20000,50000,100000").split(",")]
+PRODUCT_DISCOUNT_TIERS = [int(edge) for edge in os.getenv("PRODUCT_DISCOUNT_TIERS", "1,10,25,50").split(",")]
+
+# Rows validated and inserted per transaction by bulk product imports
+PRODUCT_IMPORT_BATCH_SIZE = int(os.getenv("PRODUCT_IMPORT_BATCH_SIZE", 500))
+
+# Largest batch accepted by the bulk stock and price update endpoint
+PRODUCT_BULK_UPDATE_MAX_ROWS = int(os.getenv("PRODUCT_BULK_UPDATE_MAX_ROWS", 1000))
+
+# Rows handled per transaction by the expiry sweeps
+EXPIRY_CHUNK_SIZE = int(os.getenv("EXPIRY_CHUNK_SIZE", 1000))
+
+# Upper bound on how long buffered last_activity_at touches stay unwritten
+ACTIVITY_FLUSH_SECONDS = int(os.getenv("ACTIVITY_FLUSH_SECONDS", 30))
+
+# Incremental inventory reconciliation re-checks products touched this long
+# before the previous run, covering transactions that committed late
+INVENTORY_RECONCILE_OVERLAP_SECONDS = int(os.getenv("INVENTORY_RECONCILE_OVERLAP_SECONDS", 300))
+
+# Stock movement ledger: rows per INSERT, and how old movements must be
+# before a snapshot folds them in (leaves room for in-flight transactions)
+STOCK_MOVEMENT_BATCH_SIZE = int(os.getenv("STOCK_MOVEMENT_BATCH_SIZE", 1000))
+STOCK_SNAPSHOT_SETTLE_SECONDS = int(os.getenv("STOCK_SNAPSHOT_SETTLE_SECONDS", 60))
+
+# Redis hot cart store (write-behind to Cart/CartItem)
+CART_HOT_STORE_ENABLED = env.bool("CART_HOT_STORE_ENABLED", default=False)
+CART_HOT_STORE_URL = os.getenv("CART_HOT_STORE_URL", os.getenv("REDIS_URL"))
+
 EMAIL_HOST_USER = os.getenv("EMAIL_HOST_USER")
 EMAIL_HOST_PASSWORD = os.getenv("EMAIL_HOST_PASSWORD")
 
 DJANGO_API_URL = os.getenv("DJANGO_API_URL")
 MAIL_API_URL = os.getenv("MAIL_API_URL")
-PAYSTACK_SECRET_KEY = os.getenv("PAYSTACK_SECRET_KEY")
\ No newline at end of file
+MAIL_TIMEOUT_SECONDS = float(os.getenv("MAIL_TIMEOUT_SECONDS", 10))
+MAIL_MAX_CONCURRENCY = int(os.getenv("MAIL_MAX_CONCURRENCY", 20))
+MAIL_MAX_RETRIES = int(os.getenv("MAIL_MAX_RETRIES", 3))
+MAIL_RETRY_BACKOFF_SECONDS = float(os.getenv("MAIL_RETRY_BACKOFF_SECONDS", 0.5))
+REMINDER_BATCH_SIZE = int(os.getenv("REMINDER_BATCH_SIZE", 500))
+PAYSTACK_SECRET_KEY = os.getenv("PAYSTACK_SECRET_KEY")
+PAYSTACK_API_URL = os.getenv("PAYSTACK_API_URL", "https://api.paystack.co")
+PAYSTACK_TIMEOUT_SECONDS = float(os.getenv("PAYSTACK_TIMEOUT_SECONDS", 10))
+# Bank list: refreshed in the background after a day, dropped from the cache after a week
+BANK_DIRECTORY_REFRESH_SECONDS = int(os.getenv("BANK_DIRECTORY_REFRESH_SECONDS", 60 * 60 * 24))
+BANK_DIRECTORY_TTL_SECONDS = int(os.getenv("BANK_DIRECTORY_TTL_SECONDS", 60 * 60 * 24 * 7))
+# How long a worker waits for another worker's cold load of the bank list
+BANK_DIRECTORY_WAIT_SECONDS = float(os.getenv("BANK_DIRECTORY_WAIT_SECONDS", 10))
+# Account-name lookups: names are kept for a day, rejected accounts for a few minutes
+BANK_RESOLVE_TTL_SECONDS = int(os.getenv("BANK_RESOLVE_TTL_SECONDS", 60 * 60 * 24))
+BANK_RESOLVE_FAILURE_TTL_SECONDS = int(os.getenv("BANK_RESOLVE_FAILURE_TTL_SECONDS", 300))
+BANK_RESOLVE_LOCK_SECONDS = int(os.getenv("BANK_RESOLVE_LOCK_SECONDS", 15))
+BANK_RESOLVE_WAIT_SECONDS = float(os.getenv("BANK_RESOLVE_WAIT_SECONDS", 10))
+
+# JWT revocation: local bloom filters re-check the shared version at most this often
+TOKEN_REVOCATION_SYNC_SECONDS = float(os.getenv("TOKEN_REVOCATION_SYNC_SECONDS", 1))
+# Revocations re-read on each sync, covering transactions that commit out of id order
+TOKEN_REVOCATION_SYNC_OVERLAP_SECONDS = int(os.getenv("TOKEN_REVOCATION_SYNC_OVERLAP_SECONDS", 300))
+TOKEN_REVOCATION_REBUILD_SECONDS = int(os.getenv("TOKEN_REVOCATION_REBUILD_SECONDS", 60 * 60))
+TOKEN_REVOCATION_BLOOM_CAPACITY = int(os.getenv("TOKEN_REVOCATION_BLOOM_CAPACITY", 100_000))
+TOKEN_REVOCATION_BLOOM_ERROR_RATE = float(os.getenv("TOKEN_REVOCATION_BLOOM_ERROR_RATE", 0.001))
+TOKEN_REVOCATION_PURGE_BATCH_SIZE = int(os.getenv("TOKEN_REVOCATION_PURGE_BATCH_SIZE", 5000))
+# Cached user/vendor principal used by authentication and permissions
+PRINCIPAL_CACHE_SECONDS = int(os.getenv("PRINCIPAL_CACHE_SECONDS", 300))
\ No newline at end of file
@@ -33,6 +33,9 @@ class OrderAdmin(admin.ModelAdmin):
     ) # explicitly define what renders on the change page and in what order, to avoid 
     # heavy/unused fields and N+1 queries
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).with_totals()
+
     def get_customer(self, obj):
         return obj.customer.email if obj.customer else "—"
     get_customer.short_description = "Customer"
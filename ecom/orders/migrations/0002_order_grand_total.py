@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:10
+
+from django.db import migrations, models
+from django.db.models.functions import Round
+
+
+def backfill_grand_total(apps, schema_editor):
+    Order = apps.get_model("orders", "Order")
+    OrderItem = apps.get_model("orders", "OrderItem")
+
+    money = models.DecimalField(max_digits=12, decimal_places=2)
+    items_total = (
+        OrderItem.objects
+        .filter(order=models.OuterRef("pk"))
+        .order_by()
+        .values("order")
+        .annotate(
+            total=models.Sum(
+                models.ExpressionWrapper(
+                    models.F("unit_price")
+                    * (models.Value(100) - models.F("discount_percent"))
+                    / models.Value(100)
+                    * models.F("quantity"),
+                    output_field=money,
+                )
+            )
+        )
+        .values("total")
+    )
+
+    Order.objects.filter(grand_total__isnull=True, id__in=OrderItem.objects.values("order_id")).update(
+        grand_total=Round(models.Subquery(items_total, output_field=money), 2)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='order',
+            name='grand_total',
+            field=models.DecimalField(blank=True, decimal_places=2, max_digits=12, null=True),
+        ),
+        migrations.RunPython(backfill_grand_total, migrations.RunPython.noop),
+    ]
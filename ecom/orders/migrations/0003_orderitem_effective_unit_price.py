@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:32
+
+from django.db import migrations, models
+from django.db.models.functions import Round
+
+
+def backfill_effective_unit_price(apps, schema_editor):
+    OrderItem = apps.get_model("orders", "OrderItem")
+    OrderItem.objects.filter(effective_unit_price__isnull=True).update(
+        effective_unit_price=Round(
+            models.ExpressionWrapper(
+                models.F("unit_price")
+                * (models.Value(100) - models.F("discount_percent"))
+                / models.Value(100),
+                output_field=models.DecimalField(max_digits=12, decimal_places=2),
+            ),
+            2,
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0002_order_grand_total'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='orderitem',
+            name='effective_unit_price',
+            field=models.DecimalField(decimal_places=2, max_digits=12, null=True),
+        ),
+        migrations.RunPython(backfill_effective_unit_price, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='orderitem',
+            name='effective_unit_price',
+            field=models.DecimalField(decimal_places=2, max_digits=12),
+        ),
+    ]
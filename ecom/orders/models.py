@@ -2,9 +2,50 @@ import uuid
 from decimal import Decimal
 from django.db import transaction
 from django.db import models
+from django.db.models.functions import Coalesce, Round
 from accounts.models import CustomUser
 from cart.models import Cart
-from products.models import Product
+from products.models import Product, effective_price_for
+
+
+MONEY = models.DecimalField(max_digits=12, decimal_places=2)
+
+# SQL equivalent of OrderItem.line_total, computed from the snapshot fields
+LINE_TOTAL = models.ExpressionWrapper(
+    models.F("effective_unit_price") * models.F("quantity"),
+    output_field=MONEY,
+)
+
+
+class OrderQuerySet(models.QuerySet):
+    def with_totals(self):
+        """
+        Annotates each order with `annotated_total`, computed in SQL.
+
+        Uses the stored `grand_total` when present and otherwise sums the
+        item snapshots in a correlated subquery, so no items are loaded.
+        """
+        items_total = (
+            OrderItem.objects
+            .filter(order=models.OuterRef("pk"))
+            .order_by()
+            .values("order")
+            .annotate(total=models.Sum(LINE_TOTAL))
+            .values("total")
+        )
+
+        return self.annotate(
+            annotated_total=Round(
+                Coalesce(
+                    models.F("grand_total"),
+                    models.Subquery(items_total, output_field=MONEY),
+                    models.Value(Decimal("0.00")),
+                    output_field=MONEY,
+                ),
+                2,
+                output_field=MONEY,
+            )
+        )
 
 
 class Order(models.Model):
@@ -28,7 +69,12 @@ class Order(models.Model):
     payment_reminder_sent = models.BooleanField(default=False)
     final_payment_reminder_sent = models.BooleanField(default=False)
 
+    # written once at creation; orders placed before it existed are backfilled
+    grand_total = models.DecimalField(max_digits=12, decimal_places=2, null=True, blank=True)
+
     created_at = models.DateTimeField(auto_now_add=True)
+
+    objects = OrderQuerySet.as_manager()
     
     class Meta:
         indexes = [
@@ -43,9 +89,19 @@ class Order(models.Model):
     @property
     def total_amount(self) -> Decimal:
         """
-        Returns the total monetary value of all items in the cart.
+        Returns the total monetary value of all items in the order.
+
+        Prefers the stored `grand_total`, then a `with_totals()` annotation,
+        and only falls back to a database aggregate over the items.
         """
-        return sum((item.line_total for item in self.items.all()), Decimal("0.00"))
+        if self.grand_total is not None:
+            return self.grand_total
+
+        if "annotated_total" in self.__dict__:
+            return self.annotated_total
+
+        total = self.items.aggregate(total=models.Sum(LINE_TOTAL))["total"]
+        return (total or Decimal("0")).quantize(Decimal("0.01"))
     
     @transaction.atomic
     def cancel(self, reason: str):
@@ -61,11 +117,10 @@ class Order(models.Model):
         if self.status != "awaiting_payment":
             return
 
-        # Restore stock for each order item
-        for item in self.items.select_for_update():
-            Product.objects.filter(id=item.product_id).update(
-                stock=models.F("stock") + item.quantity
-            )
+        from products.services.inventory import return_order_stock
+
+        # Restore stock for every item in one statement
+        return_order_stock([self.pk])
         
         # Expire the cart (order-bound cart should never be reused)
         self.cart.status = "expired"
@@ -85,16 +140,18 @@ class OrderItem(models.Model):
     product_name = models.CharField(max_length=255)
     unit_price = models.DecimalField(max_digits=12, decimal_places=2)
     discount_percent = models.PositiveIntegerField(default=0)
+    effective_unit_price = models.DecimalField(max_digits=12, decimal_places=2)
 
     quantity = models.PositiveIntegerField(default=1)
 
     @property
     def line_total(self) -> Decimal:
-        price = self.unit_price
-        if self.discount_percent:
-            discount = Decimal(self.discount_percent) / Decimal("100")
-            price = price * (Decimal("1") - discount)
-        return price * Decimal(self.quantity)
+        return self.effective_unit_price * Decimal(self.quantity)
+
+    def save(self, *args, **kwargs):
+        if self.effective_unit_price is None:
+            self.effective_unit_price = effective_price_for(self.unit_price, self.discount_percent)
+        super().save(*args, **kwargs)
 
     class Meta:
         constraints = [
@@ -13,5 +13,5 @@ class OrderItemReadSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = OrderItem
-        fields = ("id", "product_id", "product_name", "unit_price", "discount_percent", "quantity", "line_total")
+        fields = ("id", "product_id", "product_name", "unit_price", "discount_percent", "effective_unit_price", "quantity", "line_total")
 
@@ -1,6 +1,7 @@
+import uuid
 from decimal import Decimal
 from django.db import transaction, IntegrityError
-from django.db.models import F
+from django.db.models import F, Sum
 from rest_framework.exceptions import ValidationError
 import rest_framework.exceptions as drf_exc
 from django.core.exceptions import ObjectDoesNotExist
@@ -10,6 +11,10 @@ from cart.models import CartItem
 from cart.models import Checkout
 from products.models import Product
 from orders.models import Order, OrderItem
+from products.services.inventory import decrement_stock, release_stock, return_order_stock, record_sales
+from cart.services.reservations import ReservationService
+from core.services import batch_expiry
+from core.errors import InsufficientStockError
 
 from datetime import timedelta
 from django.utils import timezone
@@ -40,13 +45,36 @@ class OrderService:
         order.cancel(reason=reason)
         return True
     
+    @staticmethod
+    @transaction.atomic
+    def cancel_orders(order_ids) -> int:
+        """
+        Cancels many awaiting-payment orders with set-based statements.
+
+        Stock is restored with one aggregated UPDATE across all items
+        of the batch (one cancellation movement per line), and the
+        order-bound carts are expired.
+        """
+        order_ids = list(
+            Order.objects
+            .filter(pk__in=order_ids, status="awaiting_payment")
+            .values_list("pk", flat=True)
+        )
+        if not order_ids:
+            return 0
+
+        return_order_stock(order_ids)
+
+        Cart.objects.filter(order__in=order_ids).update(status="expired")
+        return Order.objects.filter(pk__in=order_ids).update(status="cancelled")
+
     @staticmethod
     def create_order_with_cart_recovery(cart):
         """
         Creates an order from a confirmed checkout with automatic cart recovery on failure.
 
         On validation errors, the cart is reverted to "unpaid" to allow user correction
-        before retrying order creation.
+        before retrying order creation, and any stock it held is released.
         """
         try:
             return OrderService.create_order_from_confirmed_checkout(cart)
@@ -55,6 +83,7 @@ class OrderService:
         except drf_exc.ValidationError as exc:
             try:
                 Cart.objects.filter(id=cart.id).exclude(status="unpaid").update(status="unpaid")
+                ReservationService.release([cart.id])
                 cart.refresh_from_db()
                 print(f"Cart {cart.id} reverted to unpaid.")
                 
@@ -70,7 +99,9 @@ class OrderService:
         Create an order from a confirmed checkout.
 
         Only allows order creation when the cart is in a pending state.
-        Snapshots product and pricing data into order items and reduces stock.
+        Snapshots product and pricing data into order items and converts the
+        stock reserved at confirmation into a decrement. Carts without a
+        matching reservation fall back to a guarded decrement of free stock.
         Ensures idempotency by returning an existing order if one already exists.
         """
         from core.tasks import send_vendor_low_stock_alerts_task
@@ -89,53 +120,63 @@ class OrderService:
             raise ValidationError("Checkout does not exist for this cart.")
 
         # Lock cart items rows for consistent read
-        cart_items = CartItem.objects.select_for_update().filter(cart=cart).select_related("product")
-        
-        low_stock_product_ids = []
-
-        for item in cart_items:
-            product = item.product
+        cart_items = list(
+            CartItem.objects.select_for_update(of=("self",)).filter(cart=cart).select_related("product")
+        )
 
-            if item.item_quantity > product.stock:
-                raise ValidationError(
-                    f"Insufficient stock for {product.name}"
-                )
+        # Take stock for every line in one guarded statement,
+        # recording sale movements against the order about to be created
+        quantities = {item.product_id: item.item_quantity for item in cart_items}
+        held = ReservationService.take(cart)
+        if held and held != quantities:
+            release_stock(held)
 
-            previous_stock = product.stock
-            product.stock -= item.item_quantity
-            product.save(update_fields=["stock"])
+        order_id = uuid.uuid4()
+        try:
+            low_stock_product_ids = decrement_stock(
+                quantities,
+                order_id=order_id,
+                reserved=held == quantities,
+            )
 
-            if (
-                previous_stock > product.low_stock_threshold
-                and product.stock <= product.low_stock_threshold
-                and not product.low_stock_alert_sent
-            ):
-                low_stock_product_ids.append(product.id)
+        except InsufficientStockError as exc:
+            raise ValidationError(
+                [f"Insufficient stock for {item['product_name']}" for item in exc.items]
+            )
 
         if low_stock_product_ids:
-            send_vendor_low_stock_alerts_task.delay(low_stock_product_ids)
+            transaction.on_commit(
+                lambda: send_vendor_low_stock_alerts_task.delay(low_stock_product_ids)
+            )
         
+        # Snapshot each item
+        order_items = [
+            OrderItem(
+                product_id=ci.product.id,
+                product_name=ci.product.name,
+                unit_price=ci.product.original_price,
+                discount_percent=int(ci.product.discount_percent or 0),
+                effective_unit_price=ci.product.effective_price,
+                quantity=ci.item_quantity,
+            )
+            for ci in cart_items
+        ]
+        grand_total = sum((item.line_total for item in order_items), Decimal("0.00"))
+
         order = Order.objects.create(
-            customer=cart.customer,
+            id=order_id,
+            customer_id=cart.customer_id,
             cart=cart,
             status="awaiting_payment",
             shipping_address=checkout.shipping_address,
             billing_address=checkout.billing_address or checkout.shipping_address,
             payment_method=checkout.payment_method,
+            grand_total=grand_total.quantize(Decimal("0.01")),
         )
 
-        # Snapshot each item
-        OrderItem.objects.bulk_create([
-        OrderItem(
-            order=order,
-            product_id=ci.product.id,
-            product_name=ci.product.name,
-            unit_price=ci.product.original_price,
-            discount_percent=int(ci.product.discount_percent or 0),
-            quantity=ci.item_quantity,
-        )
-        for ci in cart_items
-        ])
+        for item in order_items:
+            item.order = order
+        OrderItem.objects.bulk_create(order_items)
 
         return order
 
@@ -145,7 +186,8 @@ class OrderService:
         """
         Mark an order and its cart as paid.
 
-        Validates cart state and item existence before updating statuses.
+        Validates cart state and item existence before updating statuses,
+        and adds the items to the products' `sold_quantity` ledger.
         Safe to call multiple times without duplicating effects.
         """
         if order.status == "paid":
@@ -159,8 +201,18 @@ class OrderService:
         if not cart.items.exists():
             raise ValidationError("Cannot mark order as paid with an empty cart.")
 
+        # Guarded transition, so concurrent confirmations count the sale once
+        if not Order.objects.filter(pk=order.pk).exclude(status="paid").update(status="paid"):
+            order.status = "paid"
+            return order
         order.status = "paid"
-        order.save(update_fields=["status"])
+
+        record_sales(dict(
+            order.items
+            .values("product_id")
+            .annotate(total=Sum("quantity"))
+            .values_list("product_id", "total")
+        ))
 
         cart.status = "paid"
         cart.save(update_fields=["status"])
@@ -172,9 +224,9 @@ class OrderService:
         """
         Cancels orders stuck in `awaiting_payment` beyond the configured payment TTL.
 
-        Orders older than `ORDER_PAYMENT_TTL_HOURS` are cancelled via
-        `OrderService.cancel_order` to enforce proper state transitions
-        and side effects.
+        Orders older than `ORDER_PAYMENT_TTL_HOURS` are cancelled in locked
+        chunks via `OrderService.cancel_orders`, with the same state
+        transitions and side effects as `Order.cancel`.
 
         Transient infrastructure errors trigger a retry.
         Logic errors fail fast without retry.
@@ -188,15 +240,8 @@ class OrderService:
                 created_at__lt=expiry_time,
             )
 
-            if orders:
-                logger.info("Found %s orders to invalidate", orders.count())
-                count = 0
-                
-                for order in orders.iterator():
-                    if OrderService.cancel_order(order, reason="Payment TTL exceeded"):
-                        count+=1
-                    
-                logger.info(f"Orders Invalidation Completed for {count} users")
+            count = batch_expiry.sweep(orders, OrderService.cancel_orders)
+            logger.info(f"Orders Invalidation Completed for {count} users")
 
         except (OperationalError, RedisConnectionError, KombuOperationalError) as exc:
             # Transient infra issue → retry
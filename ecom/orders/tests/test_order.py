@@ -112,3 +112,214 @@ def test_vendor_cannot_create_order(api_client, other_vendor_user):
     response = api_client.post(url, {})
 
     assert response.status_code in (status.HTTP_403_FORBIDDEN, status.HTTP_401_UNAUTHORIZED)
+
+
+@pytest.mark.django_db
+def test_order_history_uses_keyset_pagination(api_client, normal_user):
+    """
+    Ensure order history pages by cursor and only counts on request.
+
+    Verifies that:
+    - Page meta omits the count by default
+    - Following the next cursor returns the remaining orders
+    - `include_count` returns the number of orders
+    """
+    api_client.force_authenticate(user=normal_user)
+
+    for _ in range(12):
+        cart = Cart.objects.create(customer=normal_user, status="paid")
+        Order.objects.create(
+            customer=normal_user,
+            cart=cart,
+            status="paid",
+            shipping_address="Lagos",
+            billing_address="Lagos",
+            payment_method="card",
+        )
+
+    url = reverse("orders-list")
+    first = api_client.get(url)
+
+    assert first.status_code == status.HTTP_200_OK
+    assert len(first.data["data"]) == 10
+    assert "count" not in first.data["meta"]
+
+    second = api_client.get(first.data["meta"]["next"])
+    assert len(second.data["data"]) == 2
+    assert second.data["meta"]["next"] is None
+
+    seen = {row["id"] for row in first.data["data"] + second.data["data"]}
+    assert len(seen) == 12
+
+    counted = api_client.get(url, {"include_count": "true"})
+    assert counted.data["meta"]["count"] == 12
+    assert counted.data["meta"]["count_is_approximate"] is False
+
+
+def _confirmed_cart(customer, products, quantity=1):
+    cart = Cart.objects.create(customer=customer)
+    for product in products:
+        CartItem.objects.create(cart=cart, product=product, item_quantity=quantity)
+
+    Checkout.objects.create(
+        cart=cart,
+        shipping_address="Lagos",
+        billing_address="Lagos",
+        payment_method="card",
+    )
+    CheckoutService.confirm_checkout(cart)
+    cart.refresh_from_db()
+    return cart
+
+
+def _make_products(product, count, stock=10):
+    return [
+        Product.objects.create(
+            name=f"Bulk Item {index}",
+            description="Bulk item",
+            vendor=product.vendor,
+            category=product.category,
+            original_price=100,
+            stock=stock,
+        )
+        for index in range(count)
+    ]
+
+
+@pytest.mark.django_db
+def test_order_creation_query_count_does_not_grow_with_cart_size(normal_user, product):
+    """
+    Ensure stock is reserved with a constant number of queries.
+
+    Verifies that a large cart places its order with the same
+    query budget as a single-line cart and decrements every line.
+    """
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from orders.services.order import OrderService
+
+    small_cart = _confirmed_cart(normal_user, _make_products(product, 1), quantity=2)
+    with CaptureQueriesContext(connection) as small:
+        OrderService.create_order_from_confirmed_checkout(small_cart)
+
+    products = _make_products(product, 25)
+    large_cart = _confirmed_cart(normal_user, products, quantity=2)
+    with CaptureQueriesContext(connection) as large:
+        OrderService.create_order_from_confirmed_checkout(large_cart)
+
+    assert len(large.captured_queries) == len(small.captured_queries)
+    assert set(Product.objects.filter(id__in=[p.id for p in products]).values_list("stock", flat=True)) == {8}
+
+
+@pytest.mark.django_db
+def test_order_creation_reports_short_products_and_keeps_stock(normal_user, product):
+    """
+    Ensure a shortage on one line leaves every product's stock untouched.
+    """
+    from orders.services.order import OrderService
+
+    plenty, short = _make_products(product, 2)
+    cart = _confirmed_cart(normal_user, [plenty, short], quantity=3)
+
+    Product.objects.filter(id=short.id).update(stock=1)
+
+    with pytest.raises(ValidationError) as exc:
+        OrderService.create_order_from_confirmed_checkout(cart)
+
+    assert str(exc.value.detail[0]) == f"Insufficient stock for {short.name}"
+    plenty.refresh_from_db()
+    assert plenty.stock == 10
+    assert not Order.objects.filter(cart=cart).exists()
+
+
+@pytest.mark.django_db
+def test_stock_decrement_retries_transient_contention_and_names_short_products(product, monkeypatch):
+    """
+    Ensure a guard rejection caused by a write that is undone before the
+    shortage reread does not surface as an empty shortage list.
+    """
+    from django.db.models import QuerySet
+    from core.errors import InsufficientStockError
+    from products.services.inventory import decrement_stock
+
+    plenty, contended = _make_products(product, 2)
+    update = QuerySet.update
+    calls = []
+
+    def contended_update(queryset, **kwargs):
+        calls.append(kwargs)
+        if len(calls) > 1:
+            return update(queryset, **kwargs)
+        # another transaction holds the stock while the guard runs, then gives it back
+        update(Product.objects.filter(id=contended.id), stock=0)
+        updated = update(queryset, **kwargs)
+        update(Product.objects.filter(id=contended.id), stock=10)
+        return updated
+
+    monkeypatch.setattr(QuerySet, "update", contended_update)
+    decrement_stock({plenty.id: 2, contended.id: 2})
+    monkeypatch.undo()
+
+    assert len(calls) == 2
+    assert set(Product.objects.filter(id__in=[plenty.id, contended.id]).values_list("stock", flat=True)) == {8}
+
+    with pytest.raises(InsufficientStockError) as exc:
+        decrement_stock({plenty.id: 2, contended.id: 9})
+
+    assert [item["product_id"] for item in exc.value.items] == [str(contended.id)]
+
+
+@pytest.mark.django_db
+def test_order_totals_are_computed_in_sql(normal_user, product):
+    """
+    Test that the stored grand total and the SQL annotation match the item snapshots.
+    """
+    from decimal import Decimal
+    from orders.services.order import OrderService
+
+    products = _make_products(product, 2)
+    products[1].discount_percent = 15
+    products[1].save()
+
+    order = OrderService.create_order_from_confirmed_checkout(
+        _confirmed_cart(normal_user, products, quantity=3)
+    )
+    expected = sum((item.line_total for item in order.items.all()), Decimal("0.00"))
+
+    assert order.grand_total == expected == Decimal("555.00")
+
+    # orders placed before grand_total existed are summed in SQL
+    Order.objects.filter(pk=order.pk).update(grand_total=None)
+    annotated = Order.objects.with_totals().get(pk=order.pk)
+
+    assert annotated.annotated_total == expected
+    assert annotated.total_amount == expected
+
+
+@pytest.mark.django_db
+def test_unpaid_order_sweep_cancels_in_chunks_and_restocks(normal_user, other_vendor_user, product, settings):
+    """
+    Test that the unpaid order sweep cancels stale orders chunk by chunk
+    and returns their stock in aggregate.
+    """
+    from datetime import timedelta
+    from django.utils import timezone
+    from orders.services.order import OrderService
+
+    settings.EXPIRY_CHUNK_SIZE = 1
+    products = _make_products(product, 2, stock=10)
+
+    stale = [
+        OrderService.create_order_from_confirmed_checkout(_confirmed_cart(customer, products, quantity=2))
+        for customer in (normal_user, other_vendor_user)
+    ]
+    Order.objects.filter(pk__in=[order.pk for order in stale]).update(
+        created_at=timezone.now() - timedelta(hours=settings.ORDER_PAYMENT_TTL_HOURS + 1)
+    )
+
+    OrderService.cancel_unpaid_orders(None)
+
+    assert set(Order.objects.values_list("status", flat=True)) == {"cancelled"}
+    assert set(Cart.objects.values_list("status", flat=True)) == {"expired"}
+    for item in Product.objects.filter(pk__in=[p.pk for p in products]):
+        assert item.stock == 10
@@ -17,6 +17,7 @@ from orders.serializers.order import (
 )
 from core.permissions import IsCustomer, IsOrderOwnerOrAdmin
 from orders.services.order import OrderService
+from core.pagination import KeysetResultsPagination
 
 
 class OrderViewSet(ModelViewSet):
@@ -33,6 +34,8 @@ class OrderViewSet(ModelViewSet):
     renderer_classes = [JSONRenderer]
     http_method_names = ["get", "post"]
     throttle_classes = [ScopedRateThrottle]
+    pagination_class = KeysetResultsPagination
+    keyset_ordering = "-created_at"
     
     list_message = "Order history retrieved successfully."
 
@@ -43,12 +46,13 @@ class OrderViewSet(ModelViewSet):
         - Admin users can view all orders.
         - Customers can only view their own orders.
 
-        Order items are prefetched for efficient reads.
+        Order items are prefetched for efficient reads and totals
+        are computed in SQL.
         """
         user = self.request.user
         if getattr(user, "is_staff", False):
-            return Order.objects.all().prefetch_related("items")
-        return Order.objects.filter(customer=user).prefetch_related("items")
+            return Order.objects.with_totals().prefetch_related("items")
+        return Order.objects.filter(customer=user).with_totals().prefetch_related("items")
 
     def get_permissions(self):
         """
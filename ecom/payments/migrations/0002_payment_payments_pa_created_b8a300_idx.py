@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0001_initial'),
+        ('payments', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='payment',
+            index=models.Index(fields=['created_at'], name='payments_pa_created_b8a300_idx'),
+        ),
+    ]
@@ -21,5 +21,10 @@ class Payment(models.Model):
 
     created_at = models.DateTimeField(auto_now_add=True)
     
+    class Meta:
+        indexes = [
+            models.Index(fields=["created_at"]),
+        ]
+    
     def __str__(self):
         return f"Payment - {self.order.customer.email}"
\ No newline at end of file
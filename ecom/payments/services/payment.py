@@ -2,10 +2,12 @@ import uuid
 from django.db import transaction
 from rest_framework.exceptions import ValidationError
 from payments.models import Payment
-from orders.models import Order
+from orders.models import Order, OrderItem
+from django.db.models import Prefetch
+import time
 
-from asgiref.sync import async_to_sync
-from core.utils.mail_sender import send_mail_helper
+from core.utils.mail_sender import send_mail_batch
+from core.utils.mail_transport import get_transport
 from datetime import timedelta
 from django.utils import timezone
 from django.conf import settings
@@ -108,48 +110,138 @@ class PaymentService:
         OrderService.mark_order_paid(payment.order)
         message = "Your payment is confirmed"
         subject = "Payment Confirmed"
-        
-        if send_mail_helper(subject, message, payment.order.customer.email):
+
+        result = get_transport().send(subject, message, payment.order.customer.email)
+        if result["ok"]:
             payment.payment_alert = True
             payment.save(update_fields=["payment_alert"])
             
         return payment
     
     @staticmethod
-    @transaction.atomic
     def send_payment_alerts(self):
         """
         Sends payment confirmation emails for paid payments
         that have not yet received an alert.
+
+        Payments are streamed in batches with their order's item snapshot
+        names prefetched; each batch is delivered concurrently and the
+        reached payments are flagged with a single UPDATE.
         """
-        
-        payments = Payment.objects.filter(
-            status="paid",
-            payment_alert=False,
+        batch_size = settings.REMINDER_BATCH_SIZE
+        count = 0
+
+        payments = (
+            Payment.objects
+            .filter(status="paid", payment_alert=False)
+            .select_related("order__customer")
+            .prefetch_related(
+                Prefetch("order__items", queryset=OrderItem.objects.only("order_id", "product_name"))
+            )
+            .order_by("pk")
         )
 
-        if payments:
-            logger.info("Found %s payments alert message to deliver.", payments.count())
-            subject = "Payment Successful"
-            count = 0
-            
-            for payment in payments.iterator():
-                product_names = ", ".join(item.product.name for item in payment.order.cart.items)
-
-                message = f"Your payment for '{product_names}' has been confirmed."
-                email = payment.order.cart.customer.email
-                
-                if async_to_sync(send_mail_helper)(subject, message, email):
-                    payment.payment_alert = True
-                    payment.save(update_fields=["payment_alert"])
-                    count+=1
-            
-            logger.info(f"Mail Successfully Delivered to - {count} users")
+        batch = []
+        for payment in payments.iterator(chunk_size=batch_size):
+            if payment.order.customer and payment.order.customer.email:
+                batch.append(payment)
+            if len(batch) >= batch_size:
+                count += PaymentService._deliver_payment_alerts(batch)
+                batch = []
+
+        if batch:
+            count += PaymentService._deliver_payment_alerts(batch)
+
+        logger.info(f"Mail Successfully Delivered to - {count} users")
+        return count
+
+    @staticmethod
+    def _deliver_payment_alerts(payments) -> int:
+        """
+        Renders, sends and flags one batch of payment alerts.
+        """
+        results = send_mail_batch([
+            (
+                "Payment Successful",
+                "Your payment for '{}' has been confirmed.".format(
+                    ", ".join(item.product_name for item in payment.order.items.all())
+                ),
+                payment.order.customer.email,
+            )
+            for payment in payments
+        ])
+
+        delivered_ids = [payment.pk for payment, result in zip(payments, results) if result["ok"]]
+        if delivered_ids:
+            Payment.objects.filter(id__in=delivered_ids).update(payment_alert=True)
+        return len(delivered_ids)
+
+    @staticmethod
+    def send_order_reminders(orders, subject, template, flag_field) -> dict:
+        """
+        Sends one reminder per order and flags the orders that were reached.
+
+        Orders are streamed in batches with their item snapshot names
+        prefetched, so rendering costs no per-order queries. Each batch is
+        delivered concurrently and the successful ids are flagged with a
+        single UPDATE. Returns throughput metrics for the run.
+        """
+        started = time.monotonic()
+        batch_size = settings.REMINDER_BATCH_SIZE
+        sent = failed = 0
+
+        orders = (
+            orders
+            .select_related("customer")
+            .prefetch_related(
+                Prefetch("items", queryset=OrderItem.objects.only("order_id", "product_name"))
+            )
+            .order_by("pk")
+        )
+
+        batch = []
+        for order in orders.iterator(chunk_size=batch_size):
+            if order.customer and order.customer.email:
+                batch.append(order)
+            if len(batch) >= batch_size:
+                delivered = PaymentService._deliver_reminders(batch, subject, template, flag_field)
+                sent, failed = sent + delivered, failed + len(batch) - delivered
+                batch = []
+
+        if batch:
+            delivered = PaymentService._deliver_reminders(batch, subject, template, flag_field)
+            sent, failed = sent + delivered, failed + len(batch) - delivered
+
+        seconds = time.monotonic() - started
+        metrics = {
+            "sent": sent,
+            "failed": failed,
+            "seconds": round(seconds, 3),
+            "per_second": round((sent + failed) / seconds, 1) if seconds else 0,
+        }
+        logger.info("Reminder run for %s: %s", flag_field, metrics)
+        return metrics
+
+    @staticmethod
+    def _deliver_reminders(orders, subject, template, flag_field) -> int:
+        """
+        Renders, sends and flags one batch of reminders.
+        """
+        results = send_mail_batch([
+            (
+                subject,
+                template.format(product_names=", ".join(item.product_name for item in order.items.all())),
+                order.customer.email,
+            )
+            for order in orders
+        ])
+
+        delivered_ids = [order.pk for order, result in zip(orders, results) if result["ok"]]
+        if delivered_ids:
+            Order.objects.filter(pk__in=delivered_ids).update(**{flag_field: True})
+        return len(delivered_ids)
 
-    
-    
     @staticmethod
-    @transaction.atomic
     def send_payment_reminder_24h(self):
         """
         Sends a payment reminder to customers with orders still
@@ -164,24 +256,13 @@ class PaymentService:
                 created_at__lte=cutoff,
                 payment_reminder_sent=False,
             )
-            
-            if orders:
-                logger.info("Found %s orders to push mail reminders to - ", orders.count())
-                subject = "Pending Payment for your Order"
-                count = 0
-                
-                for order in orders.iterator():
-                    product_names = ", ".join(item.product.name for item in order.cart.items)
-
-                    message = f"Your payment for '{product_names}' is still pending. Your order will expire in 12hours."
-                    email = order.customer.email
-                    
-                    if async_to_sync(send_mail_helper)(subject, message, email):
-                        order.payment_reminder_sent = True
-                        order.save(update_fields=["payment_reminder_sent"])
-                        count+=1
-                    
-                logger.info(f"Mail Successfully Delivered to - {count} users")
+
+            return PaymentService.send_order_reminders(
+                orders,
+                subject="Pending Payment for your Order",
+                template="Your payment for '{product_names}' is still pending. Your order will expire in 12hours.",
+                flag_field="payment_reminder_sent",
+            )
             
         except (OperationalError, RedisConnectionError, KombuOperationalError) as exc:
             logger.error("Transient failure in cleanup_abandoned_carts", exc_info=True)
@@ -196,7 +277,6 @@ class PaymentService:
     
     
     @staticmethod
-    @transaction.atomic
     def send_final_payment_reminder(self):
         """
         Sends a final payment reminder within the configured
@@ -216,23 +296,13 @@ class PaymentService:
                 created_at__lte=end,
                 final_payment_reminder_sent=False,
             )
-            
-            if orders:
-                logger.info("Found %s orders to push mail reminders to - ", orders.count())
-                subject = "Pending Payment for your Order - Expires in few hours"
-                count = 0
-                
-                for order in orders.iterator():
-                    product_names = ", ".join(item.product.name for item in order.cart.items)
-                    message = f"Your payment for '{product_names}' is still pending. Your order will expire in few hours."
-                    email = order.customer.email
-                    
-                    if  async_to_sync(send_mail_helper)(subject, message, email):
-                        order.final_payment_reminder_sent = True
-                        order.save(update_fields=["final_payment_reminder_sent"])
-                        count+=1
-                
-                logger.info(f"Mail Successfully Delivered to - {count} users")
+
+            return PaymentService.send_order_reminders(
+                orders,
+                subject="Pending Payment for your Order - Expires in few hours",
+                template="Your payment for '{product_names}' is still pending. Your order will expire in few hours.",
+                flag_field="final_payment_reminder_sent",
+            )
             
         except (OperationalError, RedisConnectionError, KombuOperationalError) as exc:
             logger.error("Transient failure in cleanup_abandoned_carts", exc_info=True)
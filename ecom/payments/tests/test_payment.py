@@ -1,3 +1,4 @@
+import uuid
 import pytest
 from django.urls import reverse
 from rest_framework import status
@@ -111,3 +112,113 @@ def test_confirm_payment_marks_order_paid(api_client, normal_user, product):
     assert cart.status == "paid"
 
 
+
+
+@pytest.mark.django_db
+def test_payment_reminders_are_batched(normal_user, fake_mail, settings):
+    """
+    Test that 24h reminders render from item snapshots without per-order
+    queries and only flag the orders that were delivered.
+    """
+    from datetime import timedelta
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from django.utils import timezone
+    from accounts.models import CustomUser
+    from cart.models import Cart
+    from orders.models import Order, OrderItem
+    from payments.services.payment import PaymentService
+
+    settings.REMINDER_BATCH_SIZE = 3
+    created_at = timezone.now() - timedelta(hours=settings.PAYMENT_REMINDER_24H_TTL_HOURS + 1)
+
+    for index in range(7):
+        customer = CustomUser.objects.create_user(
+            email=f"reminder{index}@test.com",
+            password="pass12345",
+            phone_number=f"+23481000000{index:02d}",
+            role="customer",
+        )
+        order = Order.objects.create(
+            customer=customer,
+            cart=Cart.objects.create(customer=customer, status="pending"),
+            status="awaiting_payment",
+        )
+        OrderItem.objects.create(
+            order=order, product_id=uuid.uuid4(), product_name=f"Item {index}", unit_price=10
+        )
+    Order.objects.update(created_at=created_at)
+    fake_mail.fail_for.add("reminder6@test.com")
+
+    with CaptureQueriesContext(connection) as queries:
+        metrics = PaymentService.send_payment_reminder_24h(None)
+
+    assert metrics["sent"] == 6
+    assert metrics["failed"] == 1
+    # per batch of 3: one order chunk, one items prefetch, one UPDATE
+    assert len(queries) <= 3 * 3
+    assert any("'Item 0'" in mail["HTML_MESSAGE"] for mail in fake_mail.sent)
+    assert Order.objects.filter(payment_reminder_sent=True).count() == 6
+    assert not Order.objects.get(customer__email="reminder6@test.com").payment_reminder_sent
+
+
+@pytest.mark.django_db
+def test_payment_alerts_render_from_snapshots_and_flag_delivered(normal_user, fake_mail, settings):
+    """
+    Test that payment alerts name the ordered items without per-payment
+    queries and only flag payments whose mail was delivered.
+    """
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from accounts.models import CustomUser
+    from orders.models import OrderItem
+
+    settings.REMINDER_BATCH_SIZE = 3
+
+    for index in range(5):
+        customer = CustomUser.objects.create_user(
+            email=f"paid{index}@test.com",
+            password="pass12345",
+            phone_number=f"+23481100000{index:02d}",
+            role="customer",
+        )
+        order = Order.objects.create(
+            customer=customer,
+            cart=Cart.objects.create(customer=customer, status="paid"),
+            status="paid",
+        )
+        OrderItem.objects.create(
+            order=order, product_id=uuid.uuid4(), product_name=f"Paid item {index}", unit_price=10
+        )
+        Payment.objects.create(order=order, amount=10, reference=uuid.uuid4().hex, status="paid")
+    fake_mail.fail_for.add("paid4@test.com")
+
+    with CaptureQueriesContext(connection) as queries:
+        assert PaymentService.send_payment_alerts(None) == 4
+
+    # per batch of 3: one payment chunk, one items prefetch, one UPDATE
+    assert len(queries) <= 2 * 3
+    assert set(Payment.objects.filter(payment_alert=True).values_list("order__customer__email", flat=True)) == {
+        f"paid{index}@test.com" for index in range(4)
+    }
+    assert any("'Paid item 0'" in mail["HTML_MESSAGE"] for mail in fake_mail.sent)
+
+
+@pytest.mark.django_db
+def test_confirm_payment_leaves_alert_pending_when_mail_fails(normal_user, product, fake_mail):
+    """
+    Test that a failed confirmation mail leaves the payment for the alert job.
+    """
+    cart = Cart.objects.create(customer=normal_user)
+    CartItem.objects.create(cart=cart, product=product, item_quantity=1)
+    Checkout.objects.create(cart=cart, shipping_address="Lagos", billing_address="Lagos", payment_method="card")
+    CheckoutService.confirm_checkout(cart)
+    cart.refresh_from_db()
+
+    payment = PaymentService.initiate_payment(OrderService.create_order_with_cart_recovery(cart))
+    fake_mail.fail_for.add(normal_user.email)
+
+    payment = PaymentService.confirm_payment(payment.reference)
+
+    assert payment.status == "paid"
+    assert Payment.objects.get(pk=payment.pk).payment_alert is False
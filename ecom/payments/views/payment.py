@@ -14,6 +14,7 @@ from payments.serializers.payment import (
 from core.permissions import IsPaymentOwnerOrAdmin, IsCustomer
 from payments.services.payment import PaymentService
 from orders.models import Order
+from core.pagination import KeysetResultsPagination
 
 
 class PaymentViewSet(ModelViewSet):
@@ -30,6 +31,8 @@ class PaymentViewSet(ModelViewSet):
     renderer_classes = [JSONRenderer]
     http_method_names = ["get", "post"]
     throttle_classes = [ScopedRateThrottle]
+    pagination_class = KeysetResultsPagination
+    keyset_ordering = "-created_at"
     
     list_message = "Payments history retrieved successfully."
 
@@ -112,7 +115,7 @@ class PaymentViewSet(ModelViewSet):
 
         order_id = serializer.validated_data["order_id"]
 
-        order = Order.objects.get(id=order_id, customer=request.user)
+        order = Order.objects.with_totals().get(id=order_id, customer=request.user)
 
         serializer.is_valid(raise_exception=True)
 
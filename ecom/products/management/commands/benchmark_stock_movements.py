@@ -0,0 +1,57 @@
+import time
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from products.models import Product, StockMovement
+from products.services import inventory
+
+TARGET_PER_SECOND = 10_000
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures stock movement ingestion throughput. "
+        "Everything written is rolled back afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--movements", type=int, default=50_000)
+        parser.add_argument("--products", type=int, default=100, help="Spread movements over this many products.")
+
+    def handle(self, movements, products, **options):
+        product_ids = list(Product.objects.values_list("id", flat=True)[:products])
+        if not product_ids:
+            raise CommandError("Create at least one product before benchmarking.")
+
+        # old enough for the snapshot pass to fold in
+        settled = timezone.now() - timedelta(seconds=settings.STOCK_SNAPSHOT_SETTLE_SECONDS + 1)
+        rows = [
+            StockMovement(
+                product_id=product_ids[position % len(product_ids)],
+                delta=1 if position % 2 else -1,
+                reason=StockMovement.Reason.ADJUSTMENT,
+                created_at=settled,
+            )
+            for position in range(movements)
+        ]
+
+        with transaction.atomic():
+            started = time.perf_counter()
+            inventory.record_movements(rows)
+            elapsed = time.perf_counter() - started
+
+            snapshot_started = time.perf_counter()
+            snapshots = inventory.take_snapshots()
+            snapshot_elapsed = time.perf_counter() - snapshot_started
+
+            transaction.set_rollback(True)
+
+        rate = movements / elapsed
+        style = self.style.SUCCESS if rate >= TARGET_PER_SECOND else self.style.WARNING
+        self.stdout.write(style(
+            f"Ingested {movements} movements in {elapsed:.2f}s ({rate:,.0f}/s, target {TARGET_PER_SECOND:,}/s)"
+        ))
+        self.stdout.write(f"Snapshotted {snapshots} products in {snapshot_elapsed:.2f}s")
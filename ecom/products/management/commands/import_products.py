@@ -0,0 +1,58 @@
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework.exceptions import ValidationError
+
+from accounts.models import Vendor
+from products.services import bulk_import
+
+
+class Command(BaseCommand):
+    help = "Bulk-imports products for a vendor from a CSV or JSONL file."
+
+    def add_arguments(self, parser):
+        parser.add_argument("vendor_id", help="Id of the vendor that will own the products.")
+        parser.add_argument("path", help="CSV or JSONL file to import.")
+        parser.add_argument("--format", choices=bulk_import.FORMATS, help="Defaults to the file extension.")
+        parser.add_argument(
+            "--async",
+            action="store_true",
+            dest="run_async",
+            help="Queue the import on Celery instead of running it here.",
+        )
+        parser.add_argument("--report", help="Write per-row errors to this CSV file ('-' for stdout).")
+
+    def handle(self, vendor_id, path, format=None, run_async=False, report=None, **options):
+        try:
+            vendor = Vendor.objects.get(id=vendor_id)
+        except (Vendor.DoesNotExist, DjangoValidationError):
+            raise CommandError(f"Vendor {vendor_id} does not exist.")
+
+        try:
+            fmt = bulk_import.detect_format(path, format)
+        except ValidationError as exc:
+            raise CommandError(exc.detail["format"])
+
+        with open(path, "rb") as stream:
+            product_import = bulk_import.stage_import(vendor, stream, fmt, file_name=path)
+
+        job_id = str(product_import.id)
+        self.stdout.write(f"Staged {product_import.total_rows} rows as import {job_id}")
+
+        if run_async:
+            from core.tasks import import_products_task
+
+            import_products_task.apply_async(args=[job_id], task_id=job_id)
+            self.stdout.write(f"Queued import job {job_id}")
+            return
+
+        product_import = bulk_import.run_import(job_id)
+        self.stdout.write(self.style.SUCCESS(
+            f"Created {product_import.created_count} products, {product_import.failed_count} rows failed"
+        ))
+
+        if report:
+            if report == "-":
+                bulk_import.write_report(product_import, self.stdout)
+            else:
+                with open(report, "w", newline="") as out:
+                    bulk_import.write_report(product_import, out)
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:23
+
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+def create_search_indexes(apps, schema_editor):
+    # GIN indexes and tsvector backfill only exist on PostgreSQL
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS products_product_search_vector_gin "
+        "ON products_product USING gin (search_vector)"
+    )
+    schema_editor.execute(
+        "CREATE INDEX IF NOT EXISTS products_product_name_trgm "
+        "ON products_product USING gin (name gin_trgm_ops)"
+    )
+    schema_editor.execute(
+        "UPDATE products_product SET search_vector = "
+        "setweight(to_tsvector('english', coalesce(name, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(description, '')), 'B')"
+    )
+
+
+def drop_search_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != "postgresql":
+        return
+
+    schema_editor.execute("DROP INDEX IF EXISTS products_product_search_vector_gin")
+    schema_editor.execute("DROP INDEX IF EXISTS products_product_name_trgm")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0002_product_is_active'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='category',
+            options={'ordering': ['name']},
+        ),
+        TrigramExtension(),
+        migrations.AddField(
+            model_name='product',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_search_indexes, drop_search_indexes),
+    ]
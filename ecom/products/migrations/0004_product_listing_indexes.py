@@ -0,0 +1,30 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:26
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0008_bankaccount_created_at'),
+        ('products', '0003_product_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['is_active', 'category', 'created_at'], name='product_active_category_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['is_active', 'vendor', 'created_at'], name='product_active_vendor_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['is_active', 'original_price'], name='product_active_price_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['is_active', 'created_at'], name='product_active_created_idx'),
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:30
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce, Round
+
+
+def backfill_effective_price(apps, schema_editor):
+    Product = apps.get_model("products", "Product")
+    Product.objects.update(
+        effective_price=Round(
+            models.ExpressionWrapper(
+                models.F("original_price")
+                * (models.Value(100) - Coalesce(models.F("discount_percent"), models.Value(0)))
+                / models.Value(100),
+                output_field=models.DecimalField(max_digits=10, decimal_places=2),
+            ),
+            2,
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0008_bankaccount_created_at'),
+        ('products', '0004_product_listing_indexes'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='product',
+            name='product_active_price_idx',
+        ),
+        migrations.AddField(
+            model_name='product',
+            name='effective_price',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=10),
+        ),
+        migrations.RunPython(backfill_effective_price, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['is_active', 'effective_price'], name='product_active_eff_price_idx'),
+        ),
+    ]
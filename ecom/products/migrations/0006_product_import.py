@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:35
+
+import django.db.models.deletion
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0008_bankaccount_created_at'),
+        ('products', '0005_product_effective_price'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductImport',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('file_name', models.CharField(blank=True, max_length=255)),
+                ('status', models.CharField(choices=[('queued', 'Queued'), ('running', 'Running'), ('completed', 'Completed'), ('failed', 'Failed')], default='queued', max_length=20)),
+                ('total_rows', models.PositiveIntegerField(default=0)),
+                ('processed_rows', models.PositiveIntegerField(default=0)),
+                ('created_count', models.PositiveIntegerField(default=0)),
+                ('failed_count', models.PositiveIntegerField(default=0)),
+                ('errors', models.JSONField(blank=True, default=list)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('vendor', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='product_imports', to='accounts.vendor')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ProductImportChunk',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveIntegerField()),
+                ('rows', models.JSONField()),
+                ('product_import', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='chunks', to='products.productimport')),
+            ],
+            options={
+                'ordering': ['position'],
+                'constraints': [models.UniqueConstraint(fields=('product_import', 'position'), name='unique_import_chunk_position')],
+            },
+        ),
+    ]
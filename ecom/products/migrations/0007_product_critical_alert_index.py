@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0008_bankaccount_created_at'),
+        ('products', '0006_product_import'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(condition=models.Q(('critical_stock_alert_sent', False)), fields=['stock'], name='product_critical_alert_idx'),
+        ),
+    ]
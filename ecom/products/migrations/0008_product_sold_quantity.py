@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:40
+
+from django.db import migrations, models
+from django.db.models.functions import Coalesce
+
+
+def backfill_sold_quantity(apps, schema_editor):
+    Product = apps.get_model("products", "Product")
+    OrderItem = apps.get_model("orders", "OrderItem")
+
+    sold = (
+        OrderItem.objects
+        .filter(order__status="paid", product_id=models.OuterRef("pk"))
+        .order_by()
+        .values("product_id")
+        .annotate(total=models.Sum("quantity"))
+        .values("total")
+    )
+    Product.objects.update(
+        sold_quantity=Coalesce(models.Subquery(sold), models.Value(0))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('orders', '0003_orderitem_effective_unit_price'),
+        ('products', '0007_product_critical_alert_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='sold_quantity',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_sold_quantity, migrations.RunPython.noop),
+    ]
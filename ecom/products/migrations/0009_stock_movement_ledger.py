@@ -0,0 +1,63 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:43
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def snapshot_existing_stock(apps, schema_editor):
+    # history starts here: current stock becomes each product's first snapshot
+    Product = apps.get_model("products", "Product")
+    StockSnapshot = apps.get_model("products", "StockSnapshot")
+
+    now = timezone.now()
+    rows = Product.objects.filter(stock__gt=0).values_list("id", "stock")
+    StockSnapshot.objects.bulk_create(
+        (
+            StockSnapshot(product_id=product_id, stock=stock, last_movement_id=0, taken_at=now)
+            for product_id, stock in rows.iterator()
+        ),
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0008_product_sold_quantity'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StockMovement',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('delta', models.IntegerField()),
+                ('reason', models.CharField(choices=[('initial', 'Initial stock'), ('sale', 'Sale'), ('cancellation', 'Order cancellation'), ('adjustment', 'Manual adjustment')], max_length=20)),
+                ('order_id', models.UUIDField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('actor', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to=settings.AUTH_USER_MODEL)),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_movements', to='products.product')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['product', 'id'], name='stock_movement_product_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='StockSnapshot',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('stock', models.IntegerField()),
+                ('last_movement_id', models.BigIntegerField()),
+                ('taken_at', models.DateTimeField()),
+                ('product', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stock_snapshots', to='products.product')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['product', '-taken_at'], name='stock_snapshot_product_idx')],
+            },
+        ),
+        migrations.RunPython(snapshot_existing_stock, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 06:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0009_stock_movement_ledger'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='reserved_stock',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:41
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+BATCH_SIZE = 1000
+
+
+def copy_import_errors(apps, schema_editor):
+    """
+    Moves the errors of existing imports from the JSON list into rows.
+    """
+    ProductImport = apps.get_model("products", "ProductImport")
+    ProductImportError = apps.get_model("products", "ProductImportError")
+
+    for import_id, errors in ProductImport.objects.values_list("id", "errors").iterator():
+        ProductImportError.objects.bulk_create(
+            [
+                ProductImportError(
+                    product_import_id=import_id,
+                    line=error["line"],
+                    field=error["field"],
+                    message=error["message"],
+                )
+                for error in errors or []
+            ],
+            batch_size=BATCH_SIZE,
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0010_product_reserved_stock'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProductImportError',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('line', models.PositiveIntegerField()),
+                ('field', models.CharField(max_length=100)),
+                ('message', models.TextField()),
+                ('product_import', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='row_errors', to='products.productimport')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['product_import', 'line'], name='import_error_line_idx')],
+            },
+        ),
+        migrations.RunPython(copy_import_errors, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='productimport',
+            name='errors',
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-17 07:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('products', '0011_product_import_errors'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='stocksnapshot',
+            name='stock_snapshot_product_idx',
+        ),
+        migrations.AddIndex(
+            model_name='stocksnapshot',
+            index=models.Index(fields=['product', '-last_movement_id'], name='stock_snapshot_latest_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='stocksnapshot',
+            index=models.Index(fields=['last_movement_id'], name='stock_snapshot_watermark_idx'),
+        ),
+    ]
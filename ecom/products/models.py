@@ -1,12 +1,28 @@
 from django.db import models
-from accounts.models import Vendor
-from django.utils.text import slugify
+from accounts.models import Vendor, CustomUser
 from django.utils import timezone
-from django.db.models import F
 from django.core.validators import MinValueValidator, MaxValueValidator
 from cloudinary.models import CloudinaryField
+from django.contrib.postgres.search import SearchVectorField
+from products.services import catalog_cache, slugs
+from functools import partial
+from decimal import Decimal, ROUND_HALF_UP
 import uuid
 
+# Product fields that determine `effective_price`
+PRICING_FIELDS = frozenset({"original_price", "discount_percent"})
+
+
+def effective_price_for(original_price, discount_percent) -> Decimal:
+    """
+    Returns the unit price after discount, rounded to the cent.
+    """
+    price = Decimal(original_price)
+    discount_percent = Decimal(discount_percent or 0)
+    return (price * (Decimal("100") - discount_percent) / Decimal("100")).quantize(
+        Decimal("0.01"), rounding=ROUND_HALF_UP
+    )
+
 # Create your models here.
 class Category(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -26,18 +42,12 @@ class Category(models.Model):
         if self.name:
             self.name = self.name.title()
         if not self.slug:
-            self.slug = self.create_slug_for_category
+            return slugs.save_with_slug(self, self.name, partial(super().save, *args, **kwargs))
         super().save(*args, **kwargs)
 
     @property
     def create_slug_for_category(self):
-        baseURL = slugify(self.name)
-        slug = baseURL
-        counter = 1
-        while Category.objects.filter(slug=slug).exists():
-            slug = f"{baseURL}-{counter}"
-            counter += 1
-        return slug
+        return slugs.allocate_slug(Category, self.name)
     
 
 class Product(models.Model):
@@ -55,6 +65,10 @@ class Product(models.Model):
         help_text="Stock quantity when the product was first created"
     )
     stock = models.PositiveIntegerField(default=0)
+    # units held by confirmed checkouts, see cart.StockReservation
+    reserved_stock = models.PositiveIntegerField(default=0)
+    # units sold through paid orders, kept in step by OrderService.mark_order_paid
+    sold_quantity = models.PositiveIntegerField(default=0)
     low_stock_threshold = models.PositiveIntegerField(
         default=5,
         help_text="Alert when stock falls below this quantity",
@@ -74,9 +88,14 @@ class Product(models.Model):
         default=0,
         null=True, blank=True
     )
+    # unit price after discount, kept in step with the pricing fields on save
+    effective_price = models.DecimalField(max_digits=10, decimal_places=2, default=0, editable=False)
     is_active = models.BooleanField(default=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+
+    # weighted name/description vector, maintained on save (Postgres only)
+    search_vector = SearchVectorField(null=True, editable=False)
     
     class Meta:
         constraints = [
@@ -85,6 +104,19 @@ class Product(models.Model):
                 name="stock_cannot_be_negative",
             )
         ]
+        # Back the filtered and sorted public listings
+        indexes = [
+            models.Index(fields=["is_active", "category", "created_at"], name="product_active_category_idx"),
+            models.Index(fields=["is_active", "vendor", "created_at"], name="product_active_vendor_idx"),
+            models.Index(fields=["is_active", "effective_price"], name="product_active_eff_price_idx"),
+            models.Index(fields=["is_active", "created_at"], name="product_active_created_idx"),
+            # only products still awaiting a critical stock alert
+            models.Index(
+                fields=["stock"],
+                condition=models.Q(critical_stock_alert_sent=False),
+                name="product_critical_alert_idx",
+            ),
+        ]
         
     def __str__(self):
         return self.name
@@ -92,8 +124,14 @@ class Product(models.Model):
     def save(self, *args, **kwargs):
         if self.name:
             self.name = self.name.title().strip()
+
+        self.effective_price = effective_price_for(self.original_price, self.discount_percent)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and PRICING_FIELDS & set(update_fields):
+            kwargs["update_fields"] = {*update_fields, "effective_price"}
+
         if not self.slug:
-            self.slug = self.generated_slug
+            return slugs.save_with_slug(self, self.name, partial(super().save, *args, **kwargs))
         super().save(*args, **kwargs)
         
     
@@ -105,33 +143,132 @@ class Product(models.Model):
             self.low_stock_alert_sent = False
             self.critical_stock_alert_sent = False
             
-    def update_stock(self, new_stock: int):
-        if new_stock == self.stock:
-            return
-
-        now = timezone.now()
-
-        Product.objects.filter(pk=self.pk).update(
-            stock=new_stock,
-            last_activity_at=now,
-            low_stock_alert_sent=(
-                False if new_stock > self.low_stock_threshold else F("low_stock_alert_sent")
-            ),
-            critical_stock_alert_sent=(
-                False if new_stock > self.low_stock_threshold else F("critical_stock_alert_sent")
-            ),
-        )
+    def update_stock(self, new_stock: int, actor=None):
+        """
+        Sets the stock level through the inventory service, recording the movement.
+        """
+        from products.services import inventory
 
-        # keep in-memory instance in sync
-        self.stock = new_stock
-        self.last_activity_at = now
+        inventory.set_stock(self, new_stock, actor=actor)
 
     @property
     def generated_slug(self):
-        baseURL = slugify(self.name)
-        product_slug = baseURL
-        counter = 1
-        while Product.objects.filter(slug=product_slug).exists():
-            product_slug = f"{baseURL}-{counter}"
-            counter += 1
-        return product_slug
+        return slugs.allocate_slug(Product, self.name)
+
+
+class ProductImport(models.Model):
+    """
+    A vendor's bulk product import, tracked by its Celery job id.
+    """
+    STATUS_CHOICES = [
+        ("queued", "Queued"),
+        ("running", "Running"),
+        ("completed", "Completed"),
+        ("failed", "Failed"),
+    ]
+    # doubles as the Celery task id
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    vendor = models.ForeignKey(Vendor, on_delete=models.CASCADE, related_name="product_imports")
+    file_name = models.CharField(max_length=255, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="queued")
+    total_rows = models.PositiveIntegerField(default=0)
+    processed_rows = models.PositiveIntegerField(default=0)
+    created_count = models.PositiveIntegerField(default=0)
+    failed_count = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f"ProductImport {self.id} ({self.status})"
+
+
+class ProductImportChunk(models.Model):
+    """
+    Parsed rows of an import waiting to be processed.
+
+    Each chunk is deleted in the same transaction that inserts its
+    products, so an interrupted import resumes where it stopped.
+    """
+    product_import = models.ForeignKey(ProductImport, on_delete=models.CASCADE, related_name="chunks")
+    position = models.PositiveIntegerField()
+    # [[line, row], ...]
+    rows = models.JSONField()
+
+    class Meta:
+        ordering = ["position"]
+        constraints = [
+            models.UniqueConstraint(fields=["product_import", "position"], name="unique_import_chunk_position"),
+        ]
+
+
+class ProductImportError(models.Model):
+    """
+    One per-row problem found by an import.
+
+    Append-only, so each chunk inserts its own errors instead of
+    rewriting a growing list on the import.
+    """
+    id = models.BigAutoField(primary_key=True)
+    product_import = models.ForeignKey(ProductImport, on_delete=models.CASCADE, related_name="row_errors")
+    line = models.PositiveIntegerField()
+    field = models.CharField(max_length=100)
+    message = models.TextField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["product_import", "line"], name="import_error_line_idx"),
+        ]
+
+
+class StockMovement(models.Model):
+    """
+    Append-only record of one change to a product's stock.
+
+    Written by `products.services.inventory` alongside every stock
+    update; the stock level at any time is the latest `StockSnapshot`
+    plus the movements after it.
+    """
+
+    class Reason(models.TextChoices):
+        INITIAL = "initial", "Initial stock"
+        SALE = "sale", "Sale"
+        CANCELLATION = "cancellation", "Order cancellation"
+        ADJUSTMENT = "adjustment", "Manual adjustment"
+
+    id = models.BigAutoField(primary_key=True)
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="stock_movements")
+    delta = models.IntegerField()
+    reason = models.CharField(max_length=20, choices=Reason.choices)
+    order_id = models.UUIDField(null=True, blank=True)
+    actor = models.ForeignKey(CustomUser, on_delete=models.SET_NULL, null=True, blank=True, related_name="+")
+    created_at = models.DateTimeField(default=timezone.now)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["product", "id"], name="stock_movement_product_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} {self.delta:+d} ({self.reason})"
+
+
+class StockSnapshot(models.Model):
+    """
+    Materialized stock level of a product after a given movement.
+    """
+    id = models.BigAutoField(primary_key=True)
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="stock_snapshots")
+    stock = models.IntegerField()
+    # every movement up to this id is included in `stock`
+    last_movement_id = models.BigIntegerField()
+    taken_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            # latest snapshot of a product, and the global watermark
+            models.Index(fields=["product", "-last_movement_id"], name="stock_snapshot_latest_idx"),
+            models.Index(fields=["last_movement_id"], name="stock_snapshot_watermark_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} = {self.stock} at {self.taken_at}"
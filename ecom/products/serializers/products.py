@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from products.models import Product
+from products.models import Product, ProductImport
 from PIL import Image
 
 class ProductSerializer(serializers.ModelSerializer):
@@ -19,6 +19,7 @@ class ProductSerializer(serializers.ModelSerializer):
             "original_price",
             "discount_percent",
             "discount_amount",
+            "effective_price",
             "created_at",
             "updated_at",
         )
@@ -27,6 +28,7 @@ class ProductSerializer(serializers.ModelSerializer):
             "slug",
             "vendor",
             "discount_amount",
+            "effective_price",
             "created_at",
             "updated_at",
         )
@@ -76,3 +78,69 @@ class ProductSerializer(serializers.ModelSerializer):
             )
 
         return attrs
+
+
+class ProductImportRowSerializer(ProductSerializer):
+    """
+    Validates one row of a bulk product import.
+
+    Applies the same field and pricing rules as `ProductSerializer`.
+    Images are given as a URL, and categories as raw ids that the
+    importer checks for a whole batch in one query.
+    """
+    category = serializers.UUIDField(required=False, allow_null=True)
+
+    class Meta(ProductSerializer.Meta):
+        fields = (
+            "name",
+            "category",
+            "description",
+            "srcURL",
+            "stock",
+            "original_price",
+            "discount_percent",
+        )
+        read_only_fields = ()
+
+
+class ProductImportSerializer(serializers.ModelSerializer):
+    """
+    Progress of a bulk product import.
+    """
+    job_id = serializers.UUIDField(source="id", read_only=True)
+    error_count = serializers.IntegerField(source="failed_count", read_only=True)
+
+    class Meta:
+        model = ProductImport
+        fields = (
+            "job_id",
+            "file_name",
+            "status",
+            "total_rows",
+            "processed_rows",
+            "created_count",
+            "error_count",
+            "created_at",
+            "finished_at",
+        )
+        read_only_fields = fields
+
+
+class ProductBulkUpdateItemSerializer(serializers.Serializer):
+    """
+    Validates one row of a bulk stock and price update.
+    """
+    id = serializers.UUIDField(required=False)
+    slug = serializers.SlugField(required=False)
+    stock = serializers.IntegerField(min_value=0, required=False)
+    original_price = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=0, required=False)
+    discount_percent = serializers.IntegerField(min_value=0, max_value=70, required=False)
+
+    def validate(self, attrs):
+        if not attrs.get("id") and not attrs.get("slug"):
+            raise serializers.ValidationError("Either id or slug is required.")
+
+        if not {"stock", "original_price", "discount_percent"} & attrs.keys():
+            raise serializers.ValidationError("Nothing to update.")
+
+        return attrs
@@ -0,0 +1,262 @@
+import csv
+import io
+import json
+from itertools import islice
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+
+from products.models import Category, Product, ProductImport, ProductImportChunk, ProductImportError
+from products.serializers.products import ProductImportRowSerializer
+from products.services import catalog_cache, inventory, search, slugs
+from products.services.products import _apply_pricing
+
+import logging
+logger = logging.getLogger(__name__)
+
+FORMATS = ("csv", "jsonl")
+REPORT_COLUMNS = ("line", "field", "message")
+REPORT_BATCH_SIZE = 2000
+# bytes of CSV gathered before a report chunk is sent
+REPORT_BUFFER_SIZE = 64 * 1024
+
+
+def detect_format(file_name, requested=None) -> str:
+    """
+    Returns the import format, from the explicit choice or the file extension.
+    """
+    if requested:
+        fmt = requested.lower()
+    elif file_name.lower().endswith(".csv"):
+        fmt = "csv"
+    elif file_name.lower().endswith((".jsonl", ".ndjson")):
+        fmt = "jsonl"
+    else:
+        fmt = None
+
+    if fmt not in FORMATS:
+        raise ValidationError({"format": "Upload a .csv or .jsonl file, or pass format=csv|jsonl."})
+    return fmt
+
+
+def iter_rows(stream, fmt):
+    """
+    Yields `(line, row, error)` from a binary stream, one record at a time.
+
+    Rows are dicts with empty cells dropped; unparseable records carry an
+    error message instead.
+    """
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+
+    if fmt == "csv":
+        reader = csv.DictReader(text)
+        for row in reader:
+            yield reader.line_num, {
+                key: value for key, value in row.items() if key and value not in ("", None)
+            }, None
+        return
+
+    for line, raw in enumerate(text, start=1):
+        if not raw.strip():
+            continue
+        try:
+            row = json.loads(raw)
+        except ValueError as exc:
+            yield line, None, f"Invalid JSON: {exc}"
+            continue
+        if not isinstance(row, dict):
+            yield line, None, "Each line must be a JSON object."
+            continue
+        yield line, {key: value for key, value in row.items() if value not in ("", None)}, None
+
+
+def stage_import(vendor, stream, fmt, file_name="") -> ProductImport:
+    """
+    Parses an upload into staged chunks and returns the queued import.
+
+    The stream is read incrementally, so memory use is bounded by the
+    batch size rather than the file size.
+    """
+    batch_size = settings.PRODUCT_IMPORT_BATCH_SIZE
+    product_import = ProductImport.objects.create(vendor=vendor, file_name=file_name)
+
+    rows = iter_rows(stream, fmt)
+    total = 0
+    errors = []
+    position = 0
+
+    while batch := list(islice(rows, batch_size)):
+        total += len(batch)
+        errors.extend(_error(line, "non_field_errors", error) for line, _, error in batch if error)
+        staged = [[line, row] for line, row, error in batch if not error]
+        if staged:
+            ProductImportChunk.objects.create(product_import=product_import, position=position, rows=staged)
+            position += 1
+
+    product_import.total_rows = total
+    product_import.processed_rows = len(errors)
+    product_import.failed_count = len(errors)
+    product_import.save(update_fields=["total_rows", "processed_rows", "failed_count"])
+    _save_errors(product_import.id, errors)
+
+    return product_import
+
+
+def run_import(import_id):
+    """
+    Processes the staged chunks of an import, oldest first.
+
+    Progress and per-row errors are written after every chunk, so the
+    import can be followed while it runs and resumed if interrupted.
+    """
+    product_import = ProductImport.objects.select_related("vendor").get(id=import_id)
+    if product_import.status == "completed":
+        return product_import
+
+    ProductImport.objects.filter(id=import_id).update(status="running")
+
+    try:
+        for chunk in product_import.chunks.all().iterator(chunk_size=1):
+            with transaction.atomic():
+                created_ids, errors = import_batch(product_import.vendor, chunk.rows)
+
+                ProductImport.objects.filter(id=import_id).update(
+                    processed_rows=F("processed_rows") + len(chunk.rows),
+                    created_count=F("created_count") + len(created_ids),
+                    failed_count=F("failed_count") + len(errors),
+                )
+                _save_errors(import_id, errors)
+
+                chunk.delete()
+
+            # bulk inserts skip post_save, so refresh listing and search state here
+            catalog_cache.bump_version()
+            search.refresh_search_vectors(created_ids)
+            search.index.mark_stale()
+
+    except Exception:
+        logger.error("Product import %s failed", import_id, exc_info=True)
+        ProductImport.objects.filter(id=import_id).update(status="failed", finished_at=timezone.now())
+        raise
+
+    ProductImport.objects.filter(id=import_id).update(status="completed", finished_at=timezone.now())
+    product_import.refresh_from_db()
+
+    logger.info(
+        "Product import %s finished: %s created, %s failed",
+        import_id, product_import.created_count, product_import.failed_count,
+    )
+    return product_import
+
+
+def import_batch(vendor, rows):
+    """
+    Validates and inserts one batch of `[line, row]` pairs for a vendor.
+
+    Returns the ids of the created products and the per-row errors.
+    """
+    errors = []
+    valid = []
+
+    for line, row in rows:
+        serializer = ProductImportRowSerializer(data=row)
+        if serializer.is_valid():
+            valid.append((line, serializer.validated_data))
+        else:
+            errors.extend(
+                _error(line, field, message)
+                for field, messages in serializer.errors.items()
+                for message in messages
+            )
+
+    # one query checks every category referenced by the batch
+    category_ids = {data["category"] for _, data in valid if data.get("category")}
+    known = set(Category.objects.filter(id__in=category_ids).values_list("id", flat=True))
+
+    products = []
+    lines = []
+    for line, data in valid:
+        if data.get("category") and data["category"] not in known:
+            errors.append(_error(line, "category", "Category does not exist."))
+            continue
+
+        product = Product(
+            **{key: value for key, value in data.items() if key != "category"},
+            category_id=data.get("category"),
+            vendor=vendor,
+            initial_stock=data.get("stock", 0),
+        )
+        _apply_pricing(product)
+        products.append(product)
+        lines.append(line)
+
+    for product, slug in zip(products, slugs.allocate_slugs(Product, [p.name for p in products])):
+        product.slug = slug
+
+    try:
+        with transaction.atomic():
+            Product.objects.bulk_create(products)
+            # bulk_create skips post_save, which records opening stock for single saves
+            inventory.record_initial_stock(products)
+        return [product.id for product in products], errors
+
+    except IntegrityError:
+        logger.info("Bulk insert hit a conflict, inserting rows one by one")
+
+    created = []
+    for line, product in zip(lines, products):
+        product.slug = None
+        try:
+            product.save()
+            created.append(product.id)
+        except IntegrityError as exc:
+            errors.append(_error(line, "non_field_errors", str(exc)))
+
+    return created, errors
+
+
+def write_report(product_import, stream):
+    """
+    Writes the per-row errors of an import as CSV to a text stream.
+    """
+    for chunk in iter_report(product_import):
+        stream.write(chunk)
+
+
+def iter_report(product_import):
+    """
+    Yields the per-row errors of an import as CSV text, in line order.
+
+    Errors are read from the database in batches, so a large report is
+    never held in memory at once.
+    """
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=REPORT_COLUMNS)
+    writer.writeheader()
+
+    errors = product_import.row_errors.order_by("line", "id").values(*REPORT_COLUMNS)
+    for error in errors.iterator(chunk_size=REPORT_BATCH_SIZE):
+        writer.writerow(error)
+        if buffer.tell() >= REPORT_BUFFER_SIZE:
+            yield _drain(buffer)
+
+    yield _drain(buffer)
+
+
+def _drain(buffer):
+    text = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    return text
+
+
+def _error(line, field, message):
+    return {"line": line, "field": field, "message": str(message)}
+
+
+def _save_errors(import_id, errors):
+    ProductImportError.objects.bulk_create(
+        [ProductImportError(product_import_id=import_id, **error) for error in errors]
+    )
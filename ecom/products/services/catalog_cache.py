@@ -0,0 +1,147 @@
+import hashlib
+import time
+from django.conf import settings
+from django.core.cache import cache
+
+import logging
+logger = logging.getLogger(__name__)
+
+VERSION_KEY = "catalog:version"
+PAGE_KEY = "catalog:v{version}:page:{digest}"
+LOCK_KEY = "catalog:v{version}:lock:{digest}"
+PRODUCT_KEY = "catalog:product:{product_id}"
+FACETS_KEY = "catalog:v{version}:facets:{digest}"
+
+# Product fields that can move a product into, out of, or across listing pages
+# (including filtered and price-sorted ones). Writes touching only other fields
+# (e.g. stock) invalidate the product entry alone.
+LISTING_FIELDS = frozenset({
+    "is_active", "created_at", "category", "vendor", "effective_price",
+})
+
+
+def get_version() -> int:
+    """
+    Returns the current catalog namespace version.
+
+    Every page key embeds this version, so bumping it retires all
+    cached pages at once without scanning or deleting keys.
+    """
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, 1, timeout=None)
+        version = cache.get(VERSION_KEY, 1)
+    return version
+
+
+def bump_version():
+    """
+    Moves the catalog to a new namespace version.
+
+    Called when listing membership or ordering may have changed.
+    """
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.add(VERSION_KEY, 1, timeout=None)
+
+
+def invalidate_products(product_ids):
+    """
+    Drops the cached payloads of the given products.
+
+    Cached pages only hold product ids, so they stay valid and pick up
+    the fresh payload on the next read.
+    """
+    keys = [PRODUCT_KEY.format(product_id=product_id) for product_id in product_ids]
+    if keys:
+        cache.delete_many(keys)
+
+
+def get_page(signature: str, loader):
+    """
+    Returns a cached catalog page for the given request signature.
+
+    `loader` builds the page (product ids plus pagination meta) on a miss.
+    Only one worker recomputes a page at a time; others keep serving the
+    stale copy until it is replaced, or wait briefly on a cold miss.
+    """
+    version = get_version()
+    digest = hashlib.sha1(signature.encode()).hexdigest()
+    page_key = PAGE_KEY.format(version=version, digest=digest)
+    lock_key = LOCK_KEY.format(version=version, digest=digest)
+
+    fresh_seconds = settings.CATALOG_CACHE_FRESH_SECONDS
+    stale_seconds = settings.CATALOG_CACHE_STALE_SECONDS
+
+    entry = cache.get(page_key)
+    if entry is not None and entry["fresh_until"] > time.time():
+        return entry["page"]
+
+    if cache.add(lock_key, 1, timeout=settings.CATALOG_CACHE_LOCK_SECONDS):
+        try:
+            page = loader()
+            cache.set(
+                page_key,
+                {"page": page, "fresh_until": time.time() + fresh_seconds},
+                timeout=fresh_seconds + stale_seconds,
+            )
+            return page
+        finally:
+            cache.delete(lock_key)
+
+    # Another worker is recomputing this page
+    if entry is not None:
+        logger.info("Serving stale catalog page %s", digest)
+        return entry["page"]
+
+    deadline = time.time() + settings.CATALOG_CACHE_LOCK_WAIT_SECONDS
+    while time.time() < deadline:
+        time.sleep(0.05)
+        entry = cache.get(page_key)
+        if entry is not None:
+            return entry["page"]
+
+    return loader()
+
+
+def get_products(product_ids, loader):
+    """
+    Returns cached product payloads in the order of `product_ids`.
+
+    Missing payloads are built by `loader` in a single call and cached.
+    Products that no longer exist are skipped.
+    """
+    keys = {PRODUCT_KEY.format(product_id=product_id): product_id for product_id in product_ids}
+    cached = cache.get_many(list(keys))
+
+    payloads = {keys[key]: value for key, value in cached.items()}
+    missing = [product_id for product_id in product_ids if product_id not in payloads]
+
+    if missing:
+        loaded = loader(missing)
+        cache.set_many(
+            {PRODUCT_KEY.format(product_id=product_id): payload for product_id, payload in loaded.items()},
+            timeout=settings.CATALOG_CACHE_FRESH_SECONDS + settings.CATALOG_CACHE_STALE_SECONDS,
+        )
+        payloads.update(loaded)
+
+    return [payloads[product_id] for product_id in product_ids if product_id in payloads]
+
+
+def get_facets(signature: str, loader):
+    """
+    Returns cached facet counts for a filter signature.
+
+    Entries live in the current catalog version and expire after the
+    fresh window, which bounds drift from writes that skip the version
+    bump (e.g. stock changes behind `in_stock`).
+    """
+    digest = hashlib.sha1(signature.encode()).hexdigest()
+    key = FACETS_KEY.format(version=get_version(), digest=digest)
+
+    facets = cache.get(key)
+    if facets is None:
+        facets = loader()
+        cache.set(key, facets, timeout=settings.CATALOG_CACHE_FRESH_SECONDS)
+    return facets
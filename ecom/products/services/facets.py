@@ -0,0 +1,70 @@
+from django.conf import settings
+from django.db.models import Case, When, Value, Count, IntegerField, Q
+from products.services import catalog_cache
+
+
+def _bands(edges):
+    """
+    Turns sorted lower edges into `(min, max)` bands, the last one open-ended.
+    """
+    bounds = [0, *edges]
+    return [(low, high) for low, high in zip(bounds, [*edges, None])]
+
+
+def _band_expression(field, edges, null_band=None):
+    whens = [When(**{f"{field}__lt": edge}, then=Value(position)) for position, edge in enumerate(edges)]
+    if null_band is not None:
+        whens.insert(0, When(**{f"{field}__isnull": True}, then=Value(null_band)))
+    return Case(*whens, default=Value(len(edges)), output_field=IntegerField())
+
+
+def compute_facets(queryset) -> dict:
+    """
+    Counts products per category, price band and discount tier.
+
+    All three facets come from a single GROUP BY over the filtered
+    queryset; each facet is then summed out of the grouped rows.
+    """
+    price_edges = settings.PRODUCT_PRICE_BUCKETS
+    discount_edges = settings.PRODUCT_DISCOUNT_TIERS
+
+    rows = (
+        queryset
+        .order_by()
+        .annotate(
+            price_band=_band_expression("effective_price", price_edges),
+            discount_tier=_band_expression("discount_percent", discount_edges, null_band=0),
+        )
+        .values("category_id", "category__name", "price_band", "discount_tier")
+        .annotate(total=Count("id"))
+    )
+
+    categories = {}
+    prices = [0] * (len(price_edges) + 1)
+    discounts = [0] * (len(discount_edges) + 1)
+
+    for row in rows:
+        category_id = str(row["category_id"]) if row["category_id"] else None
+        entry = categories.setdefault(category_id, {"id": category_id, "name": row["category__name"], "count": 0})
+        entry["count"] += row["total"]
+        prices[row["price_band"]] += row["total"]
+        discounts[row["discount_tier"]] += row["total"]
+
+    return {
+        "categories": sorted(categories.values(), key=lambda entry: (-entry["count"], entry["name"] or "")),
+        "price": [
+            {"min": low, "max": high, "count": count}
+            for (low, high), count in zip(_bands(price_edges), prices)
+        ],
+        "discount": [
+            {"min": low, "max": high, "count": count}
+            for (low, high), count in zip(_bands(discount_edges), discounts)
+        ],
+    }
+
+
+def get_facets(signature: str, queryset) -> dict:
+    """
+    Returns facet counts for a filter signature, cached per catalog version.
+    """
+    return catalog_cache.get_facets(signature, loader=lambda: compute_facets(queryset))
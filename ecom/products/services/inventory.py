@@ -0,0 +1,384 @@
+from collections import Counter
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, When, Value, F, IntegerField, Max, Min, Sum, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from products.models import Product, StockMovement, StockSnapshot
+from products.services import catalog_cache
+from core.errors import InsufficientStockError
+
+Reason = StockMovement.Reason
+
+
+def _quantity_by_product(quantities: dict):
+    """
+    Builds a `CASE id WHEN ... THEN qty END` expression over the given products.
+    """
+    return Case(
+        *[When(id=product_id, then=Value(quantity)) for product_id, quantity in quantities.items()],
+        output_field=IntegerField(),
+    )
+
+
+def record_movements(movements):
+    """
+    Appends stock movements in batches of `STOCK_MOVEMENT_BATCH_SIZE`.
+
+    Callers apply the matching stock change in the same transaction.
+    """
+    StockMovement.objects.bulk_create(movements, batch_size=settings.STOCK_MOVEMENT_BATCH_SIZE)
+
+
+def _movements(quantities: dict, sign, reason, order_id=None, actor=None):
+    now = timezone.now()
+    return [
+        StockMovement(
+            product_id=product_id,
+            delta=sign * quantity,
+            reason=reason,
+            order_id=order_id,
+            actor=actor,
+            created_at=now,
+        )
+        for product_id, quantity in quantities.items()
+    ]
+
+
+@transaction.atomic
+def decrement_stock(quantities: dict, order_id=None, actor=None, reserved=False) -> list:
+    """
+    Decrements stock for many products in one guarded UPDATE.
+
+    `quantities` maps product ids to the quantity to take. The update
+    only applies where enough unreserved stock is left, so concurrent
+    orders can never oversell or take units held by confirmed checkouts.
+    With `reserved=True` the quantities are converted from an existing
+    reservation instead, taking stock and `reserved_stock` together.
+    It is all-or-nothing: if any product is short, nothing is
+    decremented and InsufficientStockError lists every short product.
+    A sale movement is recorded per product.
+
+    Returns the ids of products that crossed their low-stock threshold.
+    """
+    if not quantities:
+        return []
+
+    quantity = _quantity_by_product(quantities)
+
+    products = Product.objects.filter(id__in=quantities)
+    changes = {"stock": F("stock") - quantity, "last_activity_at": timezone.now()}
+    if reserved:
+        products = products.filter(stock__gte=quantity, reserved_stock__gte=quantity)
+        changes["reserved_stock"] = F("reserved_stock") - quantity
+    else:
+        products = products.filter(stock__gte=F("reserved_stock") + quantity)
+
+    _guarded_update(products, changes, quantities, reserved=reserved)
+
+    record_movements(_movements(quantities, -1, Reason.SALE, order_id, actor))
+    catalog_cache.invalidate_products([str(product_id) for product_id in quantities])
+
+    # Previous stock was `stock + quantity`; keep rows that moved across the threshold
+    return list(
+        Product.objects
+        .filter(
+            id__in=quantities,
+            low_stock_alert_sent=False,
+            stock__lte=F("low_stock_threshold"),
+            stock__gt=F("low_stock_threshold") - quantity,
+        )
+        .values_list("id", flat=True)
+    )
+
+
+@transaction.atomic
+def increment_stock(quantities: dict, reason=Reason.ADJUSTMENT, order_id=None, actor=None, movements=None):
+    """
+    Returns stock for many products in one UPDATE.
+
+    `quantities` maps product ids to the quantity to put back. One
+    movement per product is recorded unless finer-grained `movements`
+    are given.
+    """
+    if not quantities:
+        return
+
+    quantity = _quantity_by_product(quantities)
+    Product.objects.filter(id__in=quantities).update(
+        stock=F("stock") + quantity,
+        last_activity_at=timezone.now(),
+    )
+    record_movements(movements or _movements(quantities, 1, reason, order_id, actor))
+
+    catalog_cache.invalidate_products([str(product_id) for product_id in quantities])
+
+
+@transaction.atomic
+def reserve_stock(quantities: dict):
+    """
+    Holds stock for many products in one guarded UPDATE.
+
+    Only stock not already held (`stock - reserved_stock`) can be
+    reserved. All-or-nothing, like `decrement_stock`: if any product is
+    short, nothing is held and InsufficientStockError lists every short
+    product.
+    """
+    if not quantities:
+        return
+
+    quantity = _quantity_by_product(quantities)
+    _guarded_update(
+        Product.objects.filter(id__in=quantities, stock__gte=F("reserved_stock") + quantity),
+        {"reserved_stock": F("reserved_stock") + quantity},
+        quantities,
+    )
+
+
+def release_stock(quantities: dict):
+    """
+    Gives reserved stock back to the available pool in one UPDATE.
+    """
+    if not quantities:
+        return
+
+    Product.objects.filter(id__in=quantities).update(
+        reserved_stock=Greatest(F("reserved_stock") - _quantity_by_product(quantities), Value(0)),
+    )
+
+
+def record_initial_stock(products):
+    """
+    Records the opening stock of newly created products.
+    """
+    record_movements([
+        StockMovement(product_id=product.pk, delta=product.stock, reason=Reason.INITIAL, created_at=product.created_at)
+        for product in products
+        if product.stock
+    ])
+
+
+def return_order_stock(order_ids, actor=None):
+    """
+    Puts the stock of cancelled orders back, with one movement per order line.
+    """
+    from orders.models import OrderItem
+
+    lines = list(
+        OrderItem.objects
+        .filter(order_id__in=order_ids)
+        .values_list("order_id", "product_id", "quantity")
+    )
+
+    quantities = Counter()
+    movements = []
+    for order_id, product_id, quantity in lines:
+        quantities[product_id] += quantity
+        movements.extend(_movements({product_id: quantity}, 1, Reason.CANCELLATION, order_id, actor))
+
+    increment_stock(dict(quantities), movements=movements)
+
+
+@transaction.atomic
+def set_stock(product, new_stock: int, reason=Reason.ADJUSTMENT, actor=None):
+    """
+    Sets a product's stock level, recording the difference as a movement.
+
+    Stock cannot go below the units reserved by confirmed checkouts.
+    Alert flags reset once stock is back above the threshold.
+    """
+    if new_stock == product.stock:
+        return
+
+    now = timezone.now()
+    delta = new_stock - product.stock
+
+    updated = Product.objects.filter(pk=product.pk, reserved_stock__lte=new_stock).update(
+        stock=new_stock,
+        last_activity_at=now,
+        low_stock_alert_sent=(
+            False if new_stock > product.low_stock_threshold else F("low_stock_alert_sent")
+        ),
+        critical_stock_alert_sent=(
+            False if new_stock > product.low_stock_threshold else F("critical_stock_alert_sent")
+        ),
+    )
+    if not updated:
+        reserved = Product.objects.filter(pk=product.pk).values_list("reserved_stock", flat=True).first()
+        raise ValidationError({"stock": [below_reserved_message(reserved)]})
+
+    record_movements(_movements({product.pk: abs(delta)}, 1 if delta > 0 else -1, reason, actor=actor))
+
+    # queryset updates bypass post_save, so drop the cached payload here
+    catalog_cache.invalidate_products([str(product.pk)])
+
+    # keep in-memory instance in sync
+    product.stock = new_stock
+    product.last_activity_at = now
+
+
+def below_reserved_message(reserved) -> str:
+    """
+    Error shown when a stock edit would drop below the reserved units.
+    """
+    return f"Stock cannot be set below the {reserved} units reserved by confirmed checkouts."
+
+
+def take_snapshots() -> int:
+    """
+    Materializes the stock of every product moved since the last snapshot.
+
+    Each snapshot is the product's previous snapshot plus its settled
+    movements, so it is derived from the ledger alone. Movements newer
+    than `STOCK_SNAPSHOT_SETTLE_SECONDS` are left for the next run, giving
+    in-flight transactions time to commit. Returns the snapshots written.
+
+    `created_at` is stamped before insert, so ids and timestamps can
+    disagree; the window stops below the first unsettled id, keeping the
+    `last_movement_id` watermark from passing a movement not yet folded in.
+    """
+    settled = timezone.now() - timedelta(seconds=settings.STOCK_SNAPSHOT_SETTLE_SECONDS)
+    after = StockSnapshot.objects.aggregate(last=Max("last_movement_id"))["last"] or 0
+
+    window = StockMovement.objects.filter(id__gt=after)
+    unsettled = window.filter(created_at__gt=settled).aggregate(first=Min("id"))["first"]
+    if unsettled is not None:
+        window = window.filter(id__lt=unsettled)
+
+    bounds = window.aggregate(upto=Max("id"), taken_at=Max("created_at"))
+    if bounds["upto"] is None:
+        return 0
+
+    deltas = dict(
+        window.filter(id__lte=bounds["upto"])
+        .order_by()
+        .values("product_id")
+        .annotate(total=Sum("delta"))
+        .values_list("product_id", "total")
+    )
+
+    previous = StockSnapshot.objects.filter(product=OuterRef("pk")).order_by("-last_movement_id")
+    base = dict(
+        Product.objects
+        .filter(id__in=deltas)
+        .annotate(base=Coalesce(Subquery(previous.values("stock")[:1]), Value(0)))
+        .values_list("id", "base")
+    )
+
+    StockSnapshot.objects.bulk_create(
+        [
+            StockSnapshot(
+                product_id=product_id,
+                stock=base[product_id] + delta,
+                last_movement_id=bounds["upto"],
+                taken_at=bounds["taken_at"],
+            )
+            for product_id, delta in deltas.items()
+            if product_id in base
+        ],
+        batch_size=settings.STOCK_MOVEMENT_BATCH_SIZE,
+    )
+    return len(deltas)
+
+
+def stock_at(product_id, at=None) -> int:
+    """
+    Returns a product's stock level at a point in time.
+
+    Reads the latest snapshot taken at or before `at` and adds the
+    short tail of movements recorded after it.
+    """
+    at = at or timezone.now()
+    snapshot = (
+        StockSnapshot.objects
+        .filter(product_id=product_id, taken_at__lte=at)
+        .order_by("-last_movement_id")
+        .values("stock", "last_movement_id")
+        .first()
+    ) or {"stock": 0, "last_movement_id": 0}
+
+    tail = (
+        StockMovement.objects
+        .filter(product_id=product_id, id__gt=snapshot["last_movement_id"], created_at__lte=at)
+        .aggregate(total=Sum("delta"))["total"]
+    )
+    return snapshot["stock"] + (tail or 0)
+
+
+def record_sales(quantities: dict):
+    """
+    Adds paid quantities to the products' `sold_quantity` ledger in one UPDATE.
+
+    Also moves `last_activity_at`, which the inventory reconciler uses
+    as its watermark.
+    """
+    if not quantities:
+        return
+
+    quantity = _quantity_by_product(quantities)
+    Product.objects.filter(id__in=quantities).update(
+        sold_quantity=F("sold_quantity") + quantity,
+        last_activity_at=timezone.now(),
+    )
+
+
+def _guarded_update(products, changes: dict, quantities: dict, reserved=False):
+    """
+    Applies `changes` to the guarded `products` queryset, all-or-nothing.
+
+    If the guard rejects any product, the update is rolled back and the
+    rows are locked before the shortages are read, so a concurrent writer
+    cannot make them look sufficient again. If nothing is short under the
+    lock, the rejection was only contention and the update is retried.
+    """
+    sid = transaction.savepoint()
+    if products.update(**changes) == len(quantities):
+        transaction.savepoint_commit(sid)
+        return
+    transaction.savepoint_rollback(sid)
+
+    shortages = _shortages(quantities, reserved=reserved, lock=True)
+    if shortages:
+        raise InsufficientStockError(shortages)
+
+    # every row is locked and covers its quantity, so the guard now passes
+    products.update(**changes)
+
+
+def _shortages(quantities: dict, reserved=False, lock=False) -> list:
+    """
+    Describes every product whose stock cannot cover the requested quantity.
+
+    Stock held by other checkouts is not available unless the quantities
+    are themselves `reserved`, in which case they must also be covered
+    by `reserved_stock`.
+    """
+    rows = Product.objects.filter(id__in=quantities).order_by("id")
+    if lock:
+        rows = rows.select_for_update()
+
+    products = {product["id"]: product for product in rows.values("id", "name", "stock", "reserved_stock")}
+
+    shortages = []
+    for product_id, requested in quantities.items():
+        product = products.get(product_id)
+        if not product:
+            available = 0
+        elif reserved:
+            available = min(product["stock"], product["reserved_stock"])
+        else:
+            available = max(product["stock"] - product["reserved_stock"], 0)
+
+        if requested > available:
+            shortages.append(
+                {
+                    "product_id": str(product_id),
+                    "product_name": product["name"] if product else None,
+                    "requested_quantity": requested,
+                    "available_stock": available,
+                }
+            )
+
+    return shortages
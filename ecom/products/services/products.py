@@ -1,15 +1,23 @@
 from django.db import transaction
-from products.models import Product
+from products.models import Product, StockMovement, PRICING_FIELDS, effective_price_for
 from datetime import timedelta
 from django.utils import timezone
 from django.conf import settings
 
 from collections import defaultdict
 from django.db import transaction
-from django.db.models import Sum
-from django.db.models import F
-from core.utils.mail_sender import send_mail_helper
+from itertools import groupby
+from django.core.cache import cache
+from django.db.models import Sum, OuterRef, Subquery, Value
+from django.db.models import F, Q
+from django.db.models.functions import Coalesce
+from products.services import catalog_cache, inventory
+from django.db import connection, OperationalError
+from redis.exceptions import ConnectionError as RedisConnectionError
+from kombu.exceptions import OperationalError as KombuOperationalError
+from core.utils.mail_sender import send_mail_helper, send_mail_batch
 from orders.models import OrderItem
+from cart.services.cart_totals import CartTotalsService
 import logging
 
 logger = logging.getLogger(__name__)
@@ -36,12 +44,13 @@ def create_product(**data):
     return product
 
 @transaction.atomic
-def update_product(product_id, **data):
+def update_product(product_id, actor=None, **data):
     """
     Updates a product while enforcing stock and pricing rules.
 
     Stock changes are handled explicitly to keep `initial_stock`,
-    alerts, and inventory state consistent.
+    alerts, and inventory state consistent, and are recorded as an
+    adjustment movement by `actor`.
     """
     data.pop("vendor", None)
 
@@ -61,7 +70,12 @@ def update_product(product_id, **data):
                 )
                 product.initial_stock += delta  # keep in-memory sync
 
-            product.update_stock(new_stock)
+            product.update_stock(new_stock, actor=actor)
+
+    pricing_changed = any(
+        key in data and data[key] != getattr(product, key)
+        for key in PRICING_FIELDS
+    )
 
     # Apply remaining fields
     for key, value in data.items():
@@ -71,9 +85,130 @@ def update_product(product_id, **data):
     product.reconcile_stock_alerts()
     product.save()
 
+    # Open carts hold denormalized line amounts priced from this product
+    if pricing_changed:
+        CartTotalsService.reprice_product(product.id)
+
     return product
 
 
+# Columns written by bulk_update_products
+BULK_UPDATE_FIELDS = (
+    "stock",
+    "initial_stock",
+    "low_stock_alert_sent",
+    "critical_stock_alert_sent",
+    "last_activity_at",
+    "original_price",
+    "discount_percent",
+    "discount_amount",
+    "effective_price",
+    "updated_at",
+)
+
+
+@transaction.atomic
+def bulk_update_products(vendor, rows, actor=None) -> list:
+    """
+    Applies stock and price changes to many of a vendor's products.
+
+    `rows` are validated dicts holding an `id` or `slug` plus any of
+    `stock`, `original_price` and `discount_percent`. The products are
+    locked in primary-key order with one query and written back with
+    one bulk UPDATE; open carts holding repriced products are rebuilt
+    together. Stock changes follow `update_product`: restocks raise
+    `initial_stock`, alert flags reset once stock is back above the
+    threshold, and rows setting stock below `reserved_stock` are rejected.
+
+    Returns one result per row, in order.
+    """
+    ids = {row["id"] for row in rows if row.get("id")}
+    slugs = {row["slug"] for row in rows if not row.get("id") and row.get("slug")}
+
+    products = list(
+        Product.objects
+        .select_for_update()
+        .filter(vendor=vendor)
+        .filter(Q(id__in=ids) | Q(slug__in=slugs))
+        .order_by("id")
+    )
+    by_id = {product.id: product for product in products}
+    by_slug = {product.slug: product for product in products}
+
+    now = timezone.now()
+    changed = {}
+    repriced = set()
+    movements = []
+    results = []
+
+    for row in rows:
+        reference = str(row.get("id") or row.get("slug"))
+        product = by_id.get(row["id"]) if row.get("id") else by_slug.get(row.get("slug"))
+
+        if product is None:
+            results.append({"ref": reference, "ok": False, "errors": {"non_field_errors": ["Product not found."]}})
+            continue
+
+        new_stock = row.get("stock", product.stock)
+        if new_stock < product.reserved_stock:
+            # rows are locked, so reserved_stock cannot move under this check
+            results.append({
+                "ref": reference,
+                "ok": False,
+                "errors": {"stock": [inventory.below_reserved_message(product.reserved_stock)]},
+            })
+            continue
+
+        if new_stock != product.stock:
+            delta = new_stock - product.stock
+
+            # restock → raise initial_stock
+            if delta > 0:
+                product.initial_stock += delta
+
+            product.stock = new_stock
+            product.last_activity_at = now
+            movements.append(StockMovement(
+                product_id=product.id,
+                delta=delta,
+                reason=StockMovement.Reason.ADJUSTMENT,
+                actor=actor,
+                created_at=now,
+            ))
+
+        if any(key in row and row[key] != getattr(product, key) for key in PRICING_FIELDS):
+            for key in PRICING_FIELDS.intersection(row):
+                setattr(product, key, row[key])
+            _apply_pricing(product)
+            repriced.add(product.id)
+
+        product.reconcile_stock_alerts()
+        product.updated_at = now
+        changed[product.id] = product
+
+        results.append({
+            "ref": reference,
+            "ok": True,
+            "id": str(product.id),
+            "stock": product.stock,
+            "original_price": str(product.original_price),
+            "discount_percent": product.discount_percent,
+            "effective_price": str(product.effective_price),
+        })
+
+    if changed:
+        Product.objects.bulk_update(list(changed.values()), BULK_UPDATE_FIELDS)
+        inventory.record_movements(movements)
+        catalog_cache.invalidate_products([str(product_id) for product_id in changed])
+
+    if repriced:
+        CartTotalsService.reprice_products(repriced)
+        # price order and price facets may have moved
+        catalog_cache.bump_version()
+
+    return results
+
+
 @transaction.atomic
 def delete_product(product):
     """
@@ -84,136 +219,214 @@ def delete_product(product):
 
 def _apply_pricing(product):
     """
-    Computes and applies the product discount amount
-    based on the current pricing configuration.
+    Computes and applies the product's effective price and discount
+    amount based on the current pricing configuration.
     """
-    if product.discount_percent:
-        product.discount_amount = (
-            product.original_price * product.discount_percent / 100
-        )
-    else:
-        product.discount_amount = 0
+    product.effective_price = effective_price_for(product.original_price, product.discount_percent)
+    product.discount_amount = product.original_price - product.effective_price
+
+
+def critical_stock_candidates(now=None):
+    """
+    Products due a critical stock alert.
 
+    Stock is at or below the threshold, no alert has gone out yet, and
+    the product has been inactive for `CRITICAL_INACTIVITY_HOURS`.
+    """
+    now = now or timezone.now()
+    return Product.objects.filter(
+        critical_stock_alert_sent=False,
+        stock__lte=F("low_stock_threshold"),
+        last_activity_at__lte=now - timedelta(hours=settings.CRITICAL_INACTIVITY_HOURS),
+    )
 
-def should_send_critical_stock_alert(self):
+
+def claim_critical_stock_alerts(now=None) -> list:
     """
-    Determines whether a critical stock alert should be sent.
+    Marks every product due a critical alert as alerted and returns their ids.
 
-    An alert is triggered when stock falls below the threshold
-    and the product has remained inactive beyond the configured window.
+    Claiming flips the flag in the same statement that selects the rows
+    (`UPDATE ... RETURNING` on PostgreSQL, locked rows skipped), so
+    parallel workers never claim the same product twice. The claim runs
+    in its own transaction, which the locking subquery requires.
     """
-    CRITICAL_INACTIVITY_HOURS = settings.CRITICAL_INACTIVITY_HOURS
-    if self.stock > self.low_stock_threshold:
-        return False
+    candidates = critical_stock_candidates(now)
 
-    if self.critical_stock_alert_sent:
-        return False
+    with transaction.atomic():
+        if connection.vendor == "postgresql":
+            table = connection.ops.quote_name(Product._meta.db_table)
+            select_sql, params = (
+                candidates.select_for_update(skip_locked=True).values("id").query.sql_with_params()
+            )
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"UPDATE {table} SET critical_stock_alert_sent = true "
+                    f"WHERE id IN ({select_sql}) RETURNING id",
+                    params,
+                )
+                return [row[0] for row in cursor.fetchall()]
 
-    expiry_time = self.last_activity_at + timedelta(hours=CRITICAL_INACTIVITY_HOURS)
-    return timezone.now() >= expiry_time
+        product_ids = list(
+            candidates.select_for_update(skip_locked=True).values_list("id", flat=True)
+        )
+        Product.objects.filter(id__in=product_ids).update(critical_stock_alert_sent=True)
+    return product_ids
 
 
-@transaction.atomic
 def send_critical_stock_alerts(self):
     """
     Sends ONE critical stock alert email per vendor,
     containing ALL eligible products.
+
+    Products are claimed first and committed, then mailed. Products
+    whose vendor could not be reached are released for the next run.
     """
+    try:
+        product_ids = claim_critical_stock_alerts()
+    except (OperationalError, RedisConnectionError, KombuOperationalError) as exc:
+        logger.error("Transient failure in send_critical_stock_alerts", exc_info=True)
+        raise self.retry(exc=exc, countdown=45)
 
-    products = (
-        Product.objects
-        .select_related("vendor")
-        .filter(
-            stock__lte=F("low_stock_threshold"),
-            critical_stock_alert_sent=False,
-        )
-    )
+    if not product_ids:
+        return {"claimed": 0, "vendors": 0, "failed": 0}
 
-    # Group products by vendor
     vendor_products = defaultdict(list)
+    for product in Product.objects.select_related("vendor__user").filter(id__in=product_ids):
+        vendor_products[product.vendor].append(product)
 
-    for product in products:
-        if product.should_send_critical_stock_alert():
-            vendor_products[product.vendor].append(product)
-
-    # Send ONE email per vendor
+    outbox = []
     for vendor, products in vendor_products.items():
-        try:
-            # Lock all products for this vendor
-            locked_products = (
-                Product.objects
-                .select_for_update()
-                .filter(id__in=[prod.id for prod in products])
-            )
+        lines = [
+            f"- {product.name}: {product.stock} left (threshold {product.low_stock_threshold})"
+            for product in products
+        ]
+        message = (
+            "The following products are critically low on stock and have had "
+            "no activity for a while:\n\n"
+            + "\n".join(lines)
+            + "\n\nPlease restock or deactivate them."
+        )
+        outbox.append((products, ("Critical Stock Alert", message, vendor.user.email)))
+
+    results = send_mail_batch([mail for _, mail in outbox])
+
+    released_ids = [
+        product.id
+        for (products, _), result in zip(outbox, results)
+        if not result["ok"]
+        for product in products
+    ]
+    if released_ids:
+        Product.objects.filter(id__in=released_ids).update(critical_stock_alert_sent=False)
+
+    metrics = {
+        "claimed": len(product_ids),
+        "vendors": len(outbox),
+        "failed": sum(1 for result in results if not result["ok"]),
+    }
+    logger.info("Critical stock alerts: %s", metrics)
+    return metrics
 
-            # Re-check after locking 
-            eligible_products = [
-                prod for prod in locked_products
-                if prod.should_send_critical_stock_alert()
-            ]
 
-            if not eligible_products:
-                continue
+RECONCILE_WATERMARK_KEY = "inventory:reconcile:watermark"
+# Vendor reports sent per mail batch
+REPORT_BATCH_SIZE = 100
 
-            # Send a single email with all products
-            send_mail_helper(
-                vendor=vendor,
-                products=eligible_products,
-            )
 
-            # Mark all as alerted
-            Product.objects.filter(
-                id__in=[prod.id for prod in eligible_products]
-            ).update(critical_stock_alert_sent=True)
+def rebuild_sold_quantities() -> int:
+    """
+    Recomputes the `sold_quantity` ledger from paid order items.
 
-        except Exception as exc:
-            logger.error(
-                "Failed to send critical stock alert for vendor %s",
-                vendor.id,
-                exc_info=True,
-            )
-            raise self.retry(exc=exc)
-        
+    Returns the number of products whose ledger had drifted.
+    """
+    sold = (
+        OrderItem.objects
+        .filter(order__status="paid", product_id=OuterRef("pk"))
+        .order_by()
+        .values("product_id")
+        .annotate(total=Sum("quantity"))
+        .values("total")
+    )
+    recomputed = Coalesce(Subquery(sold), Value(0))
+
+    return (
+        Product.objects
+        .annotate(recomputed=recomputed)
+        .exclude(sold_quantity=F("recomputed"))
+        .update(sold_quantity=recomputed)
+    )
 
-def reconcile_inventory_and_notify(self):
+
+def reconcile_inventory_and_notify(self, full=False):
     """
-    Daily inventory audit.
+    Inventory audit.
     Detects stock inconsistencies and emails vendors
     a batched report of affected products.
+
+    Compares `stock` with `initial_stock - sold_quantity` in SQL, for
+    products touched since the last run (`last_activity_at` past the
+    watermark, minus an overlap for late commits). `full=True`, or a
+    missing watermark, rebuilds the ledger from paid orders and audits
+    every product. Reports are streamed in vendor order and sent in
+    batches.
     """
+    started = timezone.now()
+    watermark = cache.get(RECONCILE_WATERMARK_KEY)
+
+    try:
+        products = Product.objects.all()
+
+        if full or watermark is None:
+            corrected = rebuild_sold_quantities()
+            if corrected:
+                logger.warning("Rebuilt sold_quantity ledger for %s drifted products", corrected)
+        else:
+            overlap = timedelta(seconds=settings.INVENTORY_RECONCILE_OVERLAP_SECONDS)
+            products = products.filter(last_activity_at__gte=watermark - overlap)
+
+        mismatched = (
+            products
+            .annotate(expected=F("initial_stock") - F("sold_quantity"))
+            .exclude(stock=F("expected"))
+            .select_related("vendor__user")
+            .order_by("vendor_id", "name")
+        )
 
-    sold_map = (
-        OrderItem.objects
-        .filter(order__status="paid")
-        .values("product_id")
-        .annotate(total_sold=Sum("quantity"))
-    )
+        metrics = {"products": 0, "vendors": 0, "failed": 0}
+        outbox = []
+
+        def _flush():
+            results = send_mail_batch(outbox)
+            metrics["failed"] += sum(1 for result in results if not result["ok"])
+            outbox.clear()
+
+        # Send ONE email per vendor
+        for vendor, issues in groupby(mismatched.iterator(chunk_size=500), key=lambda product: product.vendor):
+            lines = [
+                f"- {product.name}: "
+                f"expected {product.expected}, "
+                f"actual {product.stock}"
+                for product in issues
+            ]
+            metrics["products"] += len(lines)
+            metrics["vendors"] += 1
 
-    sold_by_product = {
-        row["product_id"]: row["total_sold"]
-        for row in sold_map
-    }
+            message = (
+                "Our inventory audit found stock levels that do not match sales:\n\n"
+                + "\n".join(lines)
+            )
+            outbox.append(("Inventory Reconciliation Report", message, vendor.user.email))
 
-    # Group inconsistencies by vendor
-    vendor_issues = defaultdict(list)
+            if len(outbox) >= REPORT_BATCH_SIZE:
+                _flush()
 
-    for product in Product.objects.select_related("vendor"):
-        sold_quantity = sold_by_product.get(product.id, 0)
-        expected_stock = product.initial_stock - sold_quantity
+        if outbox:
+            _flush()
 
-        if product.stock != expected_stock:
-            vendor_issues[product.vendor].append({
-                "product": product,
-                "expected": expected_stock,
-                "actual": product.stock,
-            })
+    except (OperationalError, RedisConnectionError, KombuOperationalError) as exc:
+        logger.error("Transient failure in reconcile_inventory_and_notify", exc_info=True)
+        raise self.retry(exc=exc, countdown=45)
 
-    # Send ONE email per vendor
-    for vendor, issues in vendor_issues.items():
-        lines = [
-            f"- {item['product'].name}: "
-            f"expected {item['expected']}, "
-            f"actual {item['actual']}"
-            for item in issues
-        ]
-        send_mail_helper(vendor, lines)
\ No newline at end of file
+    cache.set(RECONCILE_WATERMARK_KEY, started, timeout=None)
+    logger.info("Inventory reconciliation (%s): %s", "full" if full or watermark is None else "incremental", metrics)
+    return metrics
@@ -0,0 +1,176 @@
+import re
+import uuid
+import difflib
+import threading
+from collections import defaultdict
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Case, When, Value, FloatField, F
+from products.models import Product
+
+import logging
+logger = logging.getLogger(__name__)
+
+# Weight of a term found in each field (Postgres A and B weights)
+NAME_WEIGHT = 1.0
+DESCRIPTION_WEIGHT = 0.4
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+INDEX_VERSION_KEY = "search:index:version"
+
+
+def tokenize(text: str) -> list:
+    return TOKEN_RE.findall((text or "").lower())
+
+
+def get_backend() -> str:
+    """
+    Returns the configured search backend, resolving "auto" by database.
+    """
+    backend = settings.PRODUCT_SEARCH_BACKEND
+    if backend == "auto":
+        return "postgres" if connection.vendor == "postgresql" else "python"
+    return backend
+
+
+def search_products(queryset, query: str):
+    """
+    Filters `queryset` to products matching `query`, annotated with `rank`.
+
+    Uses Postgres full-text search over the weighted `search_vector`
+    column, falling back to trigram similarity on the name when nothing
+    matches (typos). Other databases use an in-process inverted index.
+    """
+    if get_backend() == "postgres":
+        return _search_postgres(queryset, query)
+    return _search_python(queryset, query)
+
+
+def _search_postgres(queryset, query):
+    from django.contrib.postgres.search import SearchQuery, SearchRank, TrigramSimilarity
+
+    search_query = SearchQuery(query, search_type="websearch", config="english")
+    matches = (
+        queryset
+        .filter(search_vector=search_query)
+        .annotate(rank=SearchRank(F("search_vector"), search_query))
+    )
+    if matches.exists():
+        return matches
+
+    return (
+        queryset
+        .annotate(rank=TrigramSimilarity("name", query))
+        .filter(rank__gte=settings.PRODUCT_SEARCH_TRIGRAM_THRESHOLD)
+    )
+
+
+def refresh_search_vectors(product_ids):
+    """
+    Recomputes the stored search vectors of the given products.
+
+    Runs on save; bulk writes that bypass signals must call it directly.
+    """
+    if connection.vendor != "postgresql":
+        return
+
+    from django.contrib.postgres.search import SearchVector
+
+    Product.objects.filter(id__in=product_ids).update(
+        search_vector=(
+            SearchVector("name", weight="A", config="english")
+            + SearchVector("description", weight="B", config="english")
+        )
+    )
+
+
+class InvertedIndex:
+    """
+    In-process inverted index over active product names and descriptions.
+
+    Backs search on databases without full-text support (SQLite in
+    development and tests). Built lazily and rebuilt whenever the index
+    version shared through the cache moves, so a product write in any
+    process stales the copy held by every other worker.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._postings = None
+        self._version = None
+
+    def mark_stale(self):
+        """
+        Stales the index in every process by publishing a new version.
+        """
+        cache.set(INDEX_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+        self._postings = None
+
+    def _shared_version(self):
+        # a random token rather than a counter, so an evicted key can never
+        # come back as a version some process already built
+        version = cache.get(INDEX_VERSION_KEY)
+        if version is None:
+            cache.add(INDEX_VERSION_KEY, uuid.uuid4().hex, timeout=None)
+            version = cache.get(INDEX_VERSION_KEY)
+        return version
+
+    def _build(self):
+        postings = defaultdict(dict)
+        rows = Product.objects.filter(is_active=True).values_list("id", "name", "description")
+
+        for product_id, name, description in rows.iterator():
+            for field_tokens, weight in ((tokenize(name), NAME_WEIGHT), (tokenize(description), DESCRIPTION_WEIGHT)):
+                for token in field_tokens:
+                    postings[token][product_id] = postings[token].get(product_id, 0) + weight
+
+        return dict(postings)
+
+    def postings(self):
+        version = self._shared_version()
+        postings = self._postings
+        if postings is None or self._version != version:
+            with self._lock:
+                if self._postings is None or self._version != version:
+                    self._postings = self._build()
+                    self._version = version
+                postings = self._postings
+        return postings
+
+    def rank(self, query: str) -> dict:
+        """
+        Scores products by weighted term frequency of the query terms.
+
+        Terms missing from the vocabulary are replaced by their closest
+        spelling, so single typos still match.
+        """
+        postings = self.postings()
+        scores = defaultdict(float)
+
+        for term in tokenize(query):
+            candidates = [term] if term in postings else difflib.get_close_matches(
+                term, postings.keys(), n=1, cutoff=0.75
+            )
+            for candidate in candidates:
+                for product_id, weight in postings[candidate].items():
+                    scores[product_id] += weight
+
+        return scores
+
+
+index = InvertedIndex()
+
+
+def _search_python(queryset, query):
+    scores = index.rank(query)
+    if not scores:
+        return queryset.none().annotate(rank=Value(0.0, output_field=FloatField()))
+
+    return queryset.filter(id__in=list(scores)).annotate(
+        rank=Case(
+            *[When(id=product_id, then=Value(score)) for product_id, score in scores.items()],
+            output_field=FloatField(),
+        )
+    )
@@ -0,0 +1,113 @@
+import re
+from collections import Counter
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models.functions import Length
+from django.utils.text import slugify
+
+import logging
+logger = logging.getLogger(__name__)
+
+COUNTER_KEY = "slug:{label}:{base}"
+COUNTER_TIMEOUT = 60 * 60 * 24
+
+# Room left for a "-<n>" suffix within the slug column
+SUFFIX_ROOM = 8
+MAX_ATTEMPTS = 5
+
+
+def _slug_base(model, source):
+    max_length = model._meta.get_field("slug").max_length
+    base = slugify(source)[: max_length - SUFFIX_ROOM].strip("-")
+    return base or model._meta.model_name
+
+
+def _highest_suffix(model, base) -> int:
+    """
+    Returns the largest suffix taken for `base`, 0 if only the bare base
+    is taken, or -1 if neither is.
+
+    A single prefix query: the longest, then greatest, "<base>-<n>" slug
+    carries the highest number.
+    """
+    suffixed = (
+        model._default_manager
+        .filter(slug__startswith=f"{base}-", slug__regex=rf"^{re.escape(base)}-[0-9]+$")
+        .order_by(Length("slug").desc(), "-slug")
+        .values_list("slug", flat=True)
+        .first()
+    )
+    if suffixed:
+        return int(suffixed.rsplit("-", 1)[1])
+    return 0 if model._default_manager.filter(slug=base).exists() else -1
+
+
+def _reserve(model, base, count) -> list:
+    """
+    Reserves `count` consecutive suffix numbers for `base`.
+    """
+    key = COUNTER_KEY.format(label=model._meta.label_lower, base=base)
+
+    if cache.get(key) is None:
+        cache.add(key, _highest_suffix(model, base), timeout=COUNTER_TIMEOUT)
+
+    try:
+        last = cache.incr(key, count)
+    except ValueError:
+        # counter expired between the seed and the increment
+        cache.add(key, _highest_suffix(model, base), timeout=COUNTER_TIMEOUT)
+        last = cache.incr(key, count)
+
+    return list(range(last - count + 1, last + 1))
+
+
+def allocate_slug(model, source) -> str:
+    """
+    Returns a free slug for `source` in constant time.
+
+    Suffixes come from an atomic per-base counter in the cache, seeded
+    from the database the first time a base is seen (or after the counter
+    expires), so heavily duplicated names never probe slug by slug.
+    """
+    return allocate_slugs(model, [source])[0]
+
+
+def allocate_slugs(model, sources) -> list:
+    """
+    Returns free slugs for many sources, in order, with one counter
+    increment per distinct base.
+    """
+    bases = [_slug_base(model, source) for source in sources]
+
+    numbers = {}
+    for base, count in Counter(bases).items():
+        numbers[base] = iter(_reserve(model, base, count))
+
+    slugs = []
+    for base in bases:
+        number = next(numbers[base])
+        slugs.append(base if number <= 0 else f"{base}-{number}")
+    return slugs
+
+
+def save_with_slug(instance, source, save):
+    """
+    Allocates a slug for `instance` and calls `save`, retrying with a new
+    slug when a concurrent writer (or a name that looks like a suffixed
+    slug) took it first.
+    """
+    model = type(instance)
+
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        instance.slug = allocate_slug(model, source)
+        try:
+            with transaction.atomic():
+                return save()
+        except IntegrityError:
+            taken = model._default_manager.filter(slug=instance.slug).exists()
+            if not taken or attempt == MAX_ATTEMPTS:
+                raise
+
+            logger.info("Slug %s already taken, reallocating", instance.slug)
+            # the counter is behind the table; reseed it on the next allocation
+            cache.delete(COUNTER_KEY.format(label=model._meta.label_lower, base=_slug_base(model, source)))
@@ -1,9 +1,31 @@
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from django.core.cache import cache
 from products.models import Product
+from products.services import catalog_cache, inventory, search
+
+# Product fields indexed for search
+SEARCH_FIELDS = frozenset({"name", "description", "is_active"})
+
+@receiver(post_save, sender=Product)
+def record_opening_stock(sender, instance, created=False, **kwargs):
+    if created:
+        inventory.record_initial_stock([instance])
+
 
 @receiver(post_save, sender=Product)
+def invalidate_product_cache(sender, instance, created=False, update_fields=None, **kwargs):
+    catalog_cache.invalidate_products([str(instance.pk)])
+
+    if created or update_fields is None or catalog_cache.LISTING_FIELDS & set(update_fields):
+        catalog_cache.bump_version()
+
+    if created or update_fields is None or SEARCH_FIELDS & set(update_fields):
+        search.refresh_search_vectors([instance.pk])
+        search.index.mark_stale()
+
+
 @receiver(post_delete, sender=Product)
-def invalidate_product_cache(sender, **kwargs):
-    cache.delete("all_active_products")
\ No newline at end of file
+def invalidate_deleted_product_cache(sender, instance, **kwargs):
+    catalog_cache.invalidate_products([str(instance.pk)])
+    catalog_cache.bump_version()
+    search.index.mark_stale()
@@ -165,4 +165,543 @@ def test_customer_cannot_create_product(api_client, normal_user, category):
         format="json",
     )
 
-    assert response.status_code == 403
\ No newline at end of file
+    assert response.status_code == 403
+
+@pytest.mark.django_db
+def test_product_list_is_served_from_catalog_cache(
+    api_client, product, django_assert_num_queries
+):
+    url = reverse("product-list")
+
+    first = api_client.get(url)
+    assert first.status_code == 200
+    assert [item["id"] for item in first.data["data"]] == [str(product.id)]
+
+    with django_assert_num_queries(0):
+        second = api_client.get(url)
+
+    assert second.data["data"] == first.data["data"]
+
+
+@pytest.mark.django_db
+def test_stock_change_refreshes_only_the_product_entry(api_client, product):
+    url = reverse("product-list")
+    api_client.get(url)
+
+    product.stock = 7
+    product.save(update_fields=["stock"])
+
+    response = api_client.get(url)
+
+    assert response.data["data"][0]["stock"] == 7
+
+
+@pytest.mark.django_db
+def test_new_product_appears_in_cached_catalog(api_client, product, category):
+    url = reverse("product-list")
+    api_client.get(url)
+
+    new_product = Product.objects.create(
+        name="Speaker",
+        description="Bluetooth speaker",
+        vendor=product.vendor,
+        category=category,
+        original_price=300,
+    )
+
+    response = api_client.get(url)
+
+    assert len(response.data["data"]) == 2
+    assert response.data["data"][0]["id"] == str(new_product.id)
+
+
+@pytest.mark.django_db
+def test_product_search_ranks_name_matches_and_tolerates_typos(api_client, product):
+    """
+    Test that search ranks name matches above description matches
+    and still finds products when the query has a typo.
+    """
+    Product.objects.create(
+        name="Leather Wallet",
+        description="Slim wallet with card slots",
+        vendor=product.vendor,
+        category=product.category,
+        original_price=100,
+        stock=5,
+    )
+    Product.objects.create(
+        name="Card Holder",
+        description="Fits in any leather wallet",
+        vendor=product.vendor,
+        category=product.category,
+        original_price=50,
+        stock=5,
+    )
+
+    url = reverse("product-search")
+
+    response = api_client.get(url, {"q": "wallet"})
+    assert response.status_code == 200
+    assert [item["name"] for item in response.data["data"]] == ["Leather Wallet", "Card Holder"]
+
+    response = api_client.get(url, {"q": "walet"})
+    assert response.data["data"][0]["name"] == "Leather Wallet"
+
+    assert api_client.get(url).status_code == 400
+
+
+@pytest.mark.django_db
+def test_product_search_pages_through_equal_ranks_without_repeats(api_client, product):
+    """
+    Test that paging through results that share one rank returns every
+    product exactly once.
+    """
+    from products.services import search
+
+    Product.objects.bulk_create([
+        Product(
+            name=f"Widget {index}",
+            slug=f"widget-{index}",
+            description="Plain widget",
+            vendor=product.vendor,
+            category=product.category,
+            original_price=100,
+            effective_price=100,
+            stock=5,
+        )
+        for index in range(25)
+    ])
+    search.index.mark_stale()
+
+    seen = []
+    url = reverse("product-search") + "?q=widget"
+    while url:
+        response = api_client.get(url)
+        seen.extend(item["id"] for item in response.data["data"])
+        url = response.data["meta"]["next"]
+
+    assert len(seen) == len(set(seen)) == 25
+    # ties are broken by id, so the order does not depend on the query plan
+    assert seen == sorted(seen)
+
+
+@pytest.mark.django_db
+def test_search_index_is_staled_across_processes(product):
+    """
+    Test that a product write in one process rebuilds the search index
+    held by another.
+    """
+    from products.services import search
+
+    other_worker = search.InvertedIndex()
+    assert product.id in other_worker.rank("test")
+
+    # a write that bypasses signals, then another worker marks the index stale
+    Product.objects.filter(pk=product.pk).update(name="Renamed Gadget")
+    assert product.id not in other_worker.rank("gadget")
+
+    search.index.mark_stale()
+    assert product.id in other_worker.rank("gadget")
+
+
+@pytest.mark.django_db
+def test_product_list_filters_sorts_and_reports_facets(api_client, product):
+    """
+    Test that the public listing filters by category and stock, sorts by
+    price and reports facet counts for the filtered set.
+    """
+    other_category = Category.objects.create(name="Accessories")
+    Product.objects.create(
+        name="Budget Phone",
+        description="Entry level phone",
+        vendor=product.vendor,
+        category=product.category,
+        original_price=1000,
+        discount_percent=20,
+        stock=3,
+    )
+    Product.objects.create(
+        name="Sold Out Phone",
+        description="Out of stock phone",
+        vendor=product.vendor,
+        category=product.category,
+        original_price=3000,
+        stock=0,
+    )
+    Product.objects.create(
+        name="Phone Case",
+        description="Protective case",
+        vendor=product.vendor,
+        category=other_category,
+        original_price=500,
+        stock=10,
+    )
+
+    url = reverse("product-list")
+    response = api_client.get(url, {
+        "category": str(product.category.id),
+        "in_stock": "true",
+        "sort": "price_desc",
+        "include_facets": "true",
+    })
+
+    assert response.status_code == 200
+    assert [item["name"] for item in response.data["data"]] == ["Test Product", "Budget Phone"]
+
+    facets = response.data["meta"]["facets"]
+    assert facets["categories"] == [
+        {"id": str(product.category.id), "name": product.category.name, "count": 2}
+    ]
+    assert facets["price"][0]["count"] == 1
+    assert facets["price"][1]["count"] == 1
+    assert [tier["count"] for tier in facets["discount"]] == [1, 0, 1, 0, 0]
+
+    assert api_client.get(url, {"sort": "cheapest"}).status_code == 400
+    assert api_client.get(url, {"min_price": "abc"}).status_code == 400
+
+
+@pytest.mark.django_db
+def test_slug_allocation_cost_is_flat_for_duplicated_names(product):
+    """
+    Benchmark: creating the 2nd and the 40th product with the same name
+    runs the same number of queries, and every slug is unique.
+    """
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    def create():
+        with CaptureQueriesContext(connection) as queries:
+            created = Product.objects.create(
+                name="Iphone Case",
+                description="Case",
+                vendor=product.vendor,
+                category=product.category,
+                original_price=100,
+            )
+        return created, len(queries)
+
+    first, _ = create()
+    second, second_cost = create()
+    for _ in range(37):
+        create()
+    last, last_cost = create()
+
+    assert (first.slug, second.slug, last.slug) == ("iphone-case", "iphone-case-1", "iphone-case-39")
+    assert last_cost == second_cost
+    assert Product.objects.filter(slug__startswith="iphone-case").count() == 40
+
+    # a name that collides with an allocated suffix is retried, not rejected
+    clash = Product.objects.create(
+        name="Iphone Case 40",
+        description="Case",
+        vendor=product.vendor,
+        category=product.category,
+        original_price=100,
+    )
+    assert clash.slug == "iphone-case-40"
+    assert create()[0].slug == "iphone-case-41"
+
+
+@pytest.mark.django_db
+def test_vendor_bulk_import_creates_products_and_reports_row_errors(
+    api_client, product_vendor_user, category
+):
+    """
+    Test that a CSV import stages rows, inserts the valid ones in bulk
+    and reports invalid rows by line.
+    """
+    from products.services import bulk_import
+
+    api_client.force_authenticate(user=product_vendor_user)
+
+    csv_body = (
+        "name,description,category,stock,original_price,discount_percent\n"
+        f"usb cable,Braided cable,{category.id},10,1500,10\n"
+        f"usb cable,Braided cable,{category.id},4,1500,\n"
+        "charger,Fast charger,,3,not-a-price,\n"
+        "adapter,Travel adapter,00000000-0000-0000-0000-000000000000,2,800,\n"
+    )
+    upload = SimpleUploadedFile("catalog.csv", csv_body.encode(), content_type="text/csv")
+
+    response = api_client.post(reverse("product-bulk-import"), {"file": upload}, format="multipart")
+    assert response.status_code == 202
+    job_id = response.data["data"]["job_id"]
+    assert response.data["data"]["total_rows"] == 4
+
+    bulk_import.run_import(job_id)
+
+    status_url = reverse("product-import-status", kwargs={"job_id": job_id})
+    data = api_client.get(status_url).data["data"]
+    assert (data["status"], data["created_count"], data["error_count"]) == ("completed", 2, 2)
+    assert api_client.get(status_url.replace(job_id, "abc")).status_code == 404
+
+    created = Product.objects.filter(vendor=product_vendor_user.vendor_profile).order_by("slug")
+    assert [p.slug for p in created] == ["usb-cable", "usb-cable-1"]
+    assert created[0].initial_stock == 10
+    assert str(created[0].effective_price) == "1350.00"
+
+    report = api_client.get(reverse("product-import-report", kwargs={"job_id": job_id}))
+    lines = b"".join(report.streaming_content).decode().splitlines()
+    assert lines[0] == "line,field,message"
+    assert lines[1].startswith("4,original_price,")
+    assert lines[2] == "5,category,Category does not exist."
+
+
+@pytest.mark.django_db
+def test_bulk_import_appends_errors_per_chunk_and_reports_them_in_line_order(
+    product_vendor_user, category, settings
+):
+    """
+    Test that each chunk inserts its own error rows rather than rewriting
+    the import, and that the report lists every error by line.
+    """
+    import json
+    from io import StringIO
+    from products.models import ProductImportError
+    from products.services import bulk_import
+
+    settings.PRODUCT_IMPORT_BATCH_SIZE = 2
+    body = "\n".join(
+        ["not json"]
+        + [
+            json.dumps({"name": f"item {n}", "description": "Item", "original_price": "oops"})
+            for n in range(5)
+        ]
+        + [json.dumps({"name": "ok", "description": "Item", "category": str(category.id), "original_price": 100})]
+    )
+    product_import = bulk_import.stage_import(
+        product_vendor_user.vendor_profile, BytesIO(body.encode()), "jsonl"
+    )
+    assert ProductImportError.objects.filter(product_import=product_import).count() == 1
+
+    bulk_import.run_import(product_import.id)
+
+    product_import.refresh_from_db()
+    assert (product_import.created_count, product_import.failed_count) == (1, 6)
+
+    report = StringIO()
+    bulk_import.write_report(product_import, report)
+    lines = report.getvalue().splitlines()
+    assert lines[0] == "line,field,message"
+    assert [int(line.split(",")[0]) for line in lines[1:]] == [1, 2, 3, 4, 5, 6]
+    assert lines[1].startswith("1,non_field_errors,Invalid JSON")
+
+
+@pytest.mark.django_db
+def test_vendor_bulk_update_applies_stock_and_prices_per_row(
+    api_client, product_vendor_user, other_vendor_user, product
+):
+    """
+    Test that a bulk update restocks and reprices the vendor's products
+    and reports unknown, foreign and invalid rows individually.
+    """
+    foreign = Product.objects.create(
+        name="Foreign Product",
+        description="Owned by another vendor",
+        vendor=other_vendor_user.vendor_profile,
+        category=product.category,
+        original_price=100,
+        stock=5,
+    )
+    product.low_stock_alert_sent = True
+    product.save()
+
+    api_client.force_authenticate(user=product_vendor_user)
+    response = api_client.patch(
+        reverse("product-bulk-update"),
+        [
+            {"slug": product.slug, "stock": 20, "original_price": "4000.00", "discount_percent": 25},
+            {"id": str(foreign.id), "stock": 0},
+            {"id": str(product.id), "discount_percent": 90},
+            {"stock": 3},
+        ],
+        format="json",
+    )
+
+    assert response.status_code == 200
+    assert response.data["meta"] == {"updated": 1, "failed": 3}
+    results = response.data["data"]
+    assert results[0]["ok"] and results[0]["effective_price"] == "3000.00"
+    assert [result["ok"] for result in results[1:]] == [False, False, False]
+
+    product.refresh_from_db()
+    assert (product.stock, product.initial_stock) == (20, 19)
+    assert product.effective_price == 3000
+    assert product.low_stock_alert_sent is False
+
+    foreign.refresh_from_db()
+    assert foreign.stock == 5
+
+
+@pytest.mark.django_db
+def test_critical_stock_alerts_claim_once_and_release_on_failed_delivery(product, fake_mail, settings):
+    """
+    Test that inactive low-stock products are alerted once per vendor,
+    and released for the next run when delivery fails.
+    """
+    from datetime import timedelta
+    from django.utils import timezone
+    from products.services.products import send_critical_stock_alerts
+
+    stale = timezone.now() - timedelta(hours=settings.CRITICAL_INACTIVITY_HOURS + 1)
+    Product.objects.filter(pk=product.pk).update(last_activity_at=stale)
+    Product.objects.create(
+        name="Recently Sold",
+        description="Still active",
+        vendor=product.vendor,
+        category=product.category,
+        original_price=100,
+        stock=1,
+    )
+
+    fake_mail.fail_for.add(product.vendor.user.email)
+    assert send_critical_stock_alerts(None) == {"claimed": 1, "vendors": 1, "failed": 1}
+    product.refresh_from_db()
+    assert product.critical_stock_alert_sent is False
+
+    fake_mail.fail_for.clear()
+    assert send_critical_stock_alerts(None)["claimed"] == 1
+    assert send_critical_stock_alerts(None)["claimed"] == 0
+
+    assert len(fake_mail.sent) == 1
+    assert "Test Product" in fake_mail.sent[0]["HTML_MESSAGE"]
+    product.refresh_from_db()
+    assert product.critical_stock_alert_sent is True
+
+
+@pytest.mark.django_db(transaction=True)
+def test_critical_stock_claim_locks_inside_its_own_transaction(product, settings, monkeypatch):
+    """
+    Test that the PostgreSQL claim (locking subquery + UPDATE ... RETURNING)
+    runs from autocommit, as it does in the Celery job.
+
+    SQLite stands in for PostgreSQL with row locking reported as supported,
+    so compiling FOR UPDATE outside a transaction would raise.
+    """
+    from datetime import timedelta
+    from django.db import connection
+    from django.utils import timezone
+    from uuid import UUID
+    from products.services.products import claim_critical_stock_alerts
+
+    stale = timezone.now() - timedelta(hours=settings.CRITICAL_INACTIVITY_HOURS + 1)
+    Product.objects.filter(pk=product.pk).update(last_activity_at=stale)
+
+    monkeypatch.setattr(connection, "vendor", "postgresql")
+    monkeypatch.setattr(connection.features, "has_select_for_update", True)
+    monkeypatch.setattr(connection.features, "has_select_for_update_skip_locked", True)
+    # SQLite cannot parse the lock clause itself
+    monkeypatch.setattr(connection.ops, "for_update_sql", lambda **kwargs: "")
+
+    assert connection.get_autocommit()
+    claimed = claim_critical_stock_alerts()
+    assert [UUID(str(product_id)) for product_id in claimed] == [product.pk]
+    monkeypatch.undo()
+
+    product.refresh_from_db()
+    assert product.critical_stock_alert_sent is True
+
+
+@pytest.mark.django_db
+def test_inventory_reconciliation_checks_touched_products_and_full_audit(product, fake_mail, settings):
+    """
+    Test that incremental reconciliation only checks products touched
+    since the last run, while a full audit rebuilds the sold ledger and
+    finds drift anywhere.
+    """
+    from datetime import timedelta
+    from django.utils import timezone
+    from products.services.inventory import record_sales
+    from products.services.products import reconcile_inventory_and_notify
+
+    settings.INVENTORY_RECONCILE_OVERLAP_SECONDS = 0
+    Product.objects.filter(pk=product.pk).update(initial_stock=1)
+
+    assert reconcile_inventory_and_notify(None)["products"] == 0
+
+    # sold ledger moves without stock following it
+    record_sales({product.id: 1})
+    untouched = Product.objects.create(
+        name="Quiet Product",
+        description="No recent activity",
+        vendor=product.vendor,
+        category=product.category,
+        original_price=100,
+        stock=4,
+        initial_stock=4,
+    )
+    Product.objects.filter(pk=untouched.pk).update(
+        stock=2, last_activity_at=timezone.now() - timedelta(days=2)
+    )
+
+    metrics = reconcile_inventory_and_notify(None)
+    assert (metrics["products"], metrics["vendors"]) == (1, 1)
+    assert "Test Product: expected 0, actual 1" in fake_mail.sent[-1]["HTML_MESSAGE"]
+
+    # the ledger is rebuilt from paid orders (none), so only the untouched drift remains
+    assert reconcile_inventory_and_notify(None, full=True)["products"] == 1
+    assert "Quiet Product: expected 4, actual 2" in fake_mail.sent[-1]["HTML_MESSAGE"]
+    product.refresh_from_db()
+    assert product.sold_quantity == 0
+
+
+@pytest.mark.django_db
+def test_stock_movements_and_snapshots_reconstruct_stock_over_time(product, settings):
+    """
+    Test that every stock write lands in the movement ledger and that
+    snapshots plus the movement tail give the stock at any time.
+    """
+    import uuid
+    from datetime import timedelta
+    from django.utils import timezone
+    from products.models import StockMovement
+    from products.services import inventory
+
+    settings.STOCK_SNAPSHOT_SETTLE_SECONDS = 0
+    order_id = uuid.uuid4()
+
+    inventory.set_stock(product, 10)
+    inventory.decrement_stock({product.id: 3}, order_id=order_id)
+    assert inventory.take_snapshots() == 1
+
+    checkpoint = timezone.now()
+    inventory.increment_stock({product.id: 2})
+
+    assert list(
+        StockMovement.objects.filter(product=product).order_by("id").values_list("reason", "delta")
+    ) == [("initial", 1), ("adjustment", 9), ("sale", -3), ("adjustment", 2)]
+    assert StockMovement.objects.get(reason="sale").order_id == order_id
+
+    product.refresh_from_db()
+    assert inventory.stock_at(product.id) == product.stock == 9
+    assert inventory.stock_at(product.id, checkpoint) == 7
+    assert inventory.stock_at(product.id, product.created_at - timedelta(seconds=1)) == 0
+
+
+@pytest.mark.django_db
+def test_stock_snapshots_wait_for_out_of_order_movements(product, settings):
+    """
+    Test that a settled movement behind an unsettled lower id does not move
+    the snapshot watermark past the unsettled one.
+    """
+    from datetime import timedelta
+    from django.utils import timezone
+    from products.models import StockMovement
+    from products.services import inventory
+
+    settings.STOCK_SNAPSHOT_SETTLE_SECONDS = 60
+    now = timezone.now()
+    StockMovement.objects.filter(product=product).update(created_at=now - timedelta(minutes=10))
+
+    # stamped late (committed last) but inserted first, then an older stamp
+    late = StockMovement.objects.create(product=product, delta=4, reason="adjustment", created_at=now)
+    StockMovement.objects.create(
+        product=product, delta=-1, reason="adjustment", created_at=now - timedelta(minutes=5)
+    )
+
+    assert inventory.take_snapshots() == 1
+    assert inventory.stock_at(product.id) == 4
+
+    StockMovement.objects.filter(pk=late.pk).update(created_at=now - timedelta(minutes=2))
+    assert inventory.take_snapshots() == 1
+    assert inventory.stock_at(product.id) == 1 + 4 - 1
@@ -3,7 +3,7 @@ from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.renderers import JSONRenderer
 from rest_framework import status
 from rest_framework.response import Response
-from rest_framework.throttling import ScopedRateThrottle
+from core.throttling import SlidingWindowRateThrottle
 from products.models import Category
 from products.serializers.category import CategorySerializer
 from products.services.category import (
@@ -18,7 +18,7 @@ class CategoryViewSet(ModelViewSet):
     serializer_class = CategorySerializer
     renderer_classes = [JSONRenderer]
     http_method_names = ["get", "post", "patch", "delete"]
-    throttle_classes = [ScopedRateThrottle]
+    throttle_classes = [SlidingWindowRateThrottle]
     
     # default list message
     list_message = "Categories retrieved successfully."
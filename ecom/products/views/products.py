@@ -3,58 +3,317 @@ from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.renderers import JSONRenderer
 from rest_framework import status
 from rest_framework.response import Response
-from rest_framework.throttling import ScopedRateThrottle
-from django.core.cache import cache
+from core.throttling import SlidingWindowRateThrottle
+from urllib.parse import urlencode
+from django.conf import settings
+from django.db import transaction
+from django.http import StreamingHttpResponse
+from django.shortcuts import get_object_or_404
 
-from products.models import Product
+from products.models import Product, ProductImport
 from rest_framework.exceptions import PermissionDenied
-from products.serializers.products import ProductSerializer
+from products.serializers.products import (
+    ProductSerializer,
+    ProductImportSerializer,
+    ProductBulkUpdateItemSerializer,
+)
 from products.services.products import (
     create_product,
     update_product,
     delete_product,
+    bulk_update_products,
 )
+from products.services import catalog_cache, search, facets, bulk_import
+from products.filters import ProductFilterBackend, get_ordering, filter_signature
+from rest_framework.decorators import action
+from core.pagination import KeysetResultsPagination
 from core.permissions import (
     IsProductOwnerOrAdmin, IsAdmin, IsVendor, IsCustomer
 )
 import logging
 logger = logging.getLogger(__name__)
 
+# Import job ids; anything else 404s in routing instead of reaching the UUID lookup
+UUID_PATTERN = r"[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}"
+
 class ProductViewSet(ModelViewSet):
     serializer_class = ProductSerializer
     renderer_classes = [JSONRenderer]
     http_method_names = ["get", "post", "patch", "delete"]
-    throttle_classes = [ScopedRateThrottle]
+    throttle_classes = [SlidingWindowRateThrottle]
+    pagination_class = KeysetResultsPagination
+    filter_backends = [ProductFilterBackend]
+    keyset_ordering = "-created_at"
     
     # default list message
     list_message = "Products retrieved successfully."
 
+    # action-specific messages
+    action_messages = {
+        "search": "Search results retrieved successfully.",
+    }
+
+    import_actions = ("bulk_import", "import_status", "import_report")
+
     def get_queryset(self):
         user = self.request.user
 
         # Vendors only see their own products
-        if user.is_authenticated and user.role == "vendor" and hasattr(user, "vendor_profile"):
+        if self._is_vendor_request():
             return Product.objects.filter(vendor=user.vendor_profile).select_related("vendor")
 
-        # Customers + admins see all products using try cache first
-        cached_products = cache.get("all_active_products")
-        if cached_products is not None:
-            logger.info("Cache hit for all active products")
-            return cached_products
+        # Customers + admins see all active products
+        return Product.objects.filter(is_active=True).select_related("vendor").order_by("-created_at")
+
+    def list(self, request, *args, **kwargs):
+        """
+        List products.
+
+        Supports `category`, `vendor`, `min_price`, `max_price`,
+        `min_discount` and `in_stock` filters, `?sort=newest|price_asc|price_desc`,
+        and facet counts in `meta.facets` with `?include_facets=true`.
+
+        The public catalog is served from a page cache keyed by the query
+        string; each page stores only product ids, and product payloads
+        are cached and invalidated individually.
+        """
+        self.keyset_ordering = get_ordering(request)
+
+        if self._is_vendor_request():
+            return super().list(request, *args, **kwargs)
+
+        page = catalog_cache.get_page(
+            self._catalog_signature(),
+            loader=self._load_catalog_page,
+        )
+        data = catalog_cache.get_products(page["ids"], loader=self._load_product_payloads)
+
+        meta = page["meta"]
+        if request.query_params.get("include_facets") in ("1", "true"):
+            meta = {
+                **meta,
+                "facets": facets.get_facets(
+                    filter_signature(request),
+                    self.filter_queryset(self.get_queryset()),
+                ),
+            }
+
+        return self.paginator.get_envelope_response(request, data, meta)
+
+    @action(detail=False, methods=["get"], url_path="search")
+    def search(self, request):
+        """
+        GET /products/search/?q=<terms>
+
+        Ranked full-text search over active products' names and
+        descriptions, tolerant of typos. Results are keyset-paginated by
+        rank and served from the per-product payload cache. Accepts the
+        same filters as the listing.
+        """
+        query = request.query_params.get("q", "").strip()
+        if not query:
+            return Response(
+                {
+                    "status": "error",
+                    "code": "INVALID_REQUEST",
+                    "message": "A search query is required.",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        # rank ties are common; id makes their order, and so the cursor, stable
+        self.keyset_ordering = ("-rank", "id")
+        queryset = search.search_products(
+            self.filter_queryset(Product.objects.filter(is_active=True)), query
+        ).values("id", "rank")
+
+        rows = self.paginate_queryset(queryset)
+        data = catalog_cache.get_products(
+            [str(row["id"]) for row in rows], loader=self._load_product_payloads
+        )
+
+        return self.paginator.get_envelope_response(request, data, self.paginator.get_meta())
+
+    @action(detail=False, methods=["patch"], url_path="bulk")
+    def bulk_update(self, request):
+        """
+        PATCH /products/bulk/
+
+        Updates stock and pricing of many of the vendor's products at once.
+        Takes a list of `{id | slug, stock, original_price, discount_percent}`
+        and returns one result per row, in order; invalid rows are reported
+        without blocking the others.
+        """
+        rows = request.data
+        if not isinstance(rows, list) or not rows:
+            return Response(
+                {
+                    "status": "error",
+                    "code": "INVALID_REQUEST",
+                    "message": "Send a non-empty list of product updates.",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        if len(rows) > settings.PRODUCT_BULK_UPDATE_MAX_ROWS:
+            return Response(
+                {
+                    "status": "error",
+                    "code": "INVALID_REQUEST",
+                    "message": f"At most {settings.PRODUCT_BULK_UPDATE_MAX_ROWS} updates per request.",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        results = [None] * len(rows)
+        valid_positions = []
+        valid_rows = []
+
+        for position, row in enumerate(rows):
+            serializer = ProductBulkUpdateItemSerializer(data=row)
+            if serializer.is_valid():
+                valid_positions.append(position)
+                valid_rows.append(serializer.validated_data)
+            else:
+                reference = row.get("id") or row.get("slug") if isinstance(row, dict) else None
+                results[position] = {"ref": reference, "ok": False, "errors": serializer.errors}
+
+        if valid_rows:
+            applied = bulk_update_products(request.user.vendor_profile, valid_rows, actor=request.user)
+            for position, result in zip(valid_positions, applied):
+                results[position] = result
+
+        updated = sum(1 for result in results if result["ok"])
+
+        return Response(
+            {
+                "status": "success",
+                "code": "BULK_UPDATE_COMPLETED",
+                "message": "Bulk product update completed.",
+                "meta": {"updated": updated, "failed": len(results) - updated},
+                "data": results,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+    @action(detail=False, methods=["post"], url_path="import")
+    def bulk_import(self, request):
+        """
+        POST /products/import/  (multipart: file, optional format=csv|jsonl)
+
+        Queues a bulk product import for the requesting vendor. The file
+        is parsed as a stream into staged batches, then validated and
+        inserted by a Celery job whose id is returned for tracking.
+        """
+        from core.tasks import import_products_task
+
+        upload = request.FILES.get("file")
+        if upload is None:
+            return Response(
+                {
+                    "status": "error",
+                    "code": "INVALID_REQUEST",
+                    "message": "A CSV or JSONL file is required.",
+                },
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+
+        fmt = bulk_import.detect_format(upload.name, request.data.get("format"))
+        product_import = bulk_import.stage_import(
+            request.user.vendor_profile, upload, fmt, file_name=upload.name
+        )
+
+        job_id = str(product_import.id)
+        transaction.on_commit(
+            lambda: import_products_task.apply_async(args=[job_id], task_id=job_id)
+        )
+
+        return Response(
+            {
+                "status": "success",
+                "code": "IMPORT_QUEUED",
+                "message": "Product import queued.",
+                "data": ProductImportSerializer(product_import).data,
+            },
+            status=status.HTTP_202_ACCEPTED,
+        )
+
+    @action(detail=False, methods=["get"], url_path=rf"import/(?P<job_id>{UUID_PATTERN})")
+    def import_status(self, request, job_id=None):
+        """
+        GET /products/import/<job_id>/
+
+        Returns the progress of one of the vendor's imports.
+        """
+        product_import = self._get_import(job_id)
+
+        return Response(
+            {
+                "status": "success",
+                "code": "FETCH_SUCCESSFUL",
+                "message": "Import status retrieved successfully.",
+                "data": ProductImportSerializer(product_import).data,
+            },
+            status=status.HTTP_200_OK,
+        )
+
+    @action(detail=False, methods=["get"], url_path=rf"import/(?P<job_id>{UUID_PATTERN})/report")
+    def import_report(self, request, job_id=None):
+        """
+        GET /products/import/<job_id>/report/
+
+        Downloads the per-row errors of an import as CSV.
+        """
+        product_import = self._get_import(job_id)
+
+        response = StreamingHttpResponse(bulk_import.iter_report(product_import), content_type="text/csv")
+        response["Content-Disposition"] = f'attachment; filename="import-{product_import.id}-errors.csv"'
+        return response
+
+    def _get_import(self, job_id):
+        return get_object_or_404(
+            ProductImport, id=job_id, vendor=self.request.user.vendor_profile
+        )
+
+    def _is_vendor_request(self):
+        user = self.request.user
+        return user.is_authenticated and user.role == "vendor" and hasattr(user, "vendor_profile")
+
+    def _catalog_signature(self):
+        """
+        Canonical form of the query string, so parameter order does not split the cache.
+        """
+        return urlencode(sorted(self.request.query_params.lists()), doseq=True)
+
+    def _load_catalog_page(self):
+        logger.info("Catalog cache miss, loading page from database")
+        position_field = self.keyset_ordering[0].lstrip("-")
+        queryset = self.filter_queryset(self.get_queryset()).values("id", position_field)
+        rows = self.paginate_queryset(queryset)
+
+        return {
+            "ids": [str(row["id"]) for row in rows],
+            "meta": self.paginator.get_meta(),
+        }
+
+    def _load_product_payloads(self, product_ids):
+        products = Product.objects.filter(id__in=product_ids).select_related("vendor")
+        return {
+            str(product.id): dict(ProductSerializer(product).data)
+            for product in products
+        }
 
-        logger.info("up next)")
-        queryset = Product.objects.filter(is_active=True).select_related("vendor").order_by("-created_at")
-        cache.set("all_active_products", list(queryset), timeout=60 * 60 * 24)
-        return queryset
-        
     def get_throttles(self):
-        if self.action in ["list", "retrieve"]:
+        if self.action in ["list", "retrieve", "search", "import_status", "import_report"]:
             self.throttle_scope = "product_read"
 
         elif self.action == "create":
             self.throttle_scope = "product_create"
 
-        elif self.action in ["update", "partial_update"]:
+        elif self.action == "bulk_import":
+            self.throttle_scope = "product_import"
+
+        elif self.action in ["update", "partial_update", "bulk_update"]:
             self.throttle_scope = "product_update"
 
         elif self.action == "destroy":
@@ -63,7 +322,7 @@ class ProductViewSet(ModelViewSet):
         return super().get_throttles()
 
     def get_permissions(self):
-        if self.action == "create":
+        if self.action in ("create", "bulk_update", *self.import_actions):
             return [IsAuthenticated(), IsVendor()]
         
         if self.action == "list":
@@ -120,7 +379,7 @@ class ProductViewSet(ModelViewSet):
         data = serializer.validated_data
 
         product = update_product(
-            instance.id, **data
+            instance.id, actor=request.user, **data
         )
 
         read_serializer = ProductSerializer(product)